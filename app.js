@@ -44,55 +44,63 @@
     return sum;
   }
 
-  // Requirements handling — supports several shapes:
-  // - req: [{id: '25100', level: 3}, ...]
-  // - requires: [["25100",3], 26000]
-  // - req: "25100:3"
-  function normalizeRequirements(reqVal) {
-    if (!reqVal) return [];
-    const out = [];
-    const push = (id, level) => {
-      if (!id) return;
-      const sid = String(id);
-      const lvl = Math.max(1, parseInt(level || '1', 10));
-      out.push({ id: sid, level: lvl });
-    };
-    const arr = Array.isArray(reqVal) ? reqVal : [reqVal];
-    for (const r of arr) {
-      if (!r && r !== 0) continue;
-      if (typeof r === 'object' && !Array.isArray(r)) {
-        push(r.id ?? r.skillId ?? r[0], r.level ?? r.lv ?? r[1] ?? 1);
-      } else if (Array.isArray(r)) {
-        push(r[0], r[1] ?? 1);
-      } else if (typeof r === 'string') {
-        const m = r.match(/^(\d+)(?::(\d+))?$/);
-        if (m) push(m[1], m[2] ?? 1);
-      } else if (typeof r === 'number') {
-        push(r, 1);
-      }
-    }
-    return out;
-  }
+  // Per-spec lookups, built once when a spec's skills are first rendered:
+  // id -> skill, normalized name -> skill, id -> DNA entry, id -> card view, and
+  // every requirement resolved to its target skill (by id, else by name) with the
+  // reverse edges, so click handlers never scan the skill list or the DOM.
+  const specIndexes = {};
 
-  function buildDependencyIndex(specId) {
+  function getSpecIndex(specId) {
     const skills = data.skills[specId] || [];
-    const requiresById = {};
-    const dependentsById = {};
+    const dna = (data.dna && data.dna[specId]) || [];
+    const cached = specIndexes[specId];
+    if (cached && cached.skills === skills && cached.dna === dna) return cached;
+    const byId = new Map();
+    const byName = new Map();
+    for (const s of skills) {
+      byId.set(String(s.id), s);
+      const n = norm(s.name);
+      if (!byName.has(n)) byName.set(n, s);
+    }
+    const requires = new Map();   // skillId -> [{ r, id, target, level }]
+    const dependents = new Map(); // skillId -> [{ id, level }] of skills requiring it
     for (const s of skills) {
       const sid = String(s.id);
-      const req = normalizeRequirements(s.req || s.requires);
-      if (req.length) requiresById[sid] = req;
-      for (const r of req) {
-        const arr = (dependentsById[r.id] = dependentsById[r.id] || []);
-        if (!arr.includes(sid)) arr.push(sid);
+      const list = [];
+      const reqs = s.requires || {};
+      for (const key in reqs) {
+        const r = reqs[key];
+        if (!r) continue;
+        const target = r.id ? byId.get(String(r.id)) : (r.name ? byName.get(norm(r.name)) : null);
+        const id = r.id ? String(r.id) : (target ? String(target.id) : null);
+        const level = r.level || 1;
+        list.push({ r, id, target: target || null, level });
+        if (id) {
+          if (!dependents.has(id)) dependents.set(id, []);
+          dependents.get(id).push({ id: sid, level });
+        }
       }
+      requires.set(sid, list);
     }
-    return { requiresById, dependentsById };
+    const dnaById = new Map(dna.map((d) => [String(d.id), d]));
+    return (specIndexes[specId] = {
+      skills, dna, byId, byName, dnaById, requires, dependents, cards: new Map(), dnaCards: new Map(),
+    });
   }
 
+  // data.manifest.json is tiny and always revalidated; the files it names are
+  // content-hashed, so they can be served from the browser/CDN cache until they change.
+  // With a published index only groups/jobs load up front and each spec's shard is
+  // fetched when it is selected. Falls back to data.json when no manifest is published.
   function loadJSON() {
-    fetch('./data.json?_=' + Date.now())
-      .then((r) => r.json())
+    fetch('./data.manifest.json', { cache: 'no-cache' })
+      .then((r) => (r.ok ? r.json() : Promise.reject(r.status)))
+      .then((manifest) => {
+        if (manifest.layout) layoutUrl = manifest.layout;
+        if (manifest.index && manifest.specs) return loadIndex(manifest);
+        return fetch('./' + manifest.data).then((r) => r.json());
+      })
+      .catch(() => fetch('./data.json').then((r) => r.json()))
       .then((json) => {
         data = json;
         initUI();
@@ -103,6 +111,55 @@
       });
   }
 
+  let shardUrls = null;   // specId -> shard file, when loading per spec
+  const shardLoads = {};  // specId -> pending/settled shard fetch
+
+  function loadIndex(manifest) {
+    return fetch('./' + manifest.index)
+      .then((r) => r.json())
+      .then((index) => {
+        shardUrls = manifest.specs;
+        return Object.assign({}, index, { skills: {}, dna: {} });
+      });
+  }
+
+  // Resolves once the spec's skills and DNA are in `data`.
+  function loadSpec(specId) {
+    if (!shardUrls || !shardUrls[specId] || data.skills[specId]) return Promise.resolve();
+    if (!shardLoads[specId]) {
+      shardLoads[specId] = fetch('./' + shardUrls[specId])
+        .then((r) => r.json())
+        .then((shard) => {
+          data.skills[specId] = shard.skills || [];
+          data.dna[specId] = shard.dna || [];
+        })
+        .catch(() => { delete shardLoads[specId]; });
+    }
+    return shardLoads[specId];
+  }
+
+  function prefetchSpecs(specIds) {
+    const run = () => specIds.forEach((id) => loadSpec(id));
+    if (window.requestIdleCallback) window.requestIdleCallback(run);
+    else setTimeout(run, 200);
+  }
+
+  function showSpec(job, specId) {
+    if (!data.skills[specId]) renderSkills(); // clear the previous spec while the shard loads
+    loadSpec(specId).then(() => {
+      if (currentSubclassId !== specId) return; // another spec was picked meanwhile
+      if (pendingBuild && pendingBuild.spec === String(specId)) {
+        allocated = { skills: pendingBuild.skills, dna: pendingBuild.dna };
+      }
+      pendingBuild = null;
+      renderSkills();
+      // Neighbours: the job's other specs, then the first spec of each other job of the race.
+      const firstSpecs = (data.jobs[currentGroupId] || []).map((j) => (j.specs || [])[0]).filter(Boolean);
+      const nearby = (job.specs || []).concat(firstSpecs).map((sc) => sc.id);
+      prefetchSpecs(nearby.filter((id, i) => id !== specId && nearby.indexOf(id) === i));
+    });
+  }
+
   function initUI() {
     // Populate race select
     groupSelect.innerHTML = '';
@@ -121,11 +178,149 @@
 
     charLevel.addEventListener('input', () => {
       charLevelLabel.textContent = 'Level ' + charLevel.value;
+      if (currentSubclassId) refreshSkills();
       updatePoints();
     });
 
-    renderSubclassPills();
-    charLevel.dispatchEvent(new Event('input'));
+    window.addEventListener('hashchange', () => {
+      const code = buildCodeFromHash();
+      if (code && code !== lastBuildCode) openBuildCode(code);
+    });
+
+    const code = buildCodeFromHash();
+    if (code) {
+      openBuildCode(code);
+    } else {
+      renderSubclassPills();
+      charLevel.dispatchEvent(new Event('input'));
+    }
+  }
+
+  // Build codes, shared with build_codes.py (which documents the format): a version
+  // byte, the spec's number in build_layout.json as a varint, the character level,
+  // then every skill/DNA level of the spec bit-packed LSB-first in layout order.
+  // The layout is append-only, so codes stay valid across data refreshes. It is only
+  // fetched once a code is opened or something is allocated, never for the first render.
+  const BUILD_CODE_VERSION = 1;
+  let layoutUrl = null;      // content-hashed copy named by the manifest
+  let layoutLoad = null;
+  let pendingBuild = null;   // decoded build waiting for its spec to render
+  let lastBuildCode = null;  // code currently in the address bar
+
+  function loadLayout() {
+    if (!layoutLoad) {
+      layoutLoad = (layoutUrl ? fetch('./' + layoutUrl) : fetch('./build_layout.json', { cache: 'no-cache' }))
+        .then((r) => r.json())
+        .then((layout) => {
+          if (layout.format !== BUILD_CODE_VERSION) return null;
+          const specs = layout.specs.map((spec, number) => ({ number, id: String(spec.id), slots: spec.slots }));
+          return { specs, byId: new Map(specs.map((spec) => [spec.id, spec])) };
+        })
+        .catch(() => { layoutLoad = null; return null; });
+    }
+    return layoutLoad;
+  }
+
+  function encodeBuild(layout, specId, level, alloc) {
+    const spec = layout.byId.get(String(specId));
+    if (!spec) return null;
+    const head = [BUILD_CODE_VERSION];
+    let n = spec.number;
+    do {
+      const b = n & 0x7f;
+      n >>>= 7;
+      head.push(n ? b | 0x80 : b);
+    } while (n);
+    head.push(level);
+    const body = [];
+    let acc = 0, nbits = 0;
+    for (const [kind, id, bits] of spec.slots) {
+      const lvl = Math.min((kind === 's' ? alloc.skills : alloc.dna)[id] || 0, (1 << bits) - 1);
+      acc |= lvl << nbits;
+      nbits += bits;
+      while (nbits >= 8) {
+        body.push(acc & 0xff);
+        acc >>>= 8;
+        nbits -= 8;
+      }
+    }
+    if (nbits) body.push(acc & 0xff);
+    while (body.length && body[body.length - 1] === 0) body.pop();
+    const raw = String.fromCharCode.apply(null, head.concat(body));
+    return btoa(raw).replace(/\+/g, '-').replace(/\//g, '_').replace(/=+$/, '');
+  }
+
+  function decodeBuild(layout, code) {
+    let raw;
+    try {
+      raw = atob(code.replace(/-/g, '+').replace(/_/g, '/'));
+    } catch (e) {
+      return null;
+    }
+    if (raw.length < 3 || raw.charCodeAt(0) !== BUILD_CODE_VERSION) return null;
+    let pos = 1, number = 0, shift = 0, b;
+    do {
+      if (pos >= raw.length) return null;
+      b = raw.charCodeAt(pos++);
+      number |= (b & 0x7f) << shift;
+      shift += 7;
+    } while (b & 0x80);
+    const spec = layout.specs[number];
+    if (!spec || pos >= raw.length) return null;
+    const build = { spec: spec.id, level: raw.charCodeAt(pos++), skills: {}, dna: {} };
+    let acc = 0, nbits = 0;
+    for (const [kind, id, bits] of spec.slots) {
+      while (nbits < bits && pos < raw.length) {
+        acc |= raw.charCodeAt(pos++) << nbits;
+        nbits += 8;
+      }
+      const lvl = acc & ((1 << bits) - 1);
+      acc >>>= bits;
+      nbits = Math.max(0, nbits - bits);
+      if (lvl) (kind === 's' ? build.skills : build.dna)[id] = lvl;
+    }
+    return build;
+  }
+
+  function buildCodeFromHash() {
+    const m = location.hash.match(/^#b=([A-Za-z0-9_-]+)$/);
+    return m ? m[1] : null;
+  }
+
+  // Selects the race, job and spec of a shared build; its levels are applied once the spec renders.
+  function openBuildCode(code) {
+    loadLayout().then((layout) => {
+      const build = layout ? decodeBuild(layout, code) : null;
+      if (build) {
+        for (const g of data.groups) {
+          const job = (data.jobs[g.id] || []).find((j) => (j.specs || []).some((sc) => String(sc.id) === build.spec));
+          if (!job) continue;
+          currentGroupId = g.id;
+          currentJobId = job.id;
+          groupSelect.value = g.id;
+          charLevel.value = String(Math.max(1, Math.min(MAX_LEVEL, build.level)));
+          lastBuildCode = code;
+          pendingBuild = build;
+          break;
+        }
+      }
+      renderSubclassPills();
+      charLevel.dispatchEvent(new Event('input'));
+    });
+  }
+
+  // Keeps the address bar on the current build, so it can be bookmarked or shared.
+  function syncBuildCode() {
+    if (pendingBuild || !currentSubclassId) return;
+    // An empty build needs no code until one has been in the address bar.
+    if (!layoutLoad && !Object.keys(allocated.skills).length && !Object.keys(allocated.dna).length) return;
+    loadLayout().then((layout) => {
+      if (!layout || pendingBuild) return;
+      const code = encodeBuild(layout, currentSubclassId, currentCharLevel(), allocated);
+      if (!code || code === lastBuildCode) return;
+      lastBuildCode = code;
+      history.replaceState(null, '', '#b=' + code);
+    });
   }
 
   function renderSubclassPills() {
@@ -133,46 +328,52 @@
     const jobs = data.jobs[currentGroupId] || [];
     // First-job pills bar
     const jobBar = document.createElement('div');
-    jobs.forEach((job, jidx) => {
+    const initialJob = jobs.find((j) => j.id === currentJobId) || jobs[0];
+    jobs.forEach((job) => {
       const pill = document.createElement('button');
-      pill.className = 'pill' + (jidx === 0 ? ' active' : '');
+      pill.className = 'pill' + (job === initialJob ? ' active' : '');
       pill.textContent = job.name;
       pill.addEventListener('click', () => {
         currentJobId = job.id;
         allocated = { skills: {}, dna: {} };
+        pendingBuild = null;
         jobBar.querySelectorAll('.pill').forEach((p) => p.classList.remove('active'));
         pill.classList.add('active');
         renderSpecs(job);
       });
       jobBar.appendChild(pill);
-      if (jidx === 0) currentJobId = job.id;
     });
     subclassPills.appendChild(jobBar);
 
-    const initialJob = jobs.find((j) => j.id === currentJobId) || jobs[0];
-    if (initialJob) renderSpecs(initialJob);
+    if (initialJob) {
+      currentJobId = initialJob.id;
+      renderSpecs(initialJob);
+    }
 
     function renderSpecs(job) {
       const old = subclassPills.querySelector('.specs-row');
       if (old) old.remove();
       const row = document.createElement('div');
       row.className = 'specs-row';
-      (job.specs || []).forEach((sc, idx) => {
+      const specs = job.specs || [];
+      const initialSpec = specs.find((sc) => pendingBuild && String(sc.id) === pendingBuild.spec) || specs[0];
+      specs.forEach((sc) => {
         const pill = document.createElement('button');
-        pill.className = 'pill' + (idx === 0 ? ' active' : '');
+        pill.className = 'pill' + (sc === initialSpec ? ' active' : '');
         pill.textContent = sc.name;
         pill.addEventListener('click', () => {
           currentSubclassId = sc.id;
           allocated = { skills: {}, dna: {} };
+          pendingBuild = null;
           row.querySelectorAll('.pill').forEach((p) => p.classList.remove('active'));
           pill.classList.add('active');
-          renderSkills();
+          showSpec(job, sc.id);
         });
         row.appendChild(pill);
-        if (idx === 0) currentSubclassId = sc.id;
       });
+      if (initialSpec) currentSubclassId = initialSpec.id;
       subclassPills.appendChild(row);
-      renderSkills();
+      showSpec(job, currentSubclassId);
     }
   }
 
@@ -224,36 +425,34 @@
     tooltip.setAttribute('aria-hidden', 'true');
   }
 
-  function attachTooltipHandlers(nameEl, entry) {
-    const handler = (ev) => {
-      const html = formatTooltipContent(entry);
-      showTooltip(html, ev.clientX, ev.clientY);
-    };
-    nameEl.addEventListener('mouseenter', handler);
-    nameEl.addEventListener('mousemove', handler);
-    nameEl.addEventListener('mouseleave', hideTooltip);
-    nameEl.addEventListener('focus', (ev) => {
+  // Tooltips are delegated from the grid, so cards carry no per-element listeners.
+  // `entryFor(card)` maps a card back to its skill or DNA entry.
+  function attachTooltipHandlers(grid, entryFor) {
+    const nameOf = (target) => (target && target.closest ? target.closest('.skill-name') : null);
+    const entryOf = (nameEl) => entryFor(nameEl.closest('.skill-card'));
+    grid.addEventListener('mousemove', (ev) => {
+      const nameEl = nameOf(ev.target);
+      const entry = nameEl && entryOf(nameEl);
+      if (entry) showTooltip(formatTooltipContent(entry), ev.clientX, ev.clientY);
+    });
+    grid.addEventListener('mouseout', (ev) => {
+      const nameEl = nameOf(ev.target);
+      if (nameEl && !nameEl.contains(ev.relatedTarget)) hideTooltip();
+    });
+    grid.addEventListener('focusin', (ev) => {
+      const nameEl = nameOf(ev.target);
+      const entry = nameEl && entryOf(nameEl);
+      if (!entry) return;
       const rect = nameEl.getBoundingClientRect();
       showTooltip(formatTooltipContent(entry), rect.right, rect.top);
     });
-    nameEl.addEventListener('blur', hideTooltip);
-    nameEl.setAttribute('tabindex', '0');
+    grid.addEventListener('focusout', (ev) => {
+      if (nameOf(ev.target)) hideTooltip();
+    });
   }
 
-  function buildReverseDependencyMap(specId) {
-    const skills = data.skills[specId] || [];
-    const dependents = {}; // key: skillId -> array of dependent skillIds
-    for (const s of skills) {
-      const reqs = s.requires || {};
-      for (const k in reqs) {
-        const r = reqs[k];
-        if (r && r.id) {
-          const arr = (dependents[String(r.id)] = dependents[String(r.id)] || []);
-          if (!arr.includes(String(s.id))) arr.push(String(s.id));
-        }
-      }
-    }
-    return dependents;
+  function currentCharLevel() {
+    return Math.max(1, Math.min(MAX_LEVEL, parseInt(charLevel.value || '1', 10)));
   }
 
   function unmetRequirementsMessage(s, charLvl) {
@@ -275,222 +474,231 @@
       }
     }
     // skill reqs
-    const reqs = s.requires || {};
-    for (const key in reqs) {
-      const r = reqs[key];
-      if (!r) continue;
-      // Resolve by id or name
-      let target = null;
-      if (r.id) {
-        target = (data.skills[currentSubclassId] || []).find(x => String(x.id) === String(r.id));
-      } else if (r.name) {
-        const n = norm(r.name);
-        target = (data.skills[currentSubclassId] || []).find(x => norm(x.name) === n);
-        if (target && !r.id) r.id = target.id; // cache id for future checks
-      }
-      const have = r.id ? (allocated.skills[r.id] || 0) : 0;
-      if (target) {
-        if (have < (r.level || 1)) lines.push(`Requires ${target.name} Lv.${r.level || 1}`);
-      } else if (r.name) {
-        lines.push(`Requires ${r.name} Lv.${r.level || 1}`);
+    for (const req of getSpecIndex(currentSubclassId).requires.get(String(s.id)) || []) {
+      const have = req.id ? (allocated.skills[req.id] || 0) : 0;
+      if (req.target) {
+        if (have < req.level) lines.push(`Requires ${req.target.name} Lv.${req.level}`);
+      } else if (req.r.name) {
+        lines.push(`Requires ${req.r.name} Lv.${req.level}`);
       }
     }
     return lines;
   }
 
-  function renderSkills() {
-    const skills = data.skills[currentSubclassId] || [];
-    skillsGrid.innerHTML = '';
-    const depIndex = buildDependencyIndex(currentSubclassId);
-    const requiresById = depIndex.requiresById;
-    const dependentsById = depIndex.dependentsById;
-    const reverseDeps = buildReverseDependencyMap(currentSubclassId);
-
-    // helper to find card element by skill id or name
-    function findCardEl(predicate) {
-      return Array.from(skillsGrid.children).find(card => {
-        const n = card.querySelector('.skill-name');
-        return n && predicate(n.textContent.trim());
-      });
+  // `ctx` is { used, cap, charLvl }, computed once per refresh rather than per card.
+  function canIncrease(idx, s, ctx) {
+    // Points cap
+    if (ctx.used >= ctx.cap) return false;
+    // Max level
+    const cur = allocated.skills[s.id] || 0;
+    if (cur >= (s.maxLevel || 10)) return false;
+
+    // Character level gating from wiki: s.lvlReq is an array per skill level
+    const reqArr = Array.isArray(s.lvlReq) ? s.lvlReq : null;
+    if (reqArr) {
+      const nextLevel = cur + 1;
+      const needLevel = reqArr[Math.max(0, Math.min(reqArr.length - 1, nextLevel - 1))];
+      if (typeof needLevel === 'number' && ctx.charLvl < needLevel) return false;
     }
-    function findCardElBySkillId(skillId) {
-      const target = (data.skills[currentSubclassId] || []).find(s => String(s.id) === String(skillId));
-      if (!target) return null;
-      return findCardEl(name => name === target.name);
+
+    // Job/Skill prerequisites from wiki
+    for (const req of idx.requires.get(String(s.id)) || []) {
+      if (req.id) { // Skill requirement
+        const have = allocated.skills[req.id] || 0;
+        if (have < req.level) return false; // unmet
+      } else if (req.r.level && req.r.name) { // Job requirement
+        // Check against current job and character level.
+        if (ctx.charLvl < req.r.level) return false;
+      }
     }
-    function findCardElBySkillName(name) {
-      const n = norm(name);
-      return findCardEl(txt => norm(txt) === n);
+
+    return true;
+  }
+
+  function canDecrease(idx, s) {
+    const cur = allocated.skills[s.id] || 0;
+    if (cur <= 0) return false;
+    const newLevel = cur - 1;
+    // Allow the decrease only if every invested dependent still has the level it requires
+    for (const dep of idx.dependents.get(String(s.id)) || []) {
+      if ((allocated.skills[dep.id] || 0) > 0 && newLevel < dep.level) {
+        return false; // would break this dependent
+      }
     }
+    return true;
+  }
 
-    function flashRequirementByAny(r) {
-      let card = null;
-      if (r && r.id) card = findCardElBySkillId(r.id);
-      if (!card && r && r.name) card = findCardElBySkillName(r.name);
-      if (!card) return;
-      card.classList.add('need-highlight');
-      setTimeout(() => card.classList.remove('need-highlight'), 900);
+  // One card per skill/DNA entry: { card, badge, inc, dec, level, canInc, canDec }.
+  // The cached state lets a refresh touch the DOM only where something changed.
+  function buildCard(entry) {
+    const card = document.createElement('div');
+    card.className = 'skill-card';
+    card.dataset.id = String(entry.id);
+    const name = document.createElement('div');
+    name.className = 'skill-name';
+    name.textContent = entry.name;
+    name.setAttribute('tabindex', '0');
+    const ctrl = document.createElement('div');
+    ctrl.className = 'skill-ctrl';
+    const dec = document.createElement('button');
+    dec.textContent = '-';
+    dec.dataset.action = 'dec';
+    dec.setAttribute('aria-label', 'Decrease ' + entry.name);
+    const badge = document.createElement('span');
+    badge.className = 'skill-level';
+    const inc = document.createElement('button');
+    inc.textContent = '+';
+    inc.dataset.action = 'inc';
+    inc.setAttribute('aria-label', 'Increase ' + entry.name);
+
+    ctrl.appendChild(dec);
+    ctrl.appendChild(badge);
+    ctrl.appendChild(inc);
+    card.appendChild(name);
+    card.appendChild(ctrl);
+    return { card, badge, inc, dec, level: null, canInc: null, canDec: null };
+  }
+
+  // Blocked buttons use aria-disabled rather than `disabled` so a click on a
+  // blocked '+' still reaches the grid and can explain what is missing.
+  function patchCard(view, entry, level, canInc, canDec) {
+    if (view.level !== level) {
+      view.level = level;
+      view.badge.textContent = level + ' / ' + (entry.maxLevel || 10);
+    }
+    if (view.canInc !== canInc) {
+      view.canInc = canInc;
+      view.inc.setAttribute('aria-disabled', String(!canInc));
+    }
+    if (view.canDec !== canDec) {
+      view.canDec = canDec;
+      view.dec.setAttribute('aria-disabled', String(!canDec));
     }
+  }
 
-    function canIncrease(s) {
-      // Points cap
-      const cap = getSkillPointsCap();
-      const used = countAllocated(allocated.skills);
-      if (used >= cap) return false;
-      // Max level
-      const cur = allocated.skills[s.id] || 0;
-      if (cur >= (s.maxLevel || 10)) return false;
-      
-      // Character level gating from wiki: s.lvlReq is an array per skill level
-      const charLvl = Math.max(1, Math.min(MAX_LEVEL, parseInt(charLevel.value || '1', 10)));
-      const reqArr = Array.isArray(s.lvlReq) ? s.lvlReq : null;
-      if (reqArr) {
-        const nextLevel = cur + 1;
-        const needLevel = reqArr[Math.max(0, Math.min(reqArr.length - 1, nextLevel - 1))];
-        if (typeof needLevel === 'number' && charLvl < needLevel) return false;
-      }
-      
-      // Job/Skill prerequisites from wiki
-      const reqs = s.requires || {};
-      for (const key in reqs) {
-        const r = reqs[key];
-        if (r.id) { // Skill requirement
-          const have = allocated.skills[r.id] || 0;
-          if (have < (r.level || 1)) return false; // unmet
-        } else if (r.level && r.name) { // Job requirement
-          // Check against current job and character level.
-          if (charLvl < r.level) return false;
-        }
-      }
+  // Re-evaluates the given skill ids of the current spec (all of them when omitted).
+  function refreshSkills(ids) {
+    const idx = getSpecIndex(currentSubclassId);
+    const ctx = { used: countAllocated(allocated.skills), cap: getSkillPointsCap(), charLvl: currentCharLevel() };
+    for (const id of ids || idx.byId.keys()) {
+      const s = idx.byId.get(id);
+      const view = idx.cards.get(id);
+      if (s && view) patchCard(view, s, allocated.skills[s.id] || 0, canIncrease(idx, s, ctx), canDecrease(idx, s));
+    }
+  }
 
-      return true;
+  function refreshDNA(ids) {
+    const idx = getSpecIndex(currentSubclassId);
+    for (const id of ids || idx.dnaById.keys()) {
+      const d = idx.dnaById.get(id);
+      const view = idx.dnaCards.get(id);
+      if (!d || !view) continue;
+      const cur = allocated.dna[d.id] || 0;
+      patchCard(view, d, cur, cur < (d.maxLevel || 10), cur > 0);
     }
+  }
 
-    function canDecrease(s) {
-      const cur = allocated.skills[s.id] || 0;
-      if (cur <= 0) return false;
-      const newLevel = cur - 1;
-      // Check allocated dependents; allow decrease if newLevel still satisfies their required level
-      const dependents = (reverseDeps[String(s.id)] || []).map(id => String(id));
-      for (const depId of dependents) {
-        const depCur = allocated.skills[depId] || 0;
-        if (depCur <= 0) continue; // not invested
-        // Find requirement object inside dependent referencing s
-        const dependentSkill = (skills || []).find(x => String(x.id) === depId);
-        if (!dependentSkill) continue;
-        let reqLevelNeeded = 0;
-        const reqs = dependentSkill.requires || {};
-        for (const k in reqs) {
-          const r = reqs[k];
-          if (!r) continue;
-          if ((r.id && String(r.id) === String(s.id)) || (r.name && norm(r.name) === norm(s.name))) {
-            reqLevelNeeded = Math.max(reqLevelNeeded, r.level || 1);
-          }
-        }
-        if (newLevel < reqLevelNeeded) {
-          return false; // would break this dependent
-        }
-      }
-      return true;
+  // Raising or lowering a skill can only change the legality of the skill itself,
+  // the skills that require it ('+' gates) and the skills it requires ('-' gates),
+  // unless the change crosses the points cap, which gates every '+'.
+  function changeSkill(idx, s, delta) {
+    const sid = String(s.id);
+    const cap = getSkillPointsCap();
+    const wasFull = countAllocated(allocated.skills) >= cap;
+    const next = (allocated.skills[s.id] || 0) + delta;
+    if (next > 0) allocated.skills[s.id] = next;
+    else delete allocated.skills[s.id];
+
+    if (wasFull !== (countAllocated(allocated.skills) >= cap)) {
+      refreshSkills();
+    } else {
+      const affected = new Set([sid]);
+      for (const dep of idx.dependents.get(sid) || []) affected.add(dep.id);
+      for (const req of idx.requires.get(sid) || []) if (req.id) affected.add(req.id);
+      refreshSkills(affected);
     }
-    skills.forEach((s) => {
-      const card = document.createElement('div');
-      card.className = 'skill-card';
-      const name = document.createElement('div');
-      name.className = 'skill-name';
-      name.textContent = s.name;
-      attachTooltipHandlers(name, s);
-      const ctrl = document.createElement('div');
-      ctrl.className = 'skill-ctrl';
-      const dec = document.createElement('button');
-      dec.textContent = '-';
-      dec.setAttribute('aria-label', 'Decrease ' + s.name);
-      const badge = document.createElement('span');
-      badge.className = 'skill-level';
-      badge.textContent = (allocated.skills[s.id] || 0) + ' / ' + (s.maxLevel || 10);
-      const inc = document.createElement('button');
-      inc.textContent = '+';
-      inc.setAttribute('aria-label', 'Increase ' + s.name);
-
-      dec.addEventListener('click', () => {
-        if (!canDecrease(s)) return;
-        const cur = allocated.skills[s.id] || 0;
-        if (cur > 0) allocated.skills[s.id] = cur - 1;
-        if (allocated.skills[s.id] === 0) delete allocated.skills[s.id];
-        badge.textContent = (allocated.skills[s.id] || 0) + ' / ' + (s.maxLevel || 10);
-        updatePoints();
-      });
-      inc.addEventListener('click', (ev) => {
-        const charLvl = Math.max(1, Math.min(MAX_LEVEL, parseInt(charLevel.value || '1', 10)));
-        if (!canIncrease(s)) {
-          const lines = unmetRequirementsMessage(s, charLvl);
-          if (lines.length) {
-            showTooltip(`<div class=\"tt-title\">Requirements</div><div class=\"tt-desc\">${lines.join('<br/>')}</div>`, ev.clientX, ev.clientY);
-            // flash any required skills by id or name
-            const reqs = s.requires || {};
-            for (const k in reqs) flashRequirementByAny(reqs[k]);
-            setTimeout(hideTooltip, 1500);
-          }
-          return;
-        }
-        const cur = allocated.skills[s.id] || 0;
-        allocated.skills[s.id] = cur + 1;
-        badge.textContent = (allocated.skills[s.id] || 0) + ' / ' + (s.maxLevel || 10);
-        updatePoints();
-      });
+    updatePoints();
+  }
 
-      ctrl.appendChild(dec);
-      ctrl.appendChild(badge);
-      ctrl.appendChild(inc);
-      card.appendChild(name);
-      card.appendChild(ctrl);
-      skillsGrid.appendChild(card);
-    });
+  function flashRequirement(idx, req) {
+    const view = req.id ? idx.cards.get(req.id) : null;
+    if (!view) return;
+    view.card.classList.add('need-highlight');
+    setTimeout(() => view.card.classList.remove('need-highlight'), 900);
+  }
+
+  skillsGrid.addEventListener('click', (ev) => {
+    const btn = ev.target.closest('button[data-action]');
+    if (!btn) return;
+    const idx = getSpecIndex(currentSubclassId);
+    const s = idx.byId.get(btn.closest('.skill-card').dataset.id);
+    if (!s) return;
+    if (btn.dataset.action === 'dec') {
+      if (canDecrease(idx, s)) changeSkill(idx, s, -1);
+      return;
+    }
+    const ctx = { used: countAllocated(allocated.skills), cap: getSkillPointsCap(), charLvl: currentCharLevel() };
+    if (!canIncrease(idx, s, ctx)) {
+      const lines = unmetRequirementsMessage(s, ctx.charLvl);
+      if (lines.length) {
+        showTooltip(`<div class=\"tt-title\">Requirements</div><div class=\"tt-desc\">${lines.join('<br/>')}</div>`, ev.clientX, ev.clientY);
+        // flash any required skills
+        for (const req of idx.requires.get(String(s.id)) || []) flashRequirement(idx, req);
+        setTimeout(hideTooltip, 1500);
+      }
+      return;
+    }
+    changeSkill(idx, s, 1);
+  });
+
+  dnaGrid.addEventListener('click', (ev) => {
+    const btn = ev.target.closest('button[data-action]');
+    if (!btn) return;
+    const idx = getSpecIndex(currentSubclassId);
+    const d = idx.dnaById.get(btn.closest('.skill-card').dataset.id);
+    if (!d) return;
+    const cur = allocated.dna[d.id] || 0;
+    const next = btn.dataset.action === 'dec' ? Math.max(0, cur - 1) : Math.min(d.maxLevel || 10, cur + 1);
+    if (next === cur) return;
+    if (next > 0) allocated.dna[d.id] = next;
+    else delete allocated.dna[d.id];
+    refreshDNA([String(d.id)]);
     updatePoints();
+  });
 
-    // Render DNA
-    const dna = (data.dna && data.dna[currentSubclassId]) ? data.dna[currentSubclassId] : [];
-    dnaGrid.innerHTML = '';
-    dna.forEach((d) => {
-      const card = document.createElement('div');
-      card.className = 'skill-card';
-      const name = document.createElement('div');
-      name.className = 'skill-name';
-      name.textContent = d.name;
-      attachTooltipHandlers(name, d);
-      const ctrl = document.createElement('div');
-      ctrl.className = 'skill-ctrl';
-      const dec = document.createElement('button');
-      dec.textContent = '-';
-      dec.setAttribute('aria-label', 'Decrease ' + d.name);
-      const badge = document.createElement('span');
-      badge.className = 'skill-level';
-      badge.textContent = (allocated.dna[d.id] || 0) + ' / ' + (d.maxLevel || 10);
-      const inc = document.createElement('button');
-      inc.textContent = '+';
-      inc.setAttribute('aria-label', 'Increase ' + d.name);
-
-      dec.addEventListener('click', () => {
-        const cur = allocated.dna[d.id] || 0;
-        if (cur > 0) allocated.dna[d.id] = cur - 1;
-        if (allocated.dna[d.id] === 0) delete allocated.dna[d.id];
-        badge.textContent = (allocated.dna[d.id] || 0) + ' / ' + (d.maxLevel || 10);
-        updatePoints();
-      });
-      inc.addEventListener('click', () => {
-        const cur = allocated.dna[d.id] || 0;
-        if (cur < (d.maxLevel || 10)) allocated.dna[d.id] = cur + 1;
-        badge.textContent = (allocated.dna[d.id] || 0) + ' / ' + (d.maxLevel || 10);
-        updatePoints();
-      });
+  attachTooltipHandlers(skillsGrid, (card) => card && getSpecIndex(currentSubclassId).byId.get(card.dataset.id));
+  attachTooltipHandlers(dnaGrid, (card) => card && getSpecIndex(currentSubclassId).dnaById.get(card.dataset.id));
 
-      ctrl.appendChild(dec);
-      ctrl.appendChild(badge);
-      ctrl.appendChild(inc);
-      card.appendChild(name);
-      card.appendChild(ctrl);
-      dnaGrid.appendChild(card);
-    });
+  // Shows the current spec. Its cards are created the first time it is shown and
+  // reused afterwards; switching back only re-attaches them and patches their state.
+  function renderSkills() {
+    const idx = getSpecIndex(currentSubclassId);
+    if (!idx.cards.size && idx.skills.length) {
+      for (const s of idx.skills) {
+        const id = String(s.id);
+        if (!idx.cards.has(id)) idx.cards.set(id, buildCard(s));
+      }
+    }
+    if (!idx.dnaCards.size && idx.dna.length) {
+      for (const d of idx.dna) {
+        const id = String(d.id);
+        if (!idx.dnaCards.has(id)) idx.dnaCards.set(id, buildCard(d));
+      }
+    }
+
+    const skillCards = document.createDocumentFragment();
+    for (const view of idx.cards.values()) skillCards.appendChild(view.card);
+    skillsGrid.textContent = '';
+    skillsGrid.appendChild(skillCards);
+
+    const dnaCards = document.createDocumentFragment();
+    for (const view of idx.dnaCards.values()) dnaCards.appendChild(view.card);
+    dnaGrid.textContent = '';
+    dnaGrid.appendChild(dnaCards);
+
+    refreshSkills();
+    refreshDNA();
+    updatePoints();
   }
 
   function updatePoints() {
@@ -509,13 +717,16 @@
         pointsHint.textContent = 'Skill requirements enabled. Some skills require a certain level or other skills.';
       }
     }
+    // Runs after every allocation, level and spec change.
+    syncBuildCode();
   }
 
   // Reset allocation button
   if (btnReset) {
     btnReset.addEventListener('click', () => {
       allocated = { skills: {}, dna: {} };
-      renderSkills();
+      refreshSkills();
+      refreshDNA();
       updatePoints();
       hideTooltip();
     });
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Crash-safe file writes shared by pipeline.py, data_export.py and build_codes.py.
+
+Each write goes to a temporary file in the target directory, is fsynced and
+then renamed over the target, so readers see either the old file or the new
+one, never a partial write. The new file gets the mode of the file it
+replaces, or 0o666 minus the umask when there was none, like open() would
+give it (mkstemp alone would leave it readable by its owner only).
+"""
+import json
+import os
+import stat
+import tempfile
+from pathlib import Path
+
+from instrumentation import count, timed
+
+
+def _read_umask() -> int:
+    # os.umask() can only be read by setting it; done once, at import.
+    mask = os.umask(0o022)
+    os.umask(mask)
+    return mask
+
+
+_UMASK = _read_umask()
+
+
+def _target_mode(path: Path) -> int:
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        return 0o666 & ~_UMASK
+
+
+@timed(name='json.dumps')
+def _dumps(data: object) -> bytes:
+    return json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+
+
+def write_json_atomic(path: Path, data: object) -> None:
+    write_bytes_atomic(path, _dumps(data))
+
+
+@timed
+def write_bytes_atomic(path: Path, blob: bytes) -> None:
+    count('io.files_written')
+    count('io.bytes_written', len(blob))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=path.name + '.', suffix='.tmp', dir=str(path.parent))
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(blob)
+            f.flush()
+            if hasattr(os, 'fchmod'):  # not on Windows
+                os.fchmod(f.fileno(), _target_mode(path))
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+Reproducible benchmarks for the data pipeline and the build engine.
+
+Every run renders the synthetic corpus of the bundled data.json
+(synthetic_corpus.py, grown --scale times when given) into a temporary
+directory, so results do not depend on a local wiki mirror or the network,
+then times:
+
+    wiki.build_index     build_wiki_index() on a cold index, serial
+    wiki.extract         the parse_* extractors (extract_record) on every page
+    names.brute_force    comprehensive_name_fix.find_best_match() for a sample of names
+    names.apply_fixes    apply_name_fixes() with a fresh, uncached NameResolver
+    extract.build_data   extract_data.build_data() over the snapshot tree
+    extract.find_latest  find_latest_subclass_page() (one glob per spec) for a sample of specs
+    json.load / json.dump  the full data.json document
+    pipeline             every default pipeline.py stage on a cold wiki cache; the
+                         per-stage times come from the instrumentation trace
+    validate.compile     BuildValidator() over the whole document
+    validate.boolean / validate.messages  BuildValidator.validate_many() on random builds
+
+At --scale 100 or 1000 the wiki, name-matching and pipeline benchmarks
+take minutes per run; pick them with --only and lower --repeat and --filler.
+
+Each benchmark runs --repeat times after one warm-up; the median and the
+best time are kept along with a throughput in the benchmark's own unit.
+Results are written as JSON (--out). With --baseline the medians are
+compared to a previous results file and the run exits with status 1 when
+any benchmark got slower than --threshold (a fraction, default 0.25).
+"""
+import argparse
+import json
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from build_validation import DATA_JSON, MAX_LEVEL, BuildValidator, random_build
+from synthetic_corpus import load_data, write_corpus
+
+
+RESULTS_VERSION = 1
+ROOT = Path(__file__).resolve().parent
+
+
+class Benchmark(NamedTuple):
+    name: str
+    unit: str                        # what `items` counts (pages, names, builds, bytes, ...)
+    # Returns the timed callable; it returns the items done, optionally with {part: seconds}.
+    setup: Callable[['Fixtures'], Callable[[], Union[int, Tuple[int, Dict[str, float]]]]]
+
+
+class Fixtures:
+    """The rendered corpus plus inputs shared by several benchmarks."""
+
+    def __init__(self, data: dict, root: Path, seed: int, builds: int, filler: int = 12):
+        self.data = data
+        self.root = root
+        self.seed = seed
+        self.builds = builds
+        self.counts = write_corpus(data, root, seed, filler)
+        self.counts.update(specs=len(data.get('skills') or {}), skills=len(self.names()),
+                           dna=sum(len(v) for v in (data.get('dna') or {}).values()))
+        self.wiki_dir = root / 'wiki_cache'
+        self.snapshots = root / 'snapshots'
+        self.data_path = root / 'data.json'
+
+    def names(self) -> List[str]:
+        return [s['name'] for skills in self.data.get('skills', {}).values() for s in skills]
+
+
+def _wiki_build_index(fx: Fixtures) -> Callable[[], int]:
+    from wiki_index import build_wiki_index
+
+    index_path = fx.root / 'bench_index.json'
+
+    def run() -> int:
+        index_path.unlink(missing_ok=True)
+        return len(build_wiki_index(fx.wiki_dir, index_path=index_path, jobs=1))
+    return run
+
+
+def _wiki_extract(fx: Fixtures) -> Callable[[], int]:
+    from wiki_index import PAGE_GLOB, extract_record
+
+    pages = [(p.stem, p.read_text(encoding='utf-8')) for p in sorted(fx.wiki_dir.glob(PAGE_GLOB))]
+
+    def run() -> int:
+        for stem, html in pages:
+            extract_record(html, stem)
+        return len(pages)
+    return run
+
+
+def _names_brute_force(fx: Fixtures) -> Callable[[], int]:
+    from comprehensive_name_fix import find_best_match
+    from name_resolution import wiki_titles_from_filenames
+
+    titles = wiki_titles_from_filenames(fx.wiki_dir)
+    rng = random.Random(fx.seed)
+    names = rng.sample(fx.names(), min(60, len(fx.names())))
+    # Misspell half so the scan cannot stop on an exact title.
+    names = [n[::-1] if k % 2 else n for k, n in enumerate(names)]
+
+    def run() -> int:
+        for n in names:
+            find_best_match(n, titles, 0.8)
+        return len(names)
+    return run
+
+
+def _names_apply_fixes(fx: Fixtures) -> Callable[[], int]:
+    import copy
+    import io
+    from contextlib import redirect_stdout
+
+    from comprehensive_name_fix import apply_name_fixes
+    from name_resolution import NameResolver, wiki_titles_from_filenames
+
+    titles = wiki_titles_from_filenames(fx.wiki_dir)
+    total = len(fx.names()) + sum(len(v) for v in fx.data.get('dna', {}).values())
+
+    def run() -> int:
+        data = copy.deepcopy(fx.data)
+        with redirect_stdout(io.StringIO()):
+            apply_name_fixes(data, NameResolver(titles))
+        return total
+    return run
+
+
+def _extract_build_data(fx: Fixtures) -> Callable[[], int]:
+    from extract_data import build_data
+
+    def run() -> int:
+        return len(build_data(fx.snapshots)['skills'])
+    return run
+
+
+def _extract_find_latest(fx: Fixtures) -> Callable[[], int]:
+    from extract_data import find_latest_subclass_page
+
+    spec_ids = sorted(fx.data.get('skills') or {})
+    spec_ids = random.Random(fx.seed).sample(spec_ids, min(50, len(spec_ids)))
+
+    def run() -> int:
+        for spec_id in spec_ids:
+            find_latest_subclass_page(fx.snapshots, spec_id)
+        return len(spec_ids)
+    return run
+
+
+def _pipeline(fx: Fixtures) -> Callable[[], Tuple[int, Dict[str, float]]]:
+    import io
+    from contextlib import redirect_stdout
+
+    import instrumentation
+    import pipeline
+
+    out = fx.root / 'pipeline_out' / 'data.json'
+    caches = [fx.wiki_dir / 'wiki_index.json', fx.wiki_dir / 'name_cache.json']
+
+    def run() -> Tuple[int, Dict[str, float]]:
+        for p in caches:
+            p.unlink(missing_ok=True)
+        with instrumentation.tracing(fx.root / 'pipeline_trace.json') as trace, redirect_stdout(io.StringIO()):
+            pipeline.run_pipeline(pipeline.DEFAULT_STAGES, data_path=fx.data_path, output=out, wiki_dir=fx.wiki_dir)
+        return len(fx.names()), {s['name']: s['wall_s'] for s in trace.stages}
+    return run
+
+
+def _validate_compile(fx: Fixtures) -> Callable[[], int]:
+    def run() -> int:
+        return len(BuildValidator(fx.data).specs)
+    return run
+
+
+def _json_load(fx: Fixtures) -> Callable[[], int]:
+    def run() -> int:
+        blob = fx.data_path.read_bytes()
+        json.loads(blob)
+        return len(blob)
+    return run
+
+
+def _json_dump(fx: Fixtures) -> Callable[[], int]:
+    def run() -> int:
+        return len(json.dumps(fx.data, ensure_ascii=False, indent=2).encode('utf-8'))
+    return run
+
+
+def _validate(messages: bool) -> Callable[[Fixtures], Callable[[], int]]:
+    def setup(fx: Fixtures) -> Callable[[], int]:
+        validator = BuildValidator(fx.data)
+        rng = random.Random(fx.seed)
+        specs = [s for s in validator.specs.values() if s.ids]
+        builds = []
+        for n in range(fx.builds):
+            spec = rng.choice(specs)
+            level = rng.randint(1, MAX_LEVEL)
+            skills = random_build(spec, level, rng)
+            if n % 2 and skills:
+                skills[rng.choice(list(skills))] += rng.randint(1, 5)
+            builds.append({'spec': spec.spec_id, 'level': level, 'skills': skills})
+
+        def run() -> int:
+            for _ in validator.validate_many(builds, messages):
+                pass
+            return len(builds)
+        return run
+    return setup
+
+
+BENCHMARKS: Dict[str, Benchmark] = {b.name: b for b in [
+    Benchmark('wiki.build_index', 'pages', _wiki_build_index),
+    Benchmark('wiki.extract', 'pages', _wiki_extract),
+    Benchmark('names.brute_force', 'names', _names_brute_force),
+    Benchmark('names.apply_fixes', 'names', _names_apply_fixes),
+    Benchmark('extract.build_data', 'specs', _extract_build_data),
+    Benchmark('extract.find_latest', 'specs', _extract_find_latest),
+    Benchmark('json.load', 'bytes', _json_load),
+    Benchmark('json.dump', 'bytes', _json_dump),
+    Benchmark('pipeline', 'skills', _pipeline),
+    Benchmark('validate.compile', 'specs', _validate_compile),
+    Benchmark('validate.boolean', 'builds', _validate(False)),
+    Benchmark('validate.messages', 'builds', _validate(True)),
+]}
+
+
+def time_benchmark(bench: Benchmark, fx: Fixtures, repeat: int) -> dict:
+    run = bench.setup(fx)
+    run()  # warm-up: imports, caches, page cache
+    times = []
+    parts: Dict[str, List[float]] = {}
+    items = 0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        done = run()
+        times.append(time.perf_counter() - t0)
+        items, split = done if isinstance(done, tuple) else (done, {})
+        for part, seconds in split.items():
+            parts.setdefault(part, []).append(seconds)
+    median = statistics.median(times)
+    result = {
+        'unit': bench.unit, 'items': items, 'repeat': repeat,
+        'median_s': median, 'min_s': min(times), 'max_s': max(times),
+        'per_sec': items / median if median else 0.0,
+    }
+    if parts:
+        result['parts'] = {part: statistics.median(t) for part, t in parts.items()}
+    return result
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def run_suite(data: dict, names: Sequence[str], repeat: int = 5, seed: int = 1, builds: int = 5000,
+              workdir: Optional[Path] = None, scale: int = 0, filler: int = 12) -> dict:
+    root = Path(tempfile.mkdtemp(prefix='bench_', dir=workdir))
+    try:
+        t0 = time.perf_counter()
+        fx = Fixtures(data, root, seed, builds, filler)
+        c = fx.counts
+        print(f"corpus: {c['specs']} specs, {c['skills']} skills, {c['dna']} DNA, {c['wiki_pages']} wiki pages "
+              f"(rendered in {time.perf_counter() - t0:.1f}s)", flush=True)
+        results = {}
+        for name in names:
+            results[name] = time_benchmark(BENCHMARKS[name], fx, repeat)
+            r = results[name]
+            print(f"{name:<20} {r['median_s'] * 1000:>10.2f} ms  (min {r['min_s'] * 1000:.2f})  "
+                  f"{r['per_sec']:>14,.0f} {r['unit']}/s", flush=True)
+            for part, seconds in r.get('parts', {}).items():
+                print(f"  {part:<18} {seconds * 1000:>10.2f} ms", flush=True)
+        return {
+            'version': RESULTS_VERSION,
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'corpus': dict(fx.counts, scale=scale, seed=seed, builds=builds, filler=filler),
+            'benchmarks': results,
+        }
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+def _medians(results: dict) -> Dict[str, float]:
+    """benchmark -> median seconds, with each part of a split benchmark as 'benchmark/part'."""
+    out = {}
+    for name, r in results.get('benchmarks', {}).items():
+        out[name] = r['median_s']
+        for part, seconds in r.get('parts', {}).items():
+            out[f"{name}/{part}"] = seconds
+    return out
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> List[str]:
+    """Benchmarks whose median got slower than the baseline by more than `threshold`, as report lines."""
+    regressions = []
+    base_medians = _medians(baseline)
+    for name, median in _medians(current).items():
+        base = base_medians.get(name)
+        if not base:
+            print(f"{name:<28} (no baseline)")
+            continue
+        ratio = median / base
+        verdict = 'REGRESSION' if ratio > 1 + threshold else ('faster' if ratio < 1 - threshold else 'ok')
+        line = f"{name:<28} {base * 1000:>10.2f} -> {median * 1000:>10.2f} ms  {ratio:6.2f}x  {verdict}"
+        print(line)
+        if verdict == 'REGRESSION':
+            regressions.append(line)
+    if baseline.get('corpus') and baseline['corpus'] != current.get('corpus'):
+        print(f"note: corpus differs from the baseline's ({baseline['corpus']} vs {current.get('corpus')})")
+    return regressions
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark the data pipeline and build engine on synthetic fixtures")
+    ap.add_argument('--data', default=str(DATA_JSON), help="document the fixtures are rendered from")
+    ap.add_argument('--scale', type=int, default=0,
+                    help="grow the document this many times first (synthetic_corpus.scale_data), e.g. 10, 100, 1000")
+    ap.add_argument('--filler', type=int, default=12, help="filler sections per synthetic wiki page")
+    ap.add_argument('--only', default='', help="comma-separated benchmarks or prefixes (e.g. wiki,json.load)")
+    ap.add_argument('--repeat', type=int, default=5, help="timed runs per benchmark after one warm-up")
+    ap.add_argument('--builds', type=int, default=5000, help="random builds for the validate.* benchmarks")
+    ap.add_argument('--seed', type=int, default=1)
+    ap.add_argument('--out', help="write results as JSON")
+    ap.add_argument('--baseline', help="results JSON to compare against")
+    ap.add_argument('--threshold', type=float, default=0.25,
+                    help="fail when a median is this fraction slower than the baseline (default: %(default)s)")
+    ap.add_argument('--list', action='store_true', help="list the benchmarks and exit")
+    args = ap.parse_args()
+
+    if args.list:
+        for b in BENCHMARKS.values():
+            print(f"{b.name:<20} {b.unit}")
+        return
+
+    names = list(BENCHMARKS)
+    if args.only:
+        wanted = [w.strip() for w in args.only.split(',') if w.strip()]
+        names = [n for n in names if any(n == w or n.startswith(w + '.') for w in wanted)]
+        if not names:
+            raise SystemExit(f"no benchmark matches {args.only!r}; see --list")
+
+    data = load_data(Path(args.data), args.scale, args.seed)
+    results = run_suite(data, names, args.repeat, args.seed, args.builds, scale=args.scale, filler=args.filler)
+    if args.out:
+        Path(args.out).write_text(json.dumps(results, indent=2), encoding='utf-8')
+        print(f"Wrote {args.out}")
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding='utf-8'))
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+Compact, versioned build codes shared with app.js.
+
+A code is URL-safe base64 (no padding) of:
+
+- one byte: code format (FORMAT_VERSION);
+- the spec's slot number in the layout, as a LEB128 varint;
+- one byte: character level;
+- the spec's skill and DNA levels, bit-packed LSB-first in layout order,
+  each in its slot's width, with trailing zero bytes dropped.
+
+build_layout.json fixes the slot order. It starts from data.json order and
+is append-only: a refresh that adds specs, skills or DNA appends slots,
+and slots of entries that disappear are kept. Since missing trailing bits
+decode as 0, every code ever issued decodes to the same build under any
+later layout. data_export.publish() updates it next to the data files.
+"""
+import argparse
+import base64
+import json
+import random
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Tuple
+
+from atomic_io import write_json_atomic
+from build_validation import DATA_JSON, MAX_LEVEL, BuildValidator, DEFAULT_MAX_SKILL_LEVEL, random_build
+
+
+ROOT = Path(__file__).resolve().parent
+LAYOUT_NAME = 'build_layout.json'
+LAYOUT_JSON = ROOT / LAYOUT_NAME
+FORMAT_VERSION = 1
+MIN_SLOT_BITS = 4
+SKILL, DNA = 's', 'd'
+
+
+class Build(NamedTuple):
+    spec: str
+    level: int
+    skills: Dict[str, int]
+    dna: Dict[str, int]
+
+    def as_dict(self) -> dict:
+        """The {'spec', 'level', 'skills', 'dna'} shape build_validation reads."""
+        return self._asdict()
+
+
+def _slot_bits(entry: dict) -> int:
+    return max(MIN_SLOT_BITS, int(entry.get('maxLevel') or DEFAULT_MAX_SKILL_LEVEL).bit_length())
+
+
+def update_layout(data: Mapping[str, object], layout: Optional[dict] = None) -> Tuple[dict, int]:
+    """
+    Appends every spec, skill and DNA of `data` missing from `layout`.
+    Returns (layout, slots added). Raises ValueError when an existing slot is
+    too narrow for a new maxLevel, which needs a new FORMAT_VERSION.
+    """
+    layout = layout or {'format': FORMAT_VERSION, 'specs': []}
+    specs = {s['id']: s for s in layout['specs']}
+    added = 0
+    skills = data.get('skills') or {}
+    dna = data.get('dna') or {}
+    for spec_id in list(skills) + [k for k in dna if k not in skills]:
+        spec = specs.get(str(spec_id))
+        if spec is None:
+            spec = specs[str(spec_id)] = {'id': str(spec_id), 'slots': []}
+            layout['specs'].append(spec)
+        known = {(kind, sid): bits for kind, sid, bits in spec['slots']}
+        for kind, entries in ((SKILL, skills.get(spec_id) or []), (DNA, dna.get(spec_id) or [])):
+            for e in entries:
+                key = (kind, str(e.get('id')))
+                bits = _slot_bits(e)
+                if key not in known:
+                    spec['slots'].append([kind, key[1], bits])
+                    known[key] = bits
+                    added += 1
+                elif known[key] < bits:
+                    raise ValueError(f"spec {spec_id}: {e.get('name')} needs {bits} bits, "
+                                     f"its slot has {known[key]}; bump FORMAT_VERSION")
+    return layout, added
+
+
+def read_layout(path: Path = LAYOUT_JSON) -> Optional[dict]:
+    try:
+        return json.loads(Path(path).read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+
+
+def _varint(n: int) -> bytes:
+    out = bytearray()
+    while True:
+        b = n & 0x7F
+        n >>= 7
+        out.append(b | (0x80 if n else 0))
+        if not n:
+            return bytes(out)
+
+
+class _SpecSlots(NamedTuple):
+    number: int
+    spec: str
+    kinds: List[str]
+    ids: List[str]
+    widths: List[int]
+    shifts: List[int]
+    masks: List[int]
+    index: Dict[Tuple[str, str], int]
+
+
+class BuildCodec:
+    """Encodes and decodes build codes against one layout."""
+
+    def __init__(self, layout: dict):
+        if layout.get('format') != FORMAT_VERSION:
+            raise ValueError(f"unsupported layout format {layout.get('format')}")
+        self.specs: List[_SpecSlots] = []
+        self.by_spec: Dict[str, _SpecSlots] = {}
+        for number, spec in enumerate(layout['specs']):
+            shifts, masks, shift = [], [], 0
+            for _, _, bits in spec['slots']:
+                shifts.append(shift)
+                masks.append((1 << bits) - 1)
+                shift += bits
+            slots = _SpecSlots(
+                number, spec['id'],
+                [kind for kind, _, _ in spec['slots']], [sid for _, sid, _ in spec['slots']],
+                [bits for _, _, bits in spec['slots']], shifts, masks,
+                {(kind, sid): i for i, (kind, sid, _) in enumerate(spec['slots'])},
+            )
+            self.specs.append(slots)
+            self.by_spec[spec['id']] = slots
+
+    @classmethod
+    def from_file(cls, path: Path = LAYOUT_JSON) -> 'BuildCodec':
+        layout = read_layout(path)
+        if layout is None:
+            raise FileNotFoundError(f"no build layout at {path}; run data_export.py or build_codes.py --update-layout")
+        return cls(layout)
+
+    def encode(self, spec_id, level: int, skills: Mapping[str, int], dna: Optional[Mapping[str, int]] = None) -> str:
+        slots = self.by_spec.get(str(spec_id))
+        if slots is None:
+            raise KeyError(f"spec {spec_id} is not in the build layout")
+        packed = 0
+        for kind, levels in ((SKILL, skills), (DNA, dna or {})):
+            for sid, lvl in levels.items():
+                lvl = int(lvl)
+                if not lvl:
+                    continue
+                i = slots.index.get((kind, str(sid)))
+                if i is None:
+                    raise KeyError(f"{'skill' if kind == SKILL else 'DNA'} {sid} is not in the layout of spec {spec_id}")
+                if lvl < 0 or lvl > slots.masks[i]:
+                    raise ValueError(f"level {lvl} does not fit the slot of {sid}")
+                packed |= lvl << slots.shifts[i]
+        body = packed.to_bytes((packed.bit_length() + 7) // 8, 'little')
+        level = max(1, min(MAX_LEVEL, int(level or 1)))
+        raw = bytes([FORMAT_VERSION]) + _varint(slots.number) + bytes([level]) + body
+        return base64.urlsafe_b64encode(raw).rstrip(b'=').decode('ascii')
+
+    def decode(self, code: str) -> Build:
+        """Raises ValueError for a malformed code or one from an unknown format or spec."""
+        try:
+            raw = base64.urlsafe_b64decode(code + '=' * (-len(code) % 4))
+        except (ValueError, TypeError):
+            raise ValueError(f"not a build code: {code!r}") from None
+        if len(raw) < 3 or raw[0] != FORMAT_VERSION:
+            raise ValueError(f"unsupported build code: {code!r}")
+        number, shift, pos = 0, 0, 1
+        while True:
+            if pos >= len(raw):
+                raise ValueError(f"truncated build code: {code!r}")
+            b = raw[pos]
+            pos += 1
+            number |= (b & 0x7F) << shift
+            shift += 7
+            if not b & 0x80:
+                break
+        if number >= len(self.specs) or pos >= len(raw):
+            raise ValueError(f"unknown spec in build code: {code!r}")
+        slots = self.specs[number]
+        level = raw[pos]
+        packed = int.from_bytes(raw[pos + 1:], 'little')
+        skills: Dict[str, int] = {}
+        dna: Dict[str, int] = {}
+        kinds, ids, widths, masks = slots.kinds, slots.ids, slots.widths, slots.masks
+        i = 0
+        while packed and i < len(ids):
+            lvl = packed & masks[i]
+            packed >>= widths[i]
+            if lvl:
+                (skills if kinds[i] == SKILL else dna)[ids[i]] = lvl
+            i += 1
+        if packed:
+            raise ValueError(f"build code has more slots than the layout of spec {slots.spec}: {code!r}")
+        return Build(slots.spec, level, skills, dna)
+
+    def decode_many(self, codes: Iterable[str]) -> Iterator[Optional[Build]]:
+        """Decodes a stream of codes; malformed ones come out as None."""
+        decode = self.decode
+        for code in codes:
+            try:
+                yield decode(code)
+            except ValueError:
+                yield None
+
+
+def validate_codes(codec: BuildCodec, validator: BuildValidator, codes: Iterable[str],
+                   batch_size: int = 10000) -> Iterator[List[Optional[bool]]]:
+    """Decodes and validates codes a batch at a time: per code True/False, or None if it doesn't decode."""
+    batch: List[str] = []
+    for code in codes:
+        batch.append(code)
+        if len(batch) >= batch_size:
+            yield _validate_batch(codec, validator, batch)
+            batch = []
+    if batch:
+        yield _validate_batch(codec, validator, batch)
+
+
+def _validate_batch(codec: BuildCodec, validator: BuildValidator, codes: List[str]) -> List[Optional[bool]]:
+    out: List[Optional[bool]] = []
+    is_valid = validator.is_valid
+    for build in codec.decode_many(codes):
+        out.append(None if build is None else is_valid(build.spec, build.skills, build.level, build.dna))
+    return out
+
+
+def _bench(codec: BuildCodec, validator: BuildValidator, count: int, seed: int) -> None:
+    rng = random.Random(seed)
+    spec_ids = [sid for sid, s in validator.specs.items() if s.ids and sid in codec.by_spec]
+    samples = []
+    for _ in range(200):
+        spec = validator.specs[rng.choice(spec_ids)]
+        level = rng.randint(1, MAX_LEVEL)
+        dna = {did: rng.randint(0, 3) for did in spec.dna_ids[:rng.randint(0, len(spec.dna_ids))]}
+        samples.append(codec.encode(spec.spec_id, level, random_build(spec, level, rng), dna))
+    codes = [samples[n % len(samples)] for n in range(count)]
+    print(f"code length: {min(map(len, samples))}-{max(map(len, samples))} chars")
+
+    t0 = time.perf_counter()
+    for _ in codec.decode_many(codes):
+        pass
+    dt = time.perf_counter() - t0
+    print(f"  decode: {count} codes in {dt:.3f}s = {count / dt * 60:,.0f} codes/min")
+
+    t0 = time.perf_counter()
+    valid = sum(sum(1 for ok in batch if ok) for batch in validate_codes(codec, validator, codes))
+    dt = time.perf_counter() - t0
+    print(f"validate: {count} codes in {dt:.3f}s = {count / dt * 60:,.0f} codes/min ({valid} valid)")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Encode, decode and validate build codes")
+    ap.add_argument('--data', default=str(DATA_JSON))
+    ap.add_argument('--layout', default=str(LAYOUT_JSON))
+    ap.add_argument('--update-layout', action='store_true', help="append new specs/skills/DNA from --data to --layout")
+    ap.add_argument('--decode', metavar='FILE', help="decode one code per line to JSON lines (build_validation.py --builds format)")
+    ap.add_argument('--validate', metavar='FILE', help="decode and validate one code per line; prints a summary")
+    ap.add_argument('--bench', type=int, metavar='N', help="decode and validate N codes and report codes/min")
+    ap.add_argument('--seed', type=int, default=1)
+    args = ap.parse_args()
+
+    layout_path = Path(args.layout)
+    if args.update_layout:
+        data = json.loads(Path(args.data).read_text(encoding='utf-8'))
+        layout, added = update_layout(data, read_layout(layout_path))
+        write_json_atomic(layout_path, layout)
+        print(f"{layout_path.name}: {added} slots added, {len(layout['specs'])} specs")
+
+    codec = BuildCodec.from_file(layout_path)
+    if args.decode:
+        with open(args.decode, encoding='utf-8') as f:
+            for build in codec.decode_many(line.strip() for line in f if line.strip()):
+                print(json.dumps(build.as_dict() if build else None))
+    if args.validate or args.bench:
+        validator = BuildValidator.from_file(Path(args.data))
+    if args.validate:
+        counts = {True: 0, False: 0, None: 0}
+        with open(args.validate, encoding='utf-8') as f:
+            for batch in validate_codes(codec, validator, (line.strip() for line in f if line.strip())):
+                for ok in batch:
+                    counts[ok] += 1
+        print(f"{counts[True]} valid, {counts[False]} invalid, {counts[None]} undecodable")
+    if args.bench:
+        _bench(codec, validator, args.bench, args.seed)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,337 @@
+#!/usr/bin/env python3
+"""
+Search over the legal builds of a spec at a character level.
+
+Constraints are a minimum level per skill ("at least 3 in A"), a maximum
+level per skill ("no points in B" is a maximum of 0) and a minimum number of
+points spent. They are propagated before searching: the minimums pull in
+their prerequisite closure (build_solver), and every skill whose gates, max
+constraint or prerequisites can't be met is capped, dependents included, in
+one topological pass.
+
+Skills are then decided in topological order, so when a skill is decided
+all of its prerequisites already are. What the undecided skills still
+depend on is the remaining points and the levels of the decided skills they
+require (the frontier); partial states with the same (position, points,
+frontier) have the same completions, so their build count and best
+objective are memoized. Counting all builds is that DP; listing builds and
+the top-k search walk the tree and never enter a subtree the DP says is
+empty or can't beat the current k-th best.
+
+The objective is either points spent or a column of each skill's
+`progression` table, read at the allocated level.
+"""
+import argparse
+import heapq
+import itertools
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, Iterator, List, Mapping, NamedTuple, Optional, Tuple
+
+from build_solver import BuildSolver, _parse_target
+from build_validation import DATA_JSON, MAX_LEVEL, CompiledSpec, clamp_level, skill_points_cap
+
+
+_NUMBER = re.compile(r'-?\d+(?:\.\d+)?')
+
+
+class SearchQuery(NamedTuple):
+    char_level: int
+    min_levels: Optional[Mapping[str, int]] = None  # skill id or name -> at least this level
+    max_levels: Optional[Mapping[str, int]] = None  # skill id or name -> at most this level
+    min_points: int = 0
+    spend_all: bool = False                         # min_points = the level's whole skill point cap
+    objective: Optional[str] = None                 # progression column; None = points spent
+
+
+def progression_values(skill: dict, column: Optional[str], max_level: int) -> List[float]:
+    """Objective value of each level 0..max_level of a skill."""
+    if column is None:
+        return [float(lvl) for lvl in range(max_level + 1)]
+    prog = {str(k).lower(): v for k, v in (skill.get('progression') or {}).items()}
+    cells = prog.get(column.lower()) or []
+    values = [0.0]
+    for lvl in range(1, max_level + 1):
+        cell = cells[lvl - 1] if lvl - 1 < len(cells) else None
+        if isinstance(cell, (int, float)) and not isinstance(cell, bool):
+            values.append(float(cell))
+        else:
+            m = _NUMBER.search(str(cell or ''))
+            values.append(float(m.group()) if m else 0.0)
+    return values
+
+
+class SpecSearch:
+    """The build space of one spec under one query."""
+
+    def __init__(self, spec: CompiledSpec, query: SearchQuery, solver: BuildSolver):
+        self.spec = spec
+        self.char_level = clamp_level(query.char_level)
+        self.cap = skill_points_cap(self.char_level)
+        self.min_points = self.cap if query.spend_all else query.min_points
+        self.nodes = 0
+        self.reason: Optional[str] = None
+        self._memo: Dict[tuple, Tuple[int, Optional[float]]] = {}
+        n = len(spec.ids)
+
+        # Lower bounds: the cheapest build meeting the minimums.
+        base = solver.solve(spec.spec_id, query.min_levels or {}, self.char_level)
+        if not base.feasible:
+            self.reason = '; '.join(base.errors)
+        self.lo = [0] * n
+        for sid, lvl in base.skills.items():
+            self.lo[spec.index[sid]] = lvl
+
+        # Upper bounds: max level, lvlReq and job gates, the max constraints, then prerequisites.
+        self.hi = [0] * n
+        for i in range(n):
+            h = 0 if spec.in_cycle[i] or spec.job_gate[i] > self.char_level else spec.max_level[i]
+            while h and spec.rank_gate[i][h] > self.char_level:
+                h -= 1
+            self.hi[i] = h
+        for key, lvl in (query.max_levels or {}).items():
+            i = solver.resolve_skill(spec, key)
+            if i is not None:
+                self.hi[i] = min(self.hi[i], max(0, int(lvl)))
+        for i in spec.topo_order:
+            for t, need in self._prereqs(i):
+                if t < 0 or self.hi[t] < need:
+                    self.hi[i] = 0
+        if self.reason is None:
+            for i in range(n):
+                if self.lo[i] > self.hi[i]:
+                    self.reason = f"{spec.names[i]}: needs Lv.{self.lo[i]}, at most Lv.{self.hi[i]} is reachable"
+                    break
+
+        self.order = list(spec.topo_order)
+        self.prereqs = [self._prereqs(i) for i in self.order]
+        self.value = [progression_values(spec.skills[i], query.objective, spec.max_level[i]) for i in range(n)]
+
+        position = {i: k for k, i in enumerate(self.order)}
+        last_use: Dict[int, int] = {}
+        for k, prereqs in enumerate(self.prereqs):
+            for t, _ in prereqs:
+                if t >= 0:  # a required skill outside the spec has no level to remember
+                    last_use[t] = k
+        self.frontier = [
+            [t for t, last in last_use.items() if position[t] < k <= last]
+            for k in range(len(self.order) + 1)
+        ]
+        self.suffix_lo = [0] * (len(self.order) + 1)
+        self.suffix_hi = [0] * (len(self.order) + 1)
+        for k in range(len(self.order) - 1, -1, -1):
+            self.suffix_lo[k] = self.suffix_lo[k + 1] + self.lo[self.order[k]]
+            self.suffix_hi[k] = self.suffix_hi[k + 1] + self.hi[self.order[k]]
+
+    def _prereqs(self, i: int) -> List[Tuple[int, int]]:
+        spec = self.spec
+        return [(spec.edge_target[e], spec.edge_level[e]) for e in range(spec.edge_start[i], spec.edge_start[i + 1])]
+
+    def _choices(self, k: int, levels: List[int], rem: int) -> range:
+        i = self.order[k]
+        for t, need in self.prereqs[k]:
+            if t < 0 or levels[t] < need:
+                return range(0, 1) if self.lo[i] == 0 else range(0)
+        return range(self.lo[i], min(self.hi[i], rem) + 1)
+
+    def _state(self, k: int, rem: int, levels: List[int]) -> Tuple[int, Optional[float]]:
+        """(number of completions, best objective over them) of a partial build."""
+        if rem < self.suffix_lo[k] or self.cap - rem + self.suffix_hi[k] < self.min_points:
+            return 0, None
+        if k == len(self.order):
+            return 1, 0.0
+        key = (k, rem) + tuple(levels[t] for t in self.frontier[k])
+        hit = self._memo.get(key)
+        if hit is not None:
+            return hit
+        self.nodes += 1
+        i = self.order[k]
+        total, best = 0, None
+        for lvl in self._choices(k, levels, rem):
+            levels[i] = lvl
+            count, sub = self._state(k + 1, rem - lvl, levels)
+            if count:
+                total += count
+                v = sub + self.value[i][lvl]
+                if best is None or v > best:
+                    best = v
+        levels[i] = 0
+        self._memo[key] = (total, best)
+        return total, best
+
+    def count(self) -> int:
+        """Number of legal builds (the empty build included, unless a minimum rules it out)."""
+        if self.reason:
+            return 0
+        return self._state(0, self.cap, [0] * len(self.spec.ids))[0]
+
+    def builds(self) -> Iterator[Dict[str, int]]:
+        """Every legal build, as {skill id: level}."""
+        if self.reason:
+            return
+        levels = [0] * len(self.spec.ids)
+        ids = self.spec.ids
+
+        def walk(k: int, rem: int) -> Iterator[Dict[str, int]]:
+            if k == len(self.order):
+                yield {ids[i]: lvl for i, lvl in enumerate(levels) if lvl}
+                return
+            i = self.order[k]
+            for lvl in self._choices(k, levels, rem):
+                levels[i] = lvl
+                self.nodes += 1
+                if self._state(k + 1, rem - lvl, levels)[0]:
+                    yield from walk(k + 1, rem - lvl)
+            levels[i] = 0
+
+        yield from walk(0, self.cap)
+
+    def top(self, k: int) -> List[Tuple[float, Dict[str, int]]]:
+        """The k legal builds with the highest objective, best first (ties broken arbitrarily)."""
+        if self.reason or k <= 0:
+            return []
+        heap: List[Tuple[float, int, Dict[str, int]]] = []
+        levels = [0] * len(self.spec.ids)
+        ids = self.spec.ids
+        seq = itertools.count()
+
+        def walk(pos: int, rem: int, value: float) -> None:
+            if pos == len(self.order):
+                build = {ids[i]: lvl for i, lvl in enumerate(levels) if lvl}
+                entry = (value, next(seq), build)
+                if len(heap) < k:
+                    heapq.heappush(heap, entry)
+                elif value > heap[0][0]:
+                    heapq.heapreplace(heap, entry)
+                return
+            i = self.order[pos]
+            options = []
+            for lvl in self._choices(pos, levels, rem):
+                levels[i] = lvl
+                count, sub = self._state(pos + 1, rem - lvl, levels)
+                if count:
+                    options.append((value + self.value[i][lvl] + sub, lvl))
+            levels[i] = 0
+            options.sort(reverse=True)
+            for bound, lvl in options:
+                # The DP bound is exact, so nothing below the current k-th best is worth visiting.
+                if len(heap) >= k and bound <= heap[0][0]:
+                    break
+                levels[i] = lvl
+                self.nodes += 1
+                walk(pos + 1, rem - lvl, value + self.value[i][lvl])
+            levels[i] = 0
+
+        walk(0, self.cap, 0.0)
+        return [(value, build) for value, _, build in sorted(heap, key=lambda e: (-e[0], e[1]))]
+
+
+_worker_solver: Optional[BuildSolver] = None
+
+
+def _init_worker(data_path: str) -> None:
+    global _worker_solver
+    _worker_solver = BuildSolver.from_file(Path(data_path))
+
+
+def search_spec(spec_id: str, query: SearchQuery, top: int = 0, limit: int = 0,
+                solver: Optional[BuildSolver] = None) -> dict:
+    """Counts the legal builds of one spec, plus its `top` best and first `limit` builds."""
+    solver = solver or _worker_solver
+    t0 = time.perf_counter()
+    search = SpecSearch(solver.validator.spec(spec_id), query, solver)
+    result = {'spec': spec_id, 'reason': search.reason, 'count': search.count(), 'top': [], 'builds': []}
+    if top:
+        result['top'] = search.top(top)
+    if limit:
+        for n, build in enumerate(search.builds()):
+            if n >= limit:
+                break
+            result['builds'].append(build)
+    result['nodes'] = search.nodes
+    result['seconds'] = time.perf_counter() - t0
+    return result
+
+
+def search_specs(data_path: Path, spec_ids: List[str], query: SearchQuery, top: int = 0, limit: int = 0,
+                 jobs: int = 1) -> Iterator[dict]:
+    """search_spec() over many specs, across `jobs` processes (0 = one per CPU), yielding as each finishes."""
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+    if jobs > 1 and len(spec_ids) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(spec_ids)),
+                                 initializer=_init_worker, initargs=(str(data_path),)) as pool:
+            futures = [pool.submit(search_spec, sid, query, top, limit) for sid in spec_ids]
+            for fut in as_completed(futures):
+                yield fut.result()
+    else:
+        solver = BuildSolver.from_file(data_path)
+        for sid in spec_ids:
+            yield search_spec(sid, query, top, limit, solver)
+
+
+def _parse_levels(items: List[str], default: int) -> Dict[str, int]:
+    out = {}
+    for item in items:
+        key, lvl = _parse_target(item) if '=' in item else (item, default)
+        out[key] = lvl
+    return out
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Count, list or rank the legal builds of each spec")
+    ap.add_argument('--data', default=str(DATA_JSON))
+    ap.add_argument('--spec', action='append', default=[], help="spec id; repeatable (default: every spec)")
+    ap.add_argument('--level', type=int, default=MAX_LEVEL, help="character level (default: %(default)s)")
+    ap.add_argument('--min', action='append', default=[], metavar='SKILL=LEVEL', help="at least this level")
+    ap.add_argument('--max', action='append', default=[], metavar='SKILL=LEVEL', help="at most this level")
+    ap.add_argument('--none', action='append', default=[], metavar='SKILL', help="no points in this skill")
+    ap.add_argument('--min-points', type=int, default=0, help="spend at least this many skill points")
+    ap.add_argument('--spend-all', action='store_true', help="spend every skill point of the level")
+    ap.add_argument('--objective', help="progression column to maximize (default: points spent)")
+    ap.add_argument('--top', type=int, default=0, metavar='K', help="find the K best builds per spec")
+    ap.add_argument('--list', type=int, default=0, metavar='N', help="list the first N legal builds per spec")
+    ap.add_argument('--out', help="write the found builds as JSON lines (build_validation.py --builds format)")
+    ap.add_argument('--jobs', type=int, default=1, help="specs to search in parallel (0 = one per CPU)")
+    args = ap.parse_args()
+
+    max_levels = _parse_levels(args.max, 0)
+    max_levels.update({key: 0 for key in args.none})
+    query = SearchQuery(args.level, _parse_levels(args.min, 1), max_levels,
+                        args.min_points, args.spend_all, args.objective)
+    data_path = Path(args.data)
+    spec_ids = args.spec or list(json.loads(data_path.read_text(encoding='utf-8')).get('skills') or {})
+
+    out = open(args.out, 'w', encoding='utf-8') if args.out else None
+    t0 = time.perf_counter()
+    nodes = 0
+    try:
+        for done, r in enumerate(search_specs(data_path, spec_ids, query, args.top, args.list, args.jobs), 1):
+            nodes += r['nodes']
+            rate = r['nodes'] / r['seconds'] if r['seconds'] else 0
+            status = f"infeasible ({r['reason']})" if r['reason'] else f"{r['count']:,} legal builds"
+            print(f"[{done}/{len(spec_ids)}] spec {r['spec']}: {status}, "
+                  f"{r['nodes']:,} nodes in {r['seconds']:.2f}s ({rate:,.0f} nodes/sec)")
+            for value, build in r['top']:
+                if out:
+                    out.write(json.dumps({'spec': r['spec'], 'level': args.level, 'skills': build, 'value': value}) + '\n')
+                else:
+                    print(f"    {value:g}: {build}")
+            for build in r['builds']:
+                if out:
+                    out.write(json.dumps({'spec': r['spec'], 'level': args.level, 'skills': build}) + '\n')
+                else:
+                    print(f"    {build}")
+    finally:
+        if out:
+            out.close()
+    dt = time.perf_counter() - t0
+    print(f"Searched {len(spec_ids)} specs in {dt:.2f}s: {nodes:,} nodes ({nodes / dt if dt else 0:,.0f} nodes/sec)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Build validation over HTTP, so the backend doesn't have to trust app.js.
+
+data.json is compiled at startup (build_validation.BuildValidator) and
+recompiled in the background whenever a new version is published
+(data_provider.DataProvider, polled every --watch-interval seconds or on
+SIGHUP). Each request is checked against the snapshot that was active when
+it arrived, so a reload never fails or mixes data into in-flight requests.
+Endpoints take and return JSON:
+
+    GET  /health                                  -> {"ok": true, "specs": n, "data_version": ..., ...}
+    POST /validate   {spec, level, skills, dna}   -> ValidationResult fields + remaining points
+    POST /unmet      {spec, level, skills, skill} -> {"messages": [...]} as unmetRequirementsMessage
+    POST /remaining  {spec, level, skills, dna}   -> remaining skill/DNA points under LEVEL_POINTS / BASE_DNA_POINTS
+
+Instead of spec/skills/dna a body may carry {"code": "..."}, a build code
+from build_codes.py (the level in the code is used unless "level" is given).
+
+Requests are micro-batched: handlers queue their check and wait, and one
+batcher task takes everything queued within --batch-delay-ms (up to
+--max-batch) and runs it on a worker thread, keeping the event loop free
+for socket I/O. Within a batch the /validate builds of each spec are
+validated in one CompiledSpec.validate_batch pass. The HTTP layer
+is a small HTTP/1.1 implementation on asyncio streams with keep-alive.
+"""
+import argparse
+import asyncio
+import json
+import signal
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from build_validation import BASE_DNA_POINTS, DATA_JSON, BuildValidator, clamp_level, skill_points_cap
+from data_provider import DataProvider
+
+
+MAX_BODY = 1 << 20
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           413: 'Payload Too Large', 500: 'Internal Server Error'}
+CHECKS = ('validate', 'unmet', 'remaining')
+
+
+class BadRequest(ValueError):
+    pass
+
+
+class BuildChecker:
+    """The checks behind the endpoints, run a batch at a time."""
+
+    def __init__(self, validator: BuildValidator, codec=None):
+        self.validator = validator
+        self.codec = codec
+
+    def _build(self, body: dict) -> Tuple[object, int, Dict[str, int], Dict[str, int]]:
+        if not isinstance(body, dict):
+            raise BadRequest("body must be a JSON object")
+        if body.get('code'):
+            if self.codec is None:
+                raise BadRequest("build codes are not enabled (no build layout)")
+            decoded = self.codec.decode(str(body['code']))
+            spec_id, level, skills, dna = decoded.spec, decoded.level, decoded.skills, decoded.dna
+        else:
+            spec_id, level = body.get('spec'), body.get('level')
+            skills, dna = body.get('skills') or {}, body.get('dna') or {}
+        if body.get('level') is not None:
+            level = body['level']
+        if not isinstance(skills, dict) or not isinstance(dna, dict):
+            raise BadRequest("skills and dna must be objects of id -> level")
+        spec = self.validator.specs.get(str(spec_id))
+        if spec is None:
+            raise BadRequest(f"unknown spec {spec_id}")
+        skills = {str(k): int(v) for k, v in skills.items()}
+        dna = {str(k): int(v) for k, v in dna.items()}
+        return spec, clamp_level(level or 1), skills, dna
+
+    @staticmethod
+    def _remaining(level: int, skills: Dict[str, int], dna: Dict[str, int]) -> dict:
+        cap = skill_points_cap(level)
+        used, dna_used = sum(skills.values()), sum(dna.values())
+        return {'skills': cap - used, 'dna': BASE_DNA_POINTS - dna_used,
+                'skill_cap': cap, 'dna_cap': BASE_DNA_POINTS}
+
+    def _validated(self, r, level: int, skills: Dict[str, int], dna: Dict[str, int]) -> dict:
+        return {'ok': r.ok, 'errors': r.errors, 'skill_points': r.skill_points,
+                'skill_cap': r.skill_cap, 'dna_points': r.dna_points,
+                'remaining': self._remaining(level, skills, dna)}
+
+    def check(self, kind: str, body: dict) -> Tuple[int, dict]:
+        try:
+            spec, level, skills, dna = self._build(body)
+            if kind == 'validate':
+                return 200, self._validated(spec.validate(skills, level, dna), level, skills, dna)
+            if kind == 'unmet':
+                skill = str(body.get('skill'))
+                if skill not in spec.index:
+                    raise BadRequest(f"unknown skill {skill} for spec {spec.spec_id}")
+                return 200, {'messages': spec.unmet_requirements(skill, skills, level)}
+            return 200, self._remaining(level, skills, dna)
+        except (ValueError, TypeError) as e:  # BadRequest included
+            return 400, {'error': str(e)}
+
+    def check_batch(self, items: List[Tuple[str, dict]]) -> List[Tuple[int, dict]]:
+        """
+        Results in input order. The /validate builds of each spec are checked
+        together by CompiledSpec.validate_batch; other checks run one by one.
+        """
+        results: List[Optional[Tuple[int, dict]]] = [None] * len(items)
+        by_spec: Dict[str, list] = {}
+        for n, (kind, body) in enumerate(items):
+            if kind != 'validate':
+                results[n] = self.check(kind, body)
+                continue
+            try:
+                build = self._build(body)
+            except (ValueError, TypeError) as e:
+                results[n] = 400, {'error': str(e)}
+                continue
+            by_spec.setdefault(build[0].spec_id, []).append((n, build))
+        for group in by_spec.values():
+            spec = group[0][1][0]
+            checked = spec.validate_batch([(skills, level, dna) for _, (_, level, skills, dna) in group])
+            for (n, (_, level, skills, dna)), r in zip(group, checked):
+                results[n] = 200, self._validated(r, level, skills, dna)
+        return results
+
+
+class MicroBatcher:
+    """
+    Collects concurrent checks and runs them as batches on a worker thread.
+    Each check carries the BuildChecker of the data snapshot it arrived
+    under; a batch that straddles a reload runs each part on its own one.
+    """
+
+    def __init__(self, max_batch: int = 256, delay: float = 0.001):
+        self.max_batch = max_batch
+        self.delay = delay
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.batches = 0
+        self.checked = 0
+
+    async def submit(self, checker: BuildChecker, kind: str, body: dict) -> Tuple[int, dict]:
+        fut = asyncio.get_running_loop().create_future()
+        await self.queue.put((checker, kind, body, fut))
+        return await fut
+
+    @staticmethod
+    def _run_batch(batch: list) -> List[Tuple[int, dict]]:
+        results: List[Tuple[int, dict]] = []
+        start = 0
+        while start < len(batch):
+            checker = batch[start][0]
+            end = start + 1
+            while end < len(batch) and batch[end][0] is checker:
+                end += 1
+            results.extend(checker.check_batch([(k, b) for _, k, b, _ in batch[start:end]]))
+            start = end
+        return results
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            if self.queue.qsize() < self.max_batch - 1:
+                await asyncio.sleep(self.delay)
+            while len(batch) < self.max_batch and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            try:
+                results = await loop.run_in_executor(None, self._run_batch, batch)
+            except Exception as e:  # a bug in a check must not take the batcher down
+                results = [(500, {'error': str(e)})] * len(batch)
+            self.batches += 1
+            self.checked += len(batch)
+            for (_, _, _, fut), result in zip(batch, results):
+                if not fut.done():
+                    fut.set_result(result)
+
+
+class BuildService:
+    def __init__(self, provider: 'DataProvider[BuildChecker]', max_batch: int = 256, delay: float = 0.001):
+        self.provider = provider
+        self.batcher = MicroBatcher(max_batch, delay)
+        self.started = time.time()
+
+    async def dispatch(self, method: str, path: str, body: bytes) -> Tuple[int, dict]:
+        path = path.split('?', 1)[0].rstrip('/') or '/'
+        if path == '/health':
+            if method != 'GET':
+                return 405, {'error': 'use GET'}
+            checker: BuildChecker = self.provider.current().compiled
+            return 200, {'ok': True, 'specs': len(checker.validator.specs), 'uptime': round(time.time() - self.started, 1),
+                         'batches': self.batcher.batches, 'checked': self.batcher.checked, **self.provider.metrics()}
+        kind = path[1:]
+        if kind not in CHECKS:
+            return 404, {'error': f"no endpoint {path}"}
+        if method != 'POST':
+            return 405, {'error': 'use POST'}
+        try:
+            payload = json.loads(body or b'{}')
+        except ValueError:
+            return 400, {'error': 'body is not valid JSON'}
+        return await self.batcher.submit(self.provider.current().compiled, kind, payload)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                parts = line.decode('latin-1').split()
+                headers = {}
+                while True:
+                    h = await reader.readline()
+                    if h in (b'\r\n', b'\n', b''):
+                        break
+                    key, _, value = h.decode('latin-1').partition(':')
+                    headers[key.strip().lower()] = value.strip()
+                if len(parts) != 3:
+                    status, payload, keep = 400, {'error': 'bad request line'}, False
+                else:
+                    method, path, version = parts
+                    keep = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                    raw_length = headers.get('content-length') or '0'
+                    length = int(raw_length) if raw_length.isascii() and raw_length.isdigit() else -1
+                    if length < 0:
+                        status, payload, keep = 400, {'error': 'bad Content-Length'}, False
+                    elif length > MAX_BODY:
+                        status, payload, keep = 413, {'error': 'body too large'}, False
+                    else:
+                        body = await reader.readexactly(length) if length else b''
+                        status, payload = await self.dispatch(method, path, body)
+                blob = json.dumps(payload).encode('utf-8')
+                head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                        f"Content-Type: application/json\r\nContent-Length: {len(blob)}\r\n")
+                if not keep:
+                    head += "Connection: close\r\n"
+                writer.write(head.encode('latin-1') + b"\r\n" + blob)
+                await writer.drain()
+                if not keep:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str, port: int, ready: Optional[asyncio.Event] = None) -> None:
+        batcher = asyncio.ensure_future(self.batcher.run())
+        self.provider.start()
+        loop = asyncio.get_running_loop()
+        if hasattr(signal, 'SIGHUP'):
+            try:
+                loop.add_signal_handler(signal.SIGHUP, lambda: loop.run_in_executor(None, self.provider.reload))
+            except (NotImplementedError, RuntimeError):  # not the main thread / no signal support
+                pass
+        server = await asyncio.start_server(self.handle, host, port)
+        self.port = server.sockets[0].getsockname()[1]
+        if ready is not None:
+            ready.set()
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            batcher.cancel()
+            self.provider.stop()
+
+
+def compile_checker(data: dict, data_dir: Path) -> BuildChecker:
+    """Compiles a data.json document and, when a build layout is published next to it, enables build codes."""
+    from build_codes import LAYOUT_NAME, BuildCodec, read_layout
+
+    layout = read_layout(data_dir / LAYOUT_NAME)
+    return BuildChecker(BuildValidator(data), BuildCodec(layout) if layout else None)
+
+
+def load_service(data_path: Path, max_batch: int = 256, delay: float = 0.001, watch_interval: float = 2.0) -> BuildService:
+    return BuildService(DataProvider(data_path, compile_checker, watch_interval), max_batch, delay)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Serve build validation over HTTP")
+    ap.add_argument('--data', default=str(DATA_JSON))
+    ap.add_argument('--host', default='127.0.0.1')
+    ap.add_argument('--port', type=int, default=8765)
+    ap.add_argument('--max-batch', type=int, default=256, help="most checks run in one batch")
+    ap.add_argument('--batch-delay-ms', type=float, default=1.0,
+                    help="how long a batch waits for more requests after the first (default: %(default)s)")
+    ap.add_argument('--watch-interval', type=float, default=2.0,
+                    help="seconds between checks for newly published data; 0 reloads only on SIGHUP")
+    args = ap.parse_args()
+
+    service = load_service(Path(args.data), args.max_batch, args.batch_delay_ms / 1000, args.watch_interval)
+    snap = service.provider.current()
+    print(f"Compiled {len(snap.compiled.validator.specs)} specs (data {snap.version}) in {snap.load_seconds * 1000:.1f} ms; "
+          f"listening on http://{args.host}:{args.port}")
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
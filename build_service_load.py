@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Load test for build_service.py: keeps --concurrency keep-alive connections
+busy with random legal and corrupted builds and reports requests/sec and
+p50/p99 latency. Point it at a running service with --host/--port, or pass
+--spawn to start one in this process on a free port.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+from build_validation import DATA_JSON, MAX_LEVEL, BuildValidator, random_build
+
+
+def make_requests(validator: BuildValidator, count: int, endpoint: str, seed: int) -> List[Tuple[str, bytes]]:
+    rng = random.Random(seed)
+    specs = [s for s in validator.specs.values() if s.ids]
+    endpoints = ('validate', 'unmet', 'remaining') if endpoint == 'mixed' else (endpoint,)
+    out = []
+    for n in range(count):
+        spec = rng.choice(specs)
+        level = rng.randint(1, MAX_LEVEL)
+        skills = random_build(spec, level, rng)
+        if n % 2 and skills:
+            sid = rng.choice(list(skills))
+            skills[sid] += rng.randint(1, 5)
+        body = {'spec': spec.spec_id, 'level': level, 'skills': skills}
+        kind = endpoints[n % len(endpoints)]
+        if kind == 'unmet':
+            body['skill'] = rng.choice(spec.ids)
+        out.append((kind, json.dumps(body).encode('utf-8')))
+    return out
+
+
+async def _worker(host: str, port: int, requests: List[Tuple[str, bytes]], latencies: List[float],
+                  errors: List[int]) -> None:
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for kind, body in requests:
+            t0 = time.perf_counter()
+            writer.write(f"POST /{kind} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                         f"Content-Length: {len(body)}\r\n\r\n".encode('latin-1') + body)
+            await writer.drain()
+            status = int((await reader.readline()).split()[1])
+            length = 0
+            while True:
+                h = await reader.readline()
+                if h in (b'\r\n', b''):
+                    break
+                key, _, value = h.decode('latin-1').partition(':')
+                if key.strip().lower() == 'content-length':
+                    length = int(value)
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - t0)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+async def run_load(host: str, port: int, requests: List[Tuple[str, bytes]], concurrency: int) -> dict:
+    latencies: List[float] = []
+    errors: List[int] = []
+    shares = [requests[i::concurrency] for i in range(concurrency)]
+    t0 = time.perf_counter()
+    await asyncio.gather(*(_worker(host, port, share, latencies, errors) for share in shares if share))
+    elapsed = time.perf_counter() - t0
+    latencies.sort()
+    return {
+        'requests': len(latencies), 'errors': len(errors), 'seconds': elapsed,
+        'rps': len(latencies) / elapsed if elapsed else 0.0,
+        'p50_ms': _percentile(latencies, 0.50) * 1000, 'p99_ms': _percentile(latencies, 0.99) * 1000,
+        'max_ms': latencies[-1] * 1000,
+    }
+
+
+async def _spawned(data_path: Path, requests, concurrency: int, max_batch: int, delay: float) -> dict:
+    from build_service import load_service
+
+    service = load_service(data_path, max_batch, delay)
+    ready = asyncio.Event()
+    server = asyncio.ensure_future(service.serve('127.0.0.1', 0, ready))
+    await ready.wait()
+    try:
+        result = await run_load('127.0.0.1', service.port, requests, concurrency)
+        result['batches'] = service.batcher.batches
+        return result
+    finally:
+        server.cancel()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Load test build_service.py on localhost")
+    ap.add_argument('--data', default=str(DATA_JSON), help="data.json to draw random builds from")
+    ap.add_argument('--host', default='127.0.0.1')
+    ap.add_argument('--port', type=int, default=8765)
+    ap.add_argument('--spawn', action='store_true', help="start a service in this process instead of connecting")
+    ap.add_argument('--requests', type=int, default=20000)
+    ap.add_argument('--concurrency', type=int, default=64, help="parallel keep-alive connections")
+    ap.add_argument('--endpoint', choices=('validate', 'unmet', 'remaining', 'mixed'), default='validate')
+    ap.add_argument('--max-batch', type=int, default=256, help="with --spawn: the service's --max-batch")
+    ap.add_argument('--batch-delay-ms', type=float, default=1.0, help="with --spawn: the service's --batch-delay-ms")
+    ap.add_argument('--seed', type=int, default=1)
+    args = ap.parse_args()
+
+    data_path = Path(args.data)
+    requests = make_requests(BuildValidator.from_file(data_path), args.requests, args.endpoint, args.seed)
+    if args.spawn:
+        result = asyncio.run(_spawned(data_path, requests, args.concurrency, args.max_batch, args.batch_delay_ms / 1000))
+    else:
+        result = asyncio.run(run_load(args.host, args.port, requests, args.concurrency))
+
+    print(f"{result['requests']} requests ({result['errors']} errors) over {args.concurrency} connections "
+          f"in {result['seconds']:.2f}s")
+    print(f"throughput: {result['rps']:,.0f} requests/sec")
+    print(f"latency   : p50 {result['p50_ms']:.2f} ms, p99 {result['p99_ms']:.2f} ms, max {result['max_ms']:.2f} ms")
+    if 'batches' in result:
+        print(f"batching  : {result['batches']} batches, {result['requests'] / max(1, result['batches']):.1f} requests/batch")
+
+
+if __name__ == '__main__':
+    main()
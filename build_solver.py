@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+Minimal-point build solver on top of build_validation's compiled specs.
+
+Given a spec, a character level and target skills with target levels, it
+returns the cheapest allocation that reaches every target, or the reasons
+none exists at that level.
+
+A prerequisite edge asks for a fixed level of the required skill as soon as
+the dependent has any points, whatever the dependent's own level. So the
+cheapest allocation is unique: every target at its target level plus the
+transitive prerequisite closure of the targets, each skill at the highest
+level any edge into it asks for. Closures are computed once per spec in
+topological order and reused by every query; a query only merges the
+closures of its targets and checks the gates, the max levels and the
+LEVEL_POINTS cap.
+"""
+import argparse
+import random
+import time
+from pathlib import Path
+from typing import Dict, List, Mapping, NamedTuple, Optional, Tuple
+
+from build_validation import (
+    DATA_JSON, MAX_LEVEL, BuildValidator, CompiledSpec, _norm, clamp_level, skill_points_cap,
+)
+
+
+# Lowest character level whose skill point cap reaches n points, for every n up to the max cap.
+_MIN_LEVEL_FOR_POINTS: List[int] = []
+for _lvl in range(1, MAX_LEVEL + 1):
+    while len(_MIN_LEVEL_FOR_POINTS) <= skill_points_cap(_lvl):
+        _MIN_LEVEL_FOR_POINTS.append(_lvl)
+
+
+def min_level_for_points(points: int) -> Optional[int]:
+    """Lowest character level with at least `points` skill points, or None if no level has that many."""
+    return _MIN_LEVEL_FOR_POINTS[points] if points < len(_MIN_LEVEL_FOR_POINTS) else None
+
+
+class SolveResult(NamedTuple):
+    feasible: bool
+    skills: Dict[str, int]          # skill id -> level, prerequisites first (a valid click order)
+    points: int
+    cap: int
+    min_char_level: Optional[int]   # lowest character level at which `skills` is legal; None if never
+    errors: List[str]
+
+
+class _Closure(NamedTuple):
+    levels: Dict[int, int]  # prerequisite skill index -> level needed (transitively)
+    missing: List[str]      # requirement labels that are not skills of this spec
+
+
+class BuildSolver:
+    """Answers "what is the cheapest build reaching these skills?" for every spec of a data.json."""
+
+    def __init__(self, validator: BuildValidator):
+        self.validator = validator
+        self._closures: Dict[str, List[Optional[_Closure]]] = {}
+        self._order: Dict[str, Dict[int, int]] = {}
+
+    @classmethod
+    def from_file(cls, path: Path = DATA_JSON) -> 'BuildSolver':
+        return cls(BuildValidator.from_file(path))
+
+    def _spec_closures(self, spec: CompiledSpec) -> List[Optional[_Closure]]:
+        """Prerequisite closure of every skill (None for skills on a cycle), built on first use."""
+        closures = self._closures.get(spec.spec_id)
+        if closures is not None:
+            return closures
+        closures = [None] * len(spec.ids)
+        for i in spec.topo_order:
+            levels: Dict[int, int] = {}
+            missing: List[str] = []
+            for e in range(spec.edge_start[i], spec.edge_start[i + 1]):
+                t = spec.edge_target[e]
+                if t < 0:
+                    missing.append(f"{spec.edge_label[e]} Lv.{spec.edge_level[e]}")
+                    continue
+                if levels.get(t, 0) < spec.edge_level[e]:
+                    levels[t] = spec.edge_level[e]
+                # t comes before i in topo_order, so its closure is already known.
+                sub = closures[t]
+                for u, lvl in sub.levels.items():
+                    if levels.get(u, 0) < lvl:
+                        levels[u] = lvl
+                missing.extend(m for m in sub.missing if m not in missing)
+            closures[i] = _Closure(levels, missing)
+        self._closures[spec.spec_id] = closures
+        self._order[spec.spec_id] = {i: pos for pos, i in enumerate(spec.topo_order)}
+        return closures
+
+    def resolve_skill(self, spec: CompiledSpec, key: str) -> Optional[int]:
+        """Skill index for an id or a (normalized) skill name."""
+        i = spec.index.get(str(key))
+        return i if i is not None else spec.name_index().get(_norm(str(key)))
+
+    def solve(self, spec_id, targets: Mapping[str, int], char_level: int) -> SolveResult:
+        """Cheapest allocation reaching `targets` ({skill id or name: level}) at `char_level`."""
+        spec = self.validator.spec(spec_id)
+        closures = self._spec_closures(spec)
+        char_level = clamp_level(char_level)
+        errors: List[str] = []
+
+        need: Dict[int, int] = {}
+        for key, lvl in targets.items():
+            i = self.resolve_skill(spec, key)
+            if i is None:
+                errors.append(f"Unknown skill {key} for spec {spec.spec_id}")
+                continue
+            lvl = int(lvl)
+            if lvl <= 0:
+                continue
+            if need.get(i, 0) < lvl:
+                need[i] = lvl
+            closure = closures[i]
+            if closure is None:
+                errors.append(f"{spec.names[i]}: prerequisite cycle")
+                continue
+            for m in closure.missing:
+                errors.append(f"{spec.names[i]}: Requires {m}")
+            for t, tl in closure.levels.items():
+                if need.get(t, 0) < tl:
+                    need[t] = tl
+
+        # Gates that no character level can lift make the target infeasible outright.
+        never = bool(errors)
+        gate = 1
+        for i, lvl in need.items():
+            if lvl > spec.max_level[i]:
+                errors.append(f"{spec.names[i]}: needs Lv.{lvl}, max level is {spec.max_level[i]}")
+                never = True
+                continue
+            gate = max(gate, spec.rank_gate[i][lvl], spec.job_gate[i])
+        points = sum(need.values())
+        cap = skill_points_cap(char_level)
+        points_level = min_level_for_points(points)
+        if points_level is None:
+            errors.append(f"Needs {points} skill points, more than any character level gives")
+            never = True
+        min_char_level = None if never or gate > MAX_LEVEL else max(gate, points_level)
+
+        if not never:
+            for i, lvl in need.items():
+                g = max(spec.rank_gate[i][lvl], spec.job_gate[i])
+                if g > char_level:
+                    errors.append(f"{spec.names[i]}: Requires character level {g}")
+            if points > cap:
+                errors.append(f"Not enough skill points ({points} needed, {cap} at level {char_level})")
+
+        order = self._order[spec.spec_id]
+        skills = {spec.ids[i]: need[i] for i in sorted(need, key=lambda i: order.get(i, len(order)))}
+        return SolveResult(not errors, skills, points, cap, min_char_level, errors)
+
+
+def _parse_target(text: str) -> Tuple[str, int]:
+    key, sep, lvl = text.rpartition('=')
+    if not sep:
+        return text, 1
+    return key, int(lvl)
+
+
+def _bench(solver: BuildSolver, count: int, seed: int) -> None:
+    rng = random.Random(seed)
+    specs = [s for s in solver.validator.specs.values() if s.ids]
+    queries = []
+    for _ in range(count):
+        spec = rng.choice(specs)
+        picks = rng.sample(range(len(spec.ids)), min(len(spec.ids), rng.randint(1, 5)))
+        targets = {spec.ids[i]: rng.randint(1, spec.max_level[i]) for i in picks}
+        queries.append((spec.spec_id, targets, rng.randint(1, MAX_LEVEL)))
+
+    t0 = time.perf_counter()
+    feasible = sum(1 for q in queries if solver.solve(*q).feasible)
+    dt = time.perf_counter() - t0
+    print(f"{count} queries in {dt:.3f}s = {dt / count * 1000:.3f} ms/query ({feasible} feasible)")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Find the cheapest build reaching target skill levels")
+    ap.add_argument('--data', default=str(DATA_JSON))
+    ap.add_argument('--spec', help="spec id")
+    ap.add_argument('--level', type=int, default=MAX_LEVEL, help="character level (default: %(default)s)")
+    ap.add_argument('--target', action='append', default=[], metavar='SKILL=LEVEL',
+                    help="skill id or name with its target level; repeatable")
+    ap.add_argument('--bench', type=int, metavar='N', help="solve N random queries and report ms/query")
+    ap.add_argument('--seed', type=int, default=1)
+    args = ap.parse_args()
+
+    solver = BuildSolver.from_file(Path(args.data))
+
+    if args.bench:
+        _bench(solver, args.bench, args.seed)
+    if args.spec:
+        targets = dict(_parse_target(t) for t in args.target)
+        result = solver.solve(args.spec, targets, args.level)
+        spec = solver.validator.spec(args.spec)
+        for sid, lvl in result.skills.items():
+            print(f"{spec.names[spec.index[sid]]} ({sid}): {lvl}")
+        print(f"{result.points} / {result.cap} skill points; "
+              f"lowest character level: {result.min_char_level if result.min_char_level else 'none'}")
+        for err in result.errors:
+            print(f"infeasible: {err}")
+
+
+if __name__ == '__main__':
+    main()
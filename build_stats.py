@@ -0,0 +1,273 @@
+#!/usr/bin/env python3
+"""
+Numeric build stats from the skills' `progression` tables (needs NumPy).
+
+enrich_with_skill_stats.py stores each progression column as a list with
+one cell per skill level, ints where the wiki cell was a bare number and
+text otherwise ("+15%", "3.5s", "12 sec"). Each spec is parsed once into
+a float64 array table[skill, level, column], with level 0 all zeros.
+Minutes are converted to seconds. Each column takes the unit most of its
+cells carry, and cells in another unit (or none) are moved to a separate
+"<column> (<unit>)" column, e.g. "damage (no unit)" next to a "damage"
+column in %, so no column mixes units. The info box's cooldown and cast time become two more columns
+that hold the same value at every level.
+
+Aggregating builds is then a single matrix product: a build is a one-hot
+row over (skill, level) pairs, so onehot[builds, skill*(L+1)+level] @
+table.reshape(-1, columns) gives the per-column totals of thousands of
+builds at once.
+"""
+import argparse
+import json
+import math
+import random
+import re
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from build_validation import DATA_JSON, DEFAULT_MAX_SKILL_LEVEL, MAX_LEVEL, BuildValidator, random_build
+
+
+_NUMBER = re.compile(r'[-+]?\d+(?:,\d{3})*(?:\.\d+)?')
+_UNIT = re.compile(r'%|[a-z]+')
+# unit spelling -> (canonical unit, factor)
+_UNITS = {
+    's': ('s', 1.0), 'sec': ('s', 1.0), 'secs': ('s', 1.0), 'second': ('s', 1.0), 'seconds': ('s', 1.0),
+    'min': ('s', 60.0), 'mins': ('s', 60.0), 'minute': ('s', 60.0), 'minutes': ('s', 60.0),
+    'm': ('m', 1.0), 'meter': ('m', 1.0), 'meters': ('m', 1.0),
+}
+INFO_COLUMNS = (('cooldown', 'info: cooldown'), ('cast_time', 'info: cast time'))
+# Named build totals: the columns each one adds up.
+SUMMARY = {
+    'damage': lambda col: col == 'damage' or (col.endswith(' damage') and 'with dna' not in col),
+    'mp': lambda col: col == 'mp consumption',
+    'cooldown': lambda col: col in ('cooldown', 'info: cooldown'),
+}
+
+
+def parse_stat(cell) -> Tuple[float, str]:
+    """(value, unit) of one progression cell: "+15%" -> (15.0, '%'), "3.5s" -> (3.5, 's'); NaN if not numeric."""
+    if cell is None or isinstance(cell, bool):
+        return math.nan, ''
+    if isinstance(cell, (int, float)):
+        return float(cell), ''
+    text = str(cell).strip().lower()
+    m = _NUMBER.search(text)
+    if not m:
+        return math.nan, ''
+    value = float(m.group().replace(',', ''))
+    u = _UNIT.match(text[m.end():].lstrip())
+    if not u:
+        return value, ''
+    unit, factor = _UNITS.get(u.group(), (u.group(), 1.0))
+    return value * factor, unit
+
+
+class SpecStats:
+    """One spec's progression tables as a typed array."""
+
+    def __init__(self, spec_id: str, skills: Sequence[dict]):
+        self.spec_id = spec_id
+        self.ids: List[str] = [str(s.get('id')) for s in skills]
+        self.index: Dict[str, int] = {sid: i for i, sid in enumerate(self.ids)}
+        self.levels = max([int(s.get('maxLevel') or DEFAULT_MAX_SKILL_LEVEL) for s in skills] or [0])
+
+        parsed: Dict[str, List[Tuple[int, int, float, str]]] = {}
+        for i, s in enumerate(skills):
+            for col, cells in (s.get('progression') or {}).items():
+                out = parsed.setdefault(str(col).lower(), [])
+                for lvl, cell in enumerate((cells or [])[:self.levels], 1):
+                    value, unit = parse_stat(cell)
+                    if not math.isnan(value):
+                        out.append((i, lvl, value, unit))
+            info = s.get('info') or {}
+            for key, col in INFO_COLUMNS:
+                value, unit = parse_stat(info.get(key))
+                if not math.isnan(value):
+                    parsed.setdefault(col, []).extend((i, lvl, value, unit) for lvl in range(1, self.levels + 1))
+
+        # A column keeps the cells in its most common unit; cells in any other
+        # unit go to a column of their own, "<column> (<unit>)", so no total
+        # adds seconds to percentages.
+        units: Dict[str, str] = {}
+        for col, cells in list(parsed.items()):
+            counts = Counter(unit for _, _, _, unit in cells)
+            if not counts:
+                continue
+            units[col] = counts.most_common(1)[0][0]
+            for unit in counts:
+                if unit != units[col]:
+                    split = f"{col} ({unit or 'no unit'})"
+                    parsed[split] = [cell for cell in cells if cell[3] == unit]
+                    units[split] = unit
+            if len(counts) > 1:
+                parsed[col] = [cell for cell in cells if cell[3] == units[col]]
+
+        self.columns: List[str] = [col for col, cells in parsed.items() if cells]
+        self.units: List[str] = [units[col] for col in self.columns]
+        self.table = np.zeros((len(self.ids), self.levels + 1, len(self.columns)), dtype=np.float64)
+        for c, col in enumerate(self.columns):
+            for i, lvl, value, _ in parsed[col]:
+                self.table[i, lvl, c] = value
+        self._flat = self.table.reshape(len(self.ids) * (self.levels + 1), len(self.columns))
+        self._offsets = np.arange(len(self.ids), dtype=np.int64) * (self.levels + 1)
+
+        self.summary_names = list(SUMMARY)
+        self._summary = np.zeros((len(self.columns), len(SUMMARY)), dtype=np.float64)
+        for k, pick in enumerate(SUMMARY.values()):
+            for c, col in enumerate(self.columns):
+                if pick(col):
+                    self._summary[c, k] = 1.0
+
+    def level_matrix(self, builds: Sequence[Mapping[str, int]]) -> np.ndarray:
+        """{skill id: level} builds as an int array [build, skill]; unknown skills are ignored."""
+        levels = np.zeros((len(builds), len(self.ids)), dtype=np.int64)
+        index = self.index
+        for b, skills in enumerate(builds):
+            for sid, lvl in skills.items():
+                i = index.get(str(sid))
+                if i is not None:
+                    levels[b, i] = lvl
+        return levels
+
+    def aggregate(self, levels: np.ndarray, chunk: int = 4096) -> np.ndarray:
+        """Per-column totals [build, column] of a level matrix [build, skill]."""
+        levels = np.clip(np.asarray(levels, dtype=np.int64), 0, self.levels)
+        out = np.empty((levels.shape[0], len(self.columns)), dtype=np.float64)
+        width = self._flat.shape[0]
+        for start in range(0, levels.shape[0], chunk):
+            part = levels[start:start + chunk]
+            onehot = np.zeros((part.shape[0], width), dtype=np.float64)
+            np.put_along_axis(onehot, part + self._offsets, 1.0, axis=1)
+            out[start:start + part.shape[0]] = onehot @ self._flat
+        return out
+
+    def summarize(self, totals: np.ndarray) -> Dict[str, np.ndarray]:
+        """SUMMARY totals per build from aggregate()'s output."""
+        named = totals @ self._summary
+        return {name: named[:, k] for k, name in enumerate(self.summary_names)}
+
+    def aggregate_python(self, levels: np.ndarray) -> List[List[float]]:
+        """Reference loop over builds and skills, for checking and benchmarking aggregate()."""
+        table = self.table.tolist()
+        out = []
+        for row in np.asarray(levels).tolist():
+            totals = [0.0] * len(self.columns)
+            for i, lvl in enumerate(row):
+                if lvl:
+                    for c, v in enumerate(table[i][min(lvl, self.levels)]):
+                        totals[c] += v
+            out.append(totals)
+        return out
+
+
+class BuildStats:
+    """SpecStats for every spec of a data.json document."""
+
+    def __init__(self, data: Mapping[str, object]):
+        self.specs: Dict[str, SpecStats] = {
+            str(spec_id): SpecStats(str(spec_id), skills)
+            for spec_id, skills in (data.get('skills') or {}).items()
+        }
+
+    @classmethod
+    def from_file(cls, path: Path = DATA_JSON) -> 'BuildStats':
+        return cls(json.loads(Path(path).read_text(encoding='utf-8')))
+
+    def spec(self, spec_id) -> SpecStats:
+        try:
+            return self.specs[str(spec_id)]
+        except KeyError:
+            raise KeyError(f"unknown spec {spec_id}") from None
+
+    def build_stats(self, spec_id, skills: Mapping[str, int]) -> Dict[str, float]:
+        """Column totals of one build, keyed by column name."""
+        spec = self.spec(spec_id)
+        totals = spec.aggregate(spec.level_matrix([skills]))[0]
+        return {col: float(v) for col, v in zip(spec.columns, totals) if v}
+
+    def aggregate_many(self, builds: Iterable[Mapping[str, object]]) -> Dict[str, Tuple[List[int], np.ndarray]]:
+        """
+        Totals for builds shaped like {'spec': id, 'skills': {...}}, one
+        matrix product per spec: spec id -> (positions of its builds in the
+        input, totals [build, column]).
+        """
+        grouped: Dict[str, Tuple[List[int], List[Mapping[str, int]]]] = {}
+        for n, b in enumerate(builds):
+            spec_id = str(b.get('spec'))
+            if spec_id in self.specs:
+                pos, skills = grouped.setdefault(spec_id, ([], []))
+                pos.append(n)
+                skills.append(b.get('skills') or {})
+        out = {}
+        for spec_id, (pos, skills) in grouped.items():
+            spec = self.specs[spec_id]
+            out[spec_id] = (pos, spec.aggregate(spec.level_matrix(skills)))
+        return out
+
+
+def _bench(stats: BuildStats, validator: BuildValidator, count: int, seed: int) -> None:
+    rng = random.Random(seed)
+    spec = max(stats.specs.values(), key=lambda s: len(s.columns))
+    compiled = validator.spec(spec.spec_id)
+    levels = spec.level_matrix([random_build(compiled, rng.randint(1, MAX_LEVEL), rng) for _ in range(count)])
+    print(f"spec {spec.spec_id}: {len(spec.ids)} skills, {len(spec.columns)} numeric columns")
+
+    t0 = time.perf_counter()
+    fast = spec.aggregate(levels)
+    dt = time.perf_counter() - t0
+    print(f"vectorized: {count} builds in {dt * 1000:.1f} ms = {count / dt:,.0f} builds/sec")
+    t0 = time.perf_counter()
+    slow = spec.aggregate_python(levels)
+    dt = time.perf_counter() - t0
+    print(f"    python: {count} builds in {dt * 1000:.1f} ms = {count / dt:,.0f} builds/sec")
+    print(f"   results: {'identical' if np.allclose(fast, np.array(slow).reshape(fast.shape)) else 'MISMATCH'}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Numeric progression stats for skill builds")
+    ap.add_argument('--data', default=str(DATA_JSON))
+    ap.add_argument('--columns', metavar='SPEC', help="list a spec's numeric columns and units")
+    ap.add_argument('--builds', help="JSON lines of {'spec','skills'} builds (build_validation.py --builds format)")
+    ap.add_argument('--code', action='append', default=[], help="a build code (build_codes.py); repeatable")
+    ap.add_argument('--bench', type=int, metavar='N', help="aggregate N random builds, vectorized vs. a Python loop")
+    ap.add_argument('--seed', type=int, default=1)
+    args = ap.parse_args()
+
+    data = json.loads(Path(args.data).read_text(encoding='utf-8'))
+    stats = BuildStats(data)
+    if args.columns:
+        spec = stats.spec(args.columns)
+        for col, unit in zip(spec.columns, spec.units):
+            print(f"{col}{f' ({unit})' if unit else ''}")
+
+    builds: List[dict] = []
+    if args.code:
+        from build_codes import BuildCodec
+
+        codec = BuildCodec.from_file()
+        builds.extend(codec.decode(code).as_dict() for code in args.code)
+    if args.builds:
+        with open(args.builds, encoding='utf-8') as f:
+            builds.extend(json.loads(line) for line in f if line.strip())
+    if builds:
+        results: List[Optional[Dict[str, float]]] = [None] * len(builds)
+        for spec_id, (pos, totals) in stats.aggregate_many(builds).items():
+            spec = stats.specs[spec_id]
+            named = spec.summarize(totals)
+            for row, n in enumerate(pos):
+                results[n] = {name: float(v[row]) for name, v in named.items()}
+                results[n].update({col: float(v) for col, v in zip(spec.columns, totals[row]) if v})
+        for r in results:
+            print(json.dumps(r))
+
+    if args.bench:
+        _bench(stats, BuildValidator(data), args.bench, args.seed)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,439 @@
+#!/usr/bin/env python3
+"""
+Server-side build validation, mirroring canIncrease / unmetRequirementsMessage
+in app.js.
+
+data.json is loaded once and every spec is compiled into integer-indexed
+arrays: per-skill max level, a prefix-max table of the character level each
+rank needs (from lvlReq), the character-level gate from job requirements,
+and the skill -> prerequisite edges in CSR form. Validating a build
+({skillId: level} plus character level) is then a single pass over the
+allocated skills and their edges.
+
+A final allocation is legal exactly when it could have been clicked
+together in the calculator: prerequisites can be raised first (they form a
+DAG), and canDecrease never lets a prerequisite drop below what an
+allocated dependent needs, so the end state must satisfy every edge.
+"""
+import argparse
+import json
+import random
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+
+DATA_JSON = Path(__file__).resolve().parent / 'data.json'
+
+# Same tables as app.js (taken from the archived calculator.js).
+LEVEL_POINTS = [
+    0,1,2,3,4,5,6,7,8,11,12,13,14,15,16,17,18,19,20,23,24,25,26,27,28,29,30,31,32,35,36,37,38,39,40,41,42,43,44,47,48,49,50,51,52,53,54,55,56,60,61,62,63,64,65,66,67,68,69,73,74,75,76,77,78,79,80,81,82,85,86,87,88,89,90,91,92,93,94,97,98,99,100,101,102,103,104,105,106,109
+]
+MAX_LEVEL = 90
+BASE_DNA_POINTS = 55
+STARTER_SKILL_POINTS = 1
+DEFAULT_MAX_SKILL_LEVEL = 10
+
+
+def clamp_level(char_level: int) -> int:
+    return max(1, min(MAX_LEVEL, int(char_level or 1)))
+
+
+def skill_points_cap(char_level: int) -> int:
+    """getSkillPointsCap() from app.js."""
+    lvl = clamp_level(char_level)
+    idx = max(0, min(len(LEVEL_POINTS) - 1, lvl - 1))
+    return LEVEL_POINTS[idx] + (STARTER_SKILL_POINTS if lvl == 1 else 0)
+
+
+def rank_level_need(lvl_req, rank: int) -> Optional[int]:
+    """Character level needed for `rank` (1-based), clamped to the lvlReq array like app.js."""
+    if not isinstance(lvl_req, list) or not lvl_req:
+        return None
+    need = lvl_req[max(0, min(len(lvl_req) - 1, rank - 1))]
+    return need if isinstance(need, int) and not isinstance(need, bool) else None
+
+
+class ValidationResult(NamedTuple):
+    ok: bool
+    errors: List[str]
+    skill_points: int
+    skill_cap: int
+    dna_points: int
+
+
+class CompiledSpec:
+    """One spec's skills and DNA as integer-indexed arrays."""
+
+    def __init__(self, spec_id: str, skills: Sequence[dict], dna: Sequence[dict] = ()):
+        self.spec_id = spec_id
+        self.skills = list(skills)
+        self.ids: List[str] = [str(s.get('id')) for s in self.skills]
+        self.index: Dict[str, int] = {sid: i for i, sid in enumerate(self.ids)}
+        self.names: List[str] = [s.get('name', '') for s in self.skills]
+        self.max_level: List[int] = [int(s.get('maxLevel') or DEFAULT_MAX_SKILL_LEVEL) for s in self.skills]
+
+        # rank_gate[i][L] = highest character level needed by any of ranks 1..L
+        self.rank_gate: List[List[int]] = []
+        # job_gate[i] = character level needed by name-only requirements
+        self.job_gate: List[int] = []
+        # Skill prerequisite edges (CSR): for skill i, edges edge_start[i]:edge_start[i+1]
+        self.edge_start: List[int] = [0]
+        self.edge_target: List[int] = []  # -1 = required skill id is not in this spec
+        self.edge_level: List[int] = []
+        self.edge_label: List[str] = []
+
+        for s in self.skills:
+            lvl_req = s.get('lvlReq')
+            gate = [0]
+            for rank in range(1, self.max_level[len(self.rank_gate)] + 1):
+                need = rank_level_need(lvl_req, rank) or 0
+                gate.append(max(gate[-1], need))
+            self.rank_gate.append(gate)
+
+            job_level = 0
+            for r in (s.get('requires') or {}).values():
+                if not isinstance(r, dict):
+                    continue
+                # Like app.js, a requirement without an id that names a skill of this spec is a skill edge.
+                by_name = self.name_index().get(_norm(r['name'])) if not r.get('id') and r.get('name') else None
+                if r.get('id') or by_name is not None:
+                    target = self.index.get(str(r['id']), -1) if r.get('id') else by_name
+                    self.edge_target.append(target)
+                    self.edge_level.append(int(r.get('level') or 1))
+                    self.edge_label.append(r.get('name') or str(r['id']))
+                elif r.get('level') and r.get('name'):
+                    job_level = max(job_level, int(r['level']))
+            self.job_gate.append(job_level)
+            self.edge_start.append(len(self.edge_target))
+
+        self.in_cycle = self._find_cycles()
+
+        self.dna_ids: List[str] = [str(d.get('id')) for d in dna]
+        self.dna_index: Dict[str, int] = {did: i for i, did in enumerate(self.dna_ids)}
+        self.dna_names: List[str] = [d.get('name', '') for d in dna]
+        self.dna_max_level: List[int] = [int(d.get('maxLevel') or DEFAULT_MAX_SKILL_LEVEL) for d in dna]
+
+    def _find_cycles(self) -> List[bool]:
+        """Skills on (or behind) a prerequisite cycle can never be raised."""
+        n = len(self.ids)
+        indegree = [0] * n
+        dependents: List[List[int]] = [[] for _ in range(n)]
+        for i in range(n):
+            for e in range(self.edge_start[i], self.edge_start[i + 1]):
+                t = self.edge_target[e]
+                if t >= 0:
+                    indegree[i] += 1
+                    dependents[t].append(i)
+        queue = [i for i in range(n) if indegree[i] == 0]
+        self.topo_order: List[int] = []
+        while queue:
+            t = queue.pop()
+            self.topo_order.append(t)
+            for i in dependents[t]:
+                indegree[i] -= 1
+                if indegree[i] == 0:
+                    queue.append(i)
+        self.dependents = dependents
+        return [d > 0 for d in indegree]
+
+    def vector(self, skills: Mapping[str, int]) -> Optional[List[int]]:
+        """Allocation as a level-per-skill list, or None if it names a skill outside this spec."""
+        levels = [0] * len(self.ids)
+        for sid, lvl in skills.items():
+            i = self.index.get(str(sid))
+            if i is None:
+                return None
+            levels[i] = int(lvl)
+        return levels
+
+    def is_valid(self, skills: Mapping[str, int], char_level: int, dna: Optional[Mapping[str, int]] = None) -> bool:
+        """Fast boolean check (no messages)."""
+        char_level = clamp_level(char_level)
+        levels = self.vector(skills)
+        if levels is None:
+            return False
+        total = 0
+        edge_start, edge_target, edge_level = self.edge_start, self.edge_target, self.edge_level
+        for i, lvl in enumerate(levels):
+            if not lvl:
+                continue
+            if lvl < 0 or lvl > self.max_level[i] or self.in_cycle[i]:
+                return False
+            if self.rank_gate[i][lvl] > char_level or self.job_gate[i] > char_level:
+                return False
+            for e in range(edge_start[i], edge_start[i + 1]):
+                t = edge_target[e]
+                if t < 0 or levels[t] < edge_level[e]:
+                    return False
+            total += lvl
+        if total > skill_points_cap(char_level):
+            return False
+        return self._dna_ok(dna) if dna else True
+
+    def _dna_ok(self, dna: Mapping[str, int]) -> bool:
+        total = 0
+        for did, lvl in dna.items():
+            i = self.dna_index.get(str(did))
+            if i is None or lvl < 0 or lvl > self.dna_max_level[i]:
+                return False
+            total += lvl
+        return total <= BASE_DNA_POINTS
+
+    def validate(self, skills: Mapping[str, int], char_level: int,
+                 dna: Optional[Mapping[str, int]] = None) -> ValidationResult:
+        """Full check with app.js-style messages for every problem found."""
+        return self.validate_batch([(skills, char_level, dna)])[0]
+
+    def validate_batch(self, builds: Iterable[Tuple[Mapping[str, int], int, Optional[Mapping[str, int]]]]
+                       ) -> List[ValidationResult]:
+        """
+        validate() for many (skills, char_level, dna) builds of this spec: the
+        compiled arrays are bound once for the batch, one level vector is
+        reused, and each build only visits the skills it allocates.
+        """
+        index, names, max_level, in_cycle = self.index, self.names, self.max_level, self.in_cycle
+        rank_gate, job_gate = self.rank_gate, self.job_gate
+        edge_start, edge_target, edge_level, edge_label = self.edge_start, self.edge_target, self.edge_level, self.edge_label
+        dna_index, dna_names, dna_max_level = self.dna_index, self.dna_names, self.dna_max_level
+        levels = [0] * len(self.ids)
+        caps: Dict[int, int] = {}
+        out: List[ValidationResult] = []
+        for skills, char_level, dna in builds:
+            char_level = clamp_level(char_level)
+            cap = caps.get(char_level)
+            if cap is None:
+                cap = caps[char_level] = skill_points_cap(char_level)
+            errors: List[str] = []
+            alloc: Dict[int, int] = {}
+            for sid, lvl in skills.items():
+                i = index.get(str(sid))
+                if i is None:
+                    errors.append(f"Unknown skill {sid} for spec {self.spec_id}")
+                else:
+                    alloc[i] = int(lvl)
+            for i, lvl in alloc.items():
+                levels[i] = lvl
+
+            total = 0
+            for i in sorted(alloc):
+                lvl = alloc[i]
+                if not lvl:
+                    continue
+                name = names[i]
+                if lvl < 0:
+                    errors.append(f"{name}: negative level")
+                    continue
+                total += lvl
+                if lvl > max_level[i]:
+                    errors.append(f"{name}: Already at max level")
+                    lvl = max_level[i]
+                if in_cycle[i]:
+                    errors.append(f"{name}: prerequisite cycle")
+                if rank_gate[i][lvl] > char_level:
+                    errors.append(f"{name}: Requires character level {rank_gate[i][lvl]}")
+                if job_gate[i] > char_level:
+                    errors.append(f"{name}: Requires character level {job_gate[i]}")
+                for e in range(edge_start[i], edge_start[i + 1]):
+                    t = edge_target[e]
+                    need = edge_level[e]
+                    if t < 0:
+                        errors.append(f"{name}: Requires {edge_label[e]} Lv.{need}")
+                    elif levels[t] < need:
+                        errors.append(f"{name}: Requires {names[t]} Lv.{need}")
+            for i in alloc:
+                levels[i] = 0
+
+            if total > cap:
+                errors.append("Not enough skill points")
+
+            dna_total = 0
+            for did, lvl in (dna or {}).items():
+                i = dna_index.get(str(did))
+                if i is None:
+                    errors.append(f"Unknown DNA {did} for spec {self.spec_id}")
+                    continue
+                if lvl > 0:
+                    dna_total += lvl
+                if lvl < 0 or lvl > dna_max_level[i]:
+                    errors.append(f"{dna_names[i]}: Already at max level")
+            if dna_total > BASE_DNA_POINTS:
+                errors.append("Not enough DNA points")
+
+            out.append(ValidationResult(not errors, errors, total, cap, dna_total))
+        return out
+
+    def unmet_requirements(self, skill_id: str, skills: Mapping[str, int], char_level: int) -> List[str]:
+        """unmetRequirementsMessage() from app.js: why the next rank of `skill_id` can't be taken."""
+        i = self.index[str(skill_id)]
+        s = self.skills[i]
+        char_level = clamp_level(char_level)
+        lines = []
+        used = sum(skills.values())
+        cur = int(skills.get(str(skill_id), 0))
+        if used >= skill_points_cap(char_level):
+            lines.append('Not enough skill points')
+        if cur >= self.max_level[i]:
+            lines.append('Already at max level')
+        need = rank_level_need(s.get('lvlReq'), cur + 1)
+        if need is not None and char_level < need:
+            lines.append(f"Requires character level {need}")
+        for r in (s.get('requires') or {}).values():
+            if not r:
+                continue
+            target = None
+            rid = r.get('id')
+            if rid:
+                t = self.index.get(str(rid))
+                target = self.names[t] if t is not None else None
+            elif r.get('name'):
+                t = self.name_index().get(_norm(r['name']))
+                if t is not None:
+                    target, rid = self.names[t], self.ids[t]
+            have = int(skills.get(str(rid), 0)) if rid else 0
+            level = r.get('level') or 1
+            if target:
+                if have < level:
+                    lines.append(f"Requires {target} Lv.{level}")
+            elif r.get('name'):
+                lines.append(f"Requires {r['name']} Lv.{level}")
+        return lines
+
+    def name_index(self) -> Dict[str, int]:
+        if not hasattr(self, '_name_index'):
+            self._name_index = {}
+            for i, n in enumerate(self.names):
+                self._name_index.setdefault(_norm(n), i)
+        return self._name_index
+
+    def can_increase(self, levels: List[int], i: int, char_level: int, used: int) -> bool:
+        """canIncrease() from app.js on a level vector, with `used` skill points already spent."""
+        if used >= skill_points_cap(char_level):
+            return False
+        cur = levels[i]
+        if cur >= self.max_level[i] or self.in_cycle[i]:
+            return False
+        if self.rank_gate[i][cur + 1] > char_level or self.job_gate[i] > char_level:
+            return False
+        for e in range(self.edge_start[i], self.edge_start[i + 1]):
+            t = self.edge_target[e]
+            if t < 0 or levels[t] < self.edge_level[e]:
+                return False
+        return True
+
+
+def _norm(s: str) -> str:
+    return ''.join(ch for ch in (s or '').lower() if ch.isascii() and ch.isalnum())
+
+
+class BuildValidator:
+    """Compiles every spec of a data.json document once and validates builds against it."""
+
+    def __init__(self, data: Mapping[str, object]):
+        skills = data.get('skills') or {}
+        dna = data.get('dna') or {}
+        self.specs: Dict[str, CompiledSpec] = {
+            str(spec_id): CompiledSpec(str(spec_id), spec_skills, dna.get(spec_id) or [])
+            for spec_id, spec_skills in skills.items()
+        }
+
+    @classmethod
+    def from_file(cls, path: Path = DATA_JSON) -> 'BuildValidator':
+        return cls(json.loads(Path(path).read_text(encoding='utf-8')))
+
+    def spec(self, spec_id) -> CompiledSpec:
+        try:
+            return self.specs[str(spec_id)]
+        except KeyError:
+            raise KeyError(f"unknown spec {spec_id}") from None
+
+    def validate(self, spec_id, skills: Mapping[str, int], char_level: int,
+                 dna: Optional[Mapping[str, int]] = None) -> ValidationResult:
+        return self.spec(spec_id).validate(skills, char_level, dna)
+
+    def is_valid(self, spec_id, skills: Mapping[str, int], char_level: int,
+                 dna: Optional[Mapping[str, int]] = None) -> bool:
+        spec = self.specs.get(str(spec_id))
+        return spec is not None and spec.is_valid(skills, char_level, dna)
+
+    def validate_many(self, builds: Iterable[Mapping[str, object]], messages: bool = False) -> Iterator[object]:
+        """
+        Streams results for builds shaped like
+        {'spec': id, 'level': n, 'skills': {...}, 'dna': {...}}: a bool per
+        build, or a ValidationResult when `messages` is set.
+        """
+        specs = self.specs
+        for b in builds:
+            spec = specs.get(str(b.get('spec')))
+            if spec is None:
+                yield ValidationResult(False, [f"Unknown spec {b.get('spec')}"], 0, 0, 0) if messages else False
+            elif messages:
+                yield spec.validate(b.get('skills') or {}, b.get('level') or 1, b.get('dna'))
+            else:
+                yield spec.is_valid(b.get('skills') or {}, b.get('level') or 1, b.get('dna'))
+
+
+def random_build(spec: CompiledSpec, char_level: int, rng: random.Random, clicks: Optional[int] = None) -> Dict[str, int]:
+    """A legal build made by clicking random allowed '+' buttons, as a player would."""
+    levels = [0] * len(spec.ids)
+    used = 0
+    budget = skill_points_cap(char_level) if clicks is None else clicks
+    order = list(range(len(spec.ids)))
+    for _ in range(budget):
+        rng.shuffle(order)
+        for i in order:
+            if spec.can_increase(levels, i, char_level, used):
+                levels[i] += 1
+                used += 1
+                break
+        else:
+            break
+    return {spec.ids[i]: lvl for i, lvl in enumerate(levels) if lvl}
+
+
+def _bench(validator: BuildValidator, count: int, seed: int) -> None:
+    rng = random.Random(seed)
+    spec_ids = [sid for sid, s in validator.specs.items() if s.ids]
+    builds = []
+    for n in range(count):
+        spec = validator.specs[rng.choice(spec_ids)]
+        level = rng.randint(1, MAX_LEVEL)
+        skills = random_build(spec, level, rng)
+        if n % 2 and skills:
+            # Corrupt half of them so both the pass and fail paths are measured.
+            sid = rng.choice(list(skills))
+            skills[sid] += rng.randint(1, 5)
+        builds.append({'spec': spec.spec_id, 'level': level, 'skills': skills})
+
+    for messages in (False, True):
+        t0 = time.perf_counter()
+        valid = sum(1 for r in validator.validate_many(builds, messages) if (r.ok if messages else r))
+        dt = time.perf_counter() - t0
+        mode = 'with messages' if messages else 'boolean'
+        print(f"{mode:>14}: {count} builds in {dt:.3f}s = {count / dt:,.0f} builds/sec ({valid} valid)")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Validate skill builds against data.json")
+    ap.add_argument('--data', default=str(DATA_JSON))
+    ap.add_argument('--builds', help="JSON lines file of {'spec','level','skills','dna'} builds to validate")
+    ap.add_argument('--bench', type=int, metavar='N', help="validate N random builds and report builds/sec")
+    ap.add_argument('--seed', type=int, default=1)
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    validator = BuildValidator.from_file(Path(args.data))
+    print(f"Compiled {len(validator.specs)} specs in {(time.perf_counter() - t0) * 1000:.1f} ms")
+
+    if args.bench:
+        _bench(validator, args.bench, args.seed)
+    if args.builds:
+        with open(args.builds, encoding='utf-8') as f:
+            builds = (json.loads(line) for line in f if line.strip())
+            for n, result in enumerate(validator.validate_many(builds, messages=True), 1):
+                status = 'ok' if result.ok else '; '.join(result.errors)
+                print(f"{n}: {status}")
+
+
+if __name__ == '__main__':
+    main()
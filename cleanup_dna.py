@@ -1,12 +1,12 @@
 #!/usr/bin/env python3
 import json
 from pathlib import Path
+from typing import Dict, Tuple
 
 DATA_JSON = Path(__file__).resolve().parent / 'data.json'
 
-def main():
-    data = json.loads(DATA_JSON.read_text(encoding='utf-8'))
-    
+def cleanup_dna(data: Dict[str, object]) -> Tuple[int, int]:
+    """Drops generic 'DNA Stats' entries in place. Returns (removed, kept)."""
     total_removed = 0
     total_kept = 0
     
@@ -31,6 +31,12 @@ def main():
         
         if original_count != len(filtered_dna):
             print(f"Spec {spec_id}: {original_count} -> {len(filtered_dna)} DNA entries ({original_count - len(filtered_dna)} removed)")
+
+    return total_removed, total_kept
+
+def main():
+    data = json.loads(DATA_JSON.read_text(encoding='utf-8'))
+    total_removed, total_kept = cleanup_dna(data)
     
     # Save the cleaned data
     if total_removed > 0:
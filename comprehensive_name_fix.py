@@ -1,29 +1,23 @@
 import json
-import os
-import re
 from difflib import SequenceMatcher
+from pathlib import Path
+
+from instrumentation import count, timed
+from name_resolution import NameResolver, wiki_titles_from_filenames
 
 def get_wiki_skill_names(wiki_cache_path):
-    skill_map = {}
-    wiki_skills = []
-    
-    for filename in os.listdir(wiki_cache_path):
-        match = re.match(r"site_pages_[A-Z0-9]_(.+)\.html\.html", filename)
-        if match:
-            skill_name_underscore = match.group(1)
-            correct_name = skill_name_underscore.replace('_', ' ')
-            wiki_skills.append(correct_name)
-    
-    return wiki_skills
+    return wiki_titles_from_filenames(wiki_cache_path)
 
 def similarity(a, b):
     return SequenceMatcher(None, a.lower(), b.lower()).ratio()
 
+@timed
 def find_best_match(skill_name, wiki_skills, threshold=0.7):
     best_match = None
     best_score = 0
     
     for wiki_skill in wiki_skills:
+        count('fuzzy.comparisons')
         score = similarity(skill_name, wiki_skill)
         if score > best_score and score >= threshold:
             best_score = score
@@ -31,48 +25,9 @@ def find_best_match(skill_name, wiki_skills, threshold=0.7):
     
     return best_match, best_score
 
-def get_manual_corrections():
-    """Manual corrections for names that can't be automatically matched"""
-    return {
-        # Frame -> Flame corrections
-        "Frame Nova": "Flame Nova",
-        "Frame Thrower": "Flame Thrower", 
-        "Frame Stone": "Flame Stone",
-        
-        # Give -> specific skill corrections  
-        "Give Cold Lightning": "Cold Lightning",
-        "Give Curse Flame": "Cursed Flame",
-        
-        # Throw -> specific corrections
-        "Throw Cold Lightning": "Cold Lightning Throw",
-        "Throw Hydrogen": "Hydrogen Throw",
-        "Throw Pollution": "Pollution Throw",
-        "Throw Wide": "Wide Throw",
-        
-        # Other obvious corrections
-        "Spining Slash": "Spinning Slash",
-        "Bears Stamina": "Bear Stamina",
-        "BloodNailTime": "Blood Nail Time",
-        
-        # DNA skill corrections that might have been missed
-        "Unimia": "Stealth", # This might be wrong, keeping as is for now
-        
-        # Job/class names
-        "Battle Magician": "Druid",  # This might need verification
-        
-        # Common typos
-        "Shield Sence": "Shield Sense",
-    }
-
-def fix_all_names():
-    data_file_path = 'data.json'
-    wiki_cache_path = 'wiki_cache'
-    
-    wiki_skills = get_wiki_skill_names(wiki_cache_path)
-    manual_corrections = get_manual_corrections()
-    
-    with open(data_file_path, 'r') as f:
-        data = json.load(f)
+def apply_name_fixes(data, resolver):
+    """Applies manual and fuzzy name corrections in place. Returns (updated_count, corrections_made)."""
+    manual_corrections = resolver.corrections
     
     updated_count = 0
     corrections_made = {}
@@ -89,7 +44,7 @@ def fix_all_names():
                 corrections_made[original_name] = f"{new_name} (manual)"
             else:
                 # Try fuzzy matching with wiki skills
-                best_match, score = find_best_match(original_name, wiki_skills, threshold=0.8)
+                best_match, score = resolver.fuzzy(original_name, threshold=0.8)
                 if best_match and score > 0.8:
                     new_name = best_match
                     corrections_made[original_name] = f"{new_name} (match: {score:.2f})"
@@ -111,7 +66,7 @@ def fix_all_names():
                 corrections_made[original_name] = f"{new_name} (manual)"
             else:
                 # Try fuzzy matching with wiki skills
-                best_match, score = find_best_match(original_name, wiki_skills, threshold=0.8)
+                best_match, score = resolver.fuzzy(original_name, threshold=0.8)
                 if best_match and score > 0.8:
                     new_name = best_match
                     corrections_made[original_name] = f"{new_name} (match: {score:.2f})"
@@ -130,7 +85,7 @@ def fix_all_names():
             if original_name in manual_corrections:
                 new_name = manual_corrections[original_name]
             else:
-                best_match, score = find_best_match(original_name, wiki_skills, threshold=0.9)
+                best_match, score = resolver.fuzzy(original_name, threshold=0.9)
                 if best_match and score > 0.9:
                     new_name = best_match
             
@@ -146,7 +101,7 @@ def fix_all_names():
                 if original_spec_name in manual_corrections:
                     spec_new_name = manual_corrections[original_spec_name]
                 else:
-                    best_match, score = find_best_match(original_spec_name, wiki_skills, threshold=0.9)
+                    best_match, score = resolver.fuzzy(original_spec_name, threshold=0.9)
                     if best_match and score > 0.9:
                         spec_new_name = best_match
                 
@@ -155,6 +110,20 @@ def fix_all_names():
                     spec['name'] = spec_new_name
                     updated_count += 1
     
+    return updated_count, corrections_made
+
+def fix_all_names():
+    data_file_path = 'data.json'
+    wiki_cache_path = 'wiki_cache'
+    
+    resolver = NameResolver.from_wiki_dir(Path(wiki_cache_path))
+    
+    with open(data_file_path, 'r') as f:
+        data = json.load(f)
+    
+    updated_count, corrections_made = apply_name_fixes(data, resolver)
+    resolver.save()
+    
     if updated_count > 0:
         with open(data_file_path, 'w') as f:
             json.dump(data, f, indent=2)
@@ -0,0 +1,547 @@
+#!/usr/bin/env python3
+"""
+Compact exports of data.json.
+
+data.bin is a memory-mappable, little-endian columnar file:
+
+- every string (ids, names, requirement keys, info/progression text) is
+  interned once in a string table;
+- skills, DNA, requirements, info fields and progression rows are
+  fixed-size struct records in their own sections;
+- lvlReq values are a flat int32 column (NULL_INT for null), and each
+  requirement carries the index of the skill it points to, so the
+  requirement graph can be read straight off the mapping.
+
+Anything that does not fit those columns (floats, nested values, unknown
+keys) is kept as compact JSON in the string table, so PackedData.to_data()
+always gives back exactly the document that was exported.
+
+Next to it goes data.<hash>.json: the same document minified, named after
+its content hash so browsers and CDNs can cache it indefinitely. publish()
+adds a small index (groups and jobs), one shard per spec and a copy of the
+build-code layout under data/, and data.manifest.json, the one uncached file app.js reads to find the
+current versions; files no longer referenced by the current or previous
+manifest are pruned.
+"""
+import argparse
+import hashlib
+import json
+import mmap
+import re
+import struct
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from atomic_io import write_bytes_atomic, write_json_atomic
+from build_codes import LAYOUT_NAME, read_layout, update_layout
+
+
+ROOT = Path(__file__).resolve().parent
+DATA_JSON = ROOT / 'data.json'
+PACKED_NAME = 'data.bin'
+MANIFEST_NAME = 'data.manifest.json'
+SPLIT_DIR = 'data'
+HASHED_RE = re.compile(r'^data\.(?:index\.|layout\.|spec\.[^.]+\.)?[0-9a-f]{10}\.json$')
+
+MAGIC = b'RQDB'
+VERSION = 1
+NONE = 0xFFFFFFFF
+NULL_INT = -2 ** 31
+
+HEADER = struct.Struct('<4sHHI')          # magic, version, section count, reserved
+SECTION = struct.Struct('<4sII')          # tag, offset, length
+SPEC = struct.Struct('<IIIIII')           # spec id, skill off/len, dna off/len, flags
+SKILL = struct.Struct('<IIIiIIIIIIIIII')  # id, name, max tag/val, flags, lvlReq/req/info/prog off+len, extra
+REQ = struct.Struct('<IIIiIiI')           # key, name, level tag/val, id, target skill index, extra
+FIELD = struct.Struct('<IIi')             # key, value tag/val (info fields)
+ROW = struct.Struct('<III')               # key, cell off/len (progression rows)
+VALUE = struct.Struct('<Ii')              # tag, val
+LVL = struct.Struct('<i')                 # lvlReq cell
+DNA = struct.Struct('<IIIiI')             # id, name, max tag/val, extra
+
+# Value tags
+T_STR, T_INT, T_NULL, T_TRUE, T_FALSE, T_JSON, T_MISSING = range(7)
+
+# Spec flags
+IN_SKILLS, IN_DNA = 1, 2
+# Skill flags
+HAS_LVL, HAS_REQ, HAS_INFO, HAS_PROG = 1, 2, 4, 8
+
+
+def minified_json(data: object) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def content_hash(blob: bytes, length: int = 10) -> str:
+    return hashlib.sha256(blob).hexdigest()[:length]
+
+
+def _is_int32(v) -> bool:
+    return isinstance(v, int) and not isinstance(v, bool) and NULL_INT < v < 2 ** 31
+
+
+class _Packer:
+    def __init__(self):
+        self.strings: List[str] = []
+        self._string_ids: Dict[str, int] = {}
+        self.sections: Dict[bytes, bytearray] = {
+            tag: bytearray() for tag in (b'SPEC', b'SKIL', b'LVLR', b'REQS', b'INFO', b'ROWS', b'CELL', b'DNA_')
+        }
+        self.counts = {tag: 0 for tag in self.sections}
+
+    def s(self, text: str) -> int:
+        i = self._string_ids.get(text)
+        if i is None:
+            i = self._string_ids[text] = len(self.strings)
+            self.strings.append(text)
+        return i
+
+    def value(self, v) -> Tuple[int, int]:
+        if v is None:
+            return T_NULL, 0
+        if v is True:
+            return T_TRUE, 0
+        if v is False:
+            return T_FALSE, 0
+        if _is_int32(v):
+            return T_INT, v
+        if isinstance(v, str):
+            return T_STR, self.s(v)
+        return T_JSON, self.s(json.dumps(v, ensure_ascii=False, separators=(',', ':')))
+
+    def extra(self, d: dict, known: Tuple[str, ...]) -> int:
+        rest = {k: v for k, v in d.items() if k not in known}
+        return self.s(json.dumps(rest, ensure_ascii=False, separators=(',', ':'))) if rest else NONE
+
+    def add(self, tag: bytes, st: struct.Struct, *fields) -> int:
+        self.sections[tag] += st.pack(*fields)
+        self.counts[tag] += 1
+        return self.counts[tag] - 1
+
+    def skill(self, s: dict, index: Dict[str, int]) -> None:
+        lvl, reqs, info, prog = s.get('lvlReq'), s.get('requires'), s.get('info'), s.get('progression')
+        columns = {
+            'id': isinstance(s.get('id'), str),
+            'name': isinstance(s.get('name'), str),
+            'maxLevel': 'maxLevel' in s,
+            'lvlReq': isinstance(lvl, list) and all(v is None or _is_int32(v) for v in lvl),
+            'requires': isinstance(reqs, dict) and all(isinstance(r, dict) for r in reqs.values()),
+            'info': isinstance(info, dict),
+            'progression': isinstance(prog, dict) and all(isinstance(row, list) for row in prog.values()),
+        }
+        known = _columnar_keys(s, columns)
+        flags = 0
+        max_tag, max_val = self.value(s['maxLevel']) if 'maxLevel' in known else (T_MISSING, 0)
+
+        lvl_off = self.counts[b'LVLR']
+        if 'lvlReq' in known:
+            flags |= HAS_LVL
+            for v in lvl:
+                self.add(b'LVLR', LVL, NULL_INT if v is None else v)
+
+        req_off = self.counts[b'REQS']
+        if 'requires' in known:
+            flags |= HAS_REQ
+            for key, r in reqs.items():
+                rknown = _columnar_keys(r, {'name': isinstance(r.get('name'), str), 'level': 'level' in r,
+                                            'id': isinstance(r.get('id'), str)})
+                lt, lv = self.value(r['level']) if 'level' in rknown else (T_MISSING, 0)
+                target = index.get(r['id'], -1) if isinstance(r.get('id'), str) else -1
+                self.add(b'REQS', REQ, self.s(key), self.s(r['name']) if 'name' in rknown else NONE, lt, lv,
+                         self.s(r['id']) if 'id' in rknown else NONE, target, self.extra(r, rknown))
+
+        info_off = self.counts[b'INFO']
+        if 'info' in known:
+            flags |= HAS_INFO
+            for key, v in info.items():
+                self.add(b'INFO', FIELD, self.s(key), *self.value(v))
+
+        prog_off = self.counts[b'ROWS']
+        if 'progression' in known:
+            flags |= HAS_PROG
+            for key, row in prog.items():
+                cell_off = self.counts[b'CELL']
+                for v in row:
+                    self.add(b'CELL', VALUE, *self.value(v))
+                self.add(b'ROWS', ROW, self.s(key), cell_off, len(row))
+
+        self.add(b'SKIL', SKILL, self.s(s['id']) if 'id' in known else NONE,
+                 self.s(s['name']) if 'name' in known else NONE,
+                 max_tag, max_val, flags,
+                 lvl_off, self.counts[b'LVLR'] - lvl_off,
+                 req_off, self.counts[b'REQS'] - req_off,
+                 info_off, self.counts[b'INFO'] - info_off,
+                 prog_off, self.counts[b'ROWS'] - prog_off,
+                 self.extra(s, known))
+
+    def dna(self, d: dict) -> None:
+        known = _columnar_keys(d, {'id': isinstance(d.get('id'), str), 'name': isinstance(d.get('name'), str),
+                                   'maxLevel': 'maxLevel' in d})
+        mt, mv = self.value(d['maxLevel']) if 'maxLevel' in known else (T_MISSING, 0)
+        self.add(b'DNA_', DNA, self.s(d['id']) if 'id' in known else NONE,
+                 self.s(d['name']) if 'name' in known else NONE, mt, mv, self.extra(d, known))
+
+
+def _columnar_keys(d: dict, columns: Dict[str, bool]) -> Tuple[str, ...]:
+    """
+    The keys of d to store in their columns: those whose flag in `columns` is
+    set, provided they come first and in `columns` order, which is the order
+    PackedData rebuilds the dict in (extra keys follow). Otherwise the whole
+    dict goes into the extra JSON, so key order survives the round trip.
+    """
+    known = tuple(k for k, ok in columns.items() if ok and k in d)
+    return known if tuple(d)[:len(known)] == known else ()
+
+
+def pack(data: dict) -> bytes:
+    """Serializes a data.json document into the data.bin layout."""
+    p = _Packer()
+    skills = data.get('skills') or {}
+    dna = data.get('dna') or {}
+    for spec_id in list(skills) + [k for k in dna if k not in skills]:
+        flags = (IN_SKILLS if spec_id in skills else 0) | (IN_DNA if spec_id in dna else 0)
+        spec_skills = skills.get(spec_id) or []
+        index = {s.get('id'): i for i, s in enumerate(spec_skills) if isinstance(s.get('id'), str)}
+        skill_off = p.counts[b'SKIL']
+        for s in spec_skills:
+            p.skill(s, index)
+        dna_off = p.counts[b'DNA_']
+        for d in dna.get(spec_id) or []:
+            p.dna(d)
+        p.add(b'SPEC', SPEC, p.s(spec_id), skill_off, p.counts[b'SKIL'] - skill_off,
+              dna_off, p.counts[b'DNA_'] - dna_off, flags)
+
+    # Everything outside skills/dna (groups, jobs, ...) plus the top-level key order.
+    meta = {'order': list(data), 'rest': {k: v for k, v in data.items() if k not in ('skills', 'dna')}}
+    blobs = [s.encode('utf-8') for s in p.strings]
+    offsets = [0]
+    for b in blobs:
+        offsets.append(offsets[-1] + len(b))
+    sections = dict(p.sections)
+    sections[b'STRO'] = bytearray(struct.pack(f'<{len(offsets)}I', *offsets))
+    sections[b'STRB'] = bytearray(b''.join(blobs))
+    sections[b'META'] = bytearray(minified_json(meta))
+
+    out = bytearray(HEADER.pack(MAGIC, VERSION, len(sections), 0))
+    table_at = len(out)
+    out += bytes(SECTION.size * len(sections))
+    entries = []
+    for tag, body in sections.items():
+        out += bytes(-len(out) % 8)  # 8-byte alignment so columns can be cast in place
+        entries.append(SECTION.pack(tag, len(out), len(body)))
+        out += body
+    out[table_at:table_at + len(entries) * SECTION.size] = b''.join(entries)
+    return bytes(out)
+
+
+class PackedData:
+    """Read-only view of a data.bin file. Nothing is decoded until it is asked for."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._buf = memoryview(self._mm)
+        magic, version, count, _ = HEADER.unpack_from(self._buf, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{self.path}: not a version {VERSION} data.bin file")
+        self._sections: Dict[bytes, memoryview] = {}
+        for i in range(count):
+            tag, off, length = SECTION.unpack_from(self._buf, HEADER.size + i * SECTION.size)
+            self._sections[tag] = self._buf[off:off + length]
+        self._str_offsets = self._sections[b'STRO'].cast('I')
+        self._str_blob = self._sections[b'STRB']
+        self._str_cache: Dict[int, str] = {}
+        self.lvl_req_column = self._sections[b'LVLR'].cast('i')
+        self._spec_index: Optional[Dict[str, int]] = None
+
+    def close(self) -> None:
+        self.lvl_req_column.release()
+        self._str_offsets.release()
+        for view in self._sections.values():
+            view.release()
+        self._buf.release()
+        self._mm.close()
+
+    def __enter__(self) -> 'PackedData':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def string(self, i: int) -> Optional[str]:
+        if i == NONE:
+            return None
+        s = self._str_cache.get(i)
+        if s is None:
+            s = self._str_cache[i] = str(self._str_blob[self._str_offsets[i]:self._str_offsets[i + 1]], 'utf-8')
+        return s
+
+    def _value(self, tag: int, val: int):
+        if tag == T_INT:
+            return val
+        if tag == T_STR:
+            return self.string(val)
+        if tag == T_JSON:
+            return json.loads(self.string(val))
+        return {T_NULL: None, T_TRUE: True, T_FALSE: False}[tag]
+
+    def _records(self, tag: bytes, st: struct.Struct, off: int, count: int):
+        return st.iter_unpack(self._sections[tag][off * st.size:(off + count) * st.size])
+
+    def _specs(self):
+        return SPEC.iter_unpack(self._sections[b'SPEC'])
+
+    @property
+    def spec_ids(self) -> List[str]:
+        return [self.string(rec[0]) for rec in self._specs()]
+
+    def _spec(self, spec_id: str) -> tuple:
+        if self._spec_index is None:
+            self._spec_index = {self.string(rec[0]): n for n, rec in enumerate(self._specs())}
+        return SPEC.unpack_from(self._sections[b'SPEC'], self._spec_index[spec_id] * SPEC.size)
+
+    def skill_count(self, spec_id: str) -> int:
+        return self._spec(spec_id)[2]
+
+    def edges(self, spec_id: str) -> List[Tuple[int, int, int]]:
+        """
+        (skill index, required skill index, level) for every requirement of a
+        skill in this spec that names a skill id; the required index is -1 when
+        that id is not a skill of this spec.
+        """
+        _, off, count, _, _, _ = self._spec(spec_id)
+        out = []
+        for i, rec in enumerate(self._records(b'SKIL', SKILL, off, count)):
+            for req in self._records(b'REQS', REQ, rec[7], rec[8]):
+                if req[4] != NONE:
+                    out.append((i, req[5], req[3] if req[2] == T_INT else 1))
+        return out
+
+    def _skill(self, rec: tuple) -> dict:
+        (id_s, name_s, max_tag, max_val, flags, lvl_off, lvl_len, req_off, req_len,
+         info_off, info_len, prog_off, prog_len, extra_s) = rec
+        s = {}
+        if id_s != NONE:
+            s['id'] = self.string(id_s)
+        if name_s != NONE:
+            s['name'] = self.string(name_s)
+        if max_tag != T_MISSING:
+            s['maxLevel'] = self._value(max_tag, max_val)
+        if flags & HAS_LVL:
+            s['lvlReq'] = [None if v == NULL_INT else v for v in self.lvl_req_column[lvl_off:lvl_off + lvl_len]]
+        if flags & HAS_REQ:
+            reqs = {}
+            for key_s, rname_s, lt, lv, rid_s, _target, rextra_s in self._records(b'REQS', REQ, req_off, req_len):
+                r = {}
+                if rname_s != NONE:
+                    r['name'] = self.string(rname_s)
+                if lt != T_MISSING:
+                    r['level'] = self._value(lt, lv)
+                if rid_s != NONE:
+                    r['id'] = self.string(rid_s)
+                if rextra_s != NONE:
+                    r.update(json.loads(self.string(rextra_s)))
+                reqs[self.string(key_s)] = r
+            s['requires'] = reqs
+        if flags & HAS_INFO:
+            s['info'] = {self.string(k): self._value(t, v)
+                         for k, t, v in self._records(b'INFO', FIELD, info_off, info_len)}
+        if flags & HAS_PROG:
+            s['progression'] = {
+                self.string(k): [self._value(t, v) for t, v in self._records(b'CELL', VALUE, cell_off, cell_len)]
+                for k, cell_off, cell_len in self._records(b'ROWS', ROW, prog_off, prog_len)
+            }
+        if extra_s != NONE:
+            s.update(json.loads(self.string(extra_s)))
+        return s
+
+    def skills(self, spec_id: str) -> List[dict]:
+        _, off, count, _, _, _ = self._spec(spec_id)
+        return [self._skill(rec) for rec in self._records(b'SKIL', SKILL, off, count)]
+
+    def dna(self, spec_id: str) -> List[dict]:
+        _, _, _, off, count, _ = self._spec(spec_id)
+        out = []
+        for id_s, name_s, mt, mv, extra_s in self._records(b'DNA_', DNA, off, count):
+            d = {}
+            if id_s != NONE:
+                d['id'] = self.string(id_s)
+            if name_s != NONE:
+                d['name'] = self.string(name_s)
+            if mt != T_MISSING:
+                d['maxLevel'] = self._value(mt, mv)
+            if extra_s != NONE:
+                d.update(json.loads(self.string(extra_s)))
+            out.append(d)
+        return out
+
+    def to_data(self) -> dict:
+        """Decodes the whole file back into the exported data.json document."""
+        meta = json.loads(bytes(self._sections[b'META']))
+        skills, dna = {}, {}
+        for spec_s, _, _, _, _, flags in self._specs():
+            spec_id = self.string(spec_s)
+            if flags & IN_SKILLS:
+                skills[spec_id] = self.skills(spec_id)
+            if flags & IN_DNA:
+                dna[spec_id] = self.dna(spec_id)
+        parts = dict(meta['rest'], skills=skills, dna=dna)
+        return {k: parts[k] for k in meta['order']}
+
+
+def _write_hashed(directory: Path, stem: str, blob: bytes) -> Path:
+    """Writes blob as <stem>.<hash>.json unless that exact file is already there."""
+    path = directory / f"{stem}.{content_hash(blob)}.json"
+    if not path.exists():
+        write_bytes_atomic(path, blob)
+    return path
+
+
+def export(data: dict, out_dir: Path) -> Tuple[Path, Path]:
+    """Writes data.bin and data.<hash>.json into out_dir; returns both paths."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    packed_path = out_dir / PACKED_NAME
+    write_bytes_atomic(packed_path, pack(data))
+    return packed_path, _write_hashed(out_dir, 'data', minified_json(data))
+
+
+def index_document(data: dict) -> dict:
+    """Everything but the per-spec skills and DNA: what the calculator needs before a spec is picked."""
+    return {k: v for k, v in data.items() if k not in ('skills', 'dna')}
+
+
+def spec_documents(data: dict) -> Dict[str, dict]:
+    """One {'skills': [...], 'dna': [...]} document per spec."""
+    skills = data.get('skills') or {}
+    dna = data.get('dna') or {}
+    return {spec_id: {'skills': skills.get(spec_id, []), 'dna': dna.get(spec_id, [])}
+            for spec_id in list(skills) + [k for k in dna if k not in skills]}
+
+
+def read_manifest(out_dir: Path) -> dict:
+    try:
+        return json.loads((out_dir / MANIFEST_NAME).read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+
+
+def _manifest_files(manifest: dict) -> set:
+    files = {manifest.get('data'), manifest.get('index'), manifest.get('layout')}
+    files.update((manifest.get('specs') or {}).values())
+    return {f for f in files if f}
+
+
+def publish(data: dict, out_dir: Path) -> dict:
+    """
+    Writes data.bin, data.<hash>.json, data/data.index.<hash>.json, one
+    data/data.spec.<id>.<hash>.json shard per spec, the append-only
+    build_layout.json (build_codes.py) with its minified copy
+    data/data.layout.<hash>.json and, last, data.manifest.json pointing at
+    them. Unchanged specs keep
+    their file names, so a refresh only invalidates what changed. Returns the
+    new manifest.
+    """
+    previous = read_manifest(out_dir)
+    _, hashed = export(data, out_dir)
+    split_dir = out_dir / SPLIT_DIR
+    split_dir.mkdir(exist_ok=True)
+    index = _write_hashed(split_dir, 'data.index', minified_json(index_document(data)))
+    specs = {}
+    for spec_id, doc in spec_documents(data).items():
+        path = _write_hashed(split_dir, f'data.spec.{spec_id}', minified_json(doc))
+        specs[spec_id] = path.relative_to(out_dir).as_posix()
+    # build_layout.json stays the append-only source of truth; pages read the hashed copy.
+    layout, _ = update_layout(data, read_layout(out_dir / LAYOUT_NAME))
+    write_json_atomic(out_dir / LAYOUT_NAME, layout)
+    layout_path = _write_hashed(split_dir, 'data.layout', minified_json(layout))
+    manifest = {
+        'version': hashed.name.split('.')[1],
+        'data': hashed.name,
+        'index': index.relative_to(out_dir).as_posix(),
+        'specs': specs,
+        'layout': layout_path.relative_to(out_dir).as_posix(),
+    }
+    # The manifest goes last so it never points at a file that isn't there yet.
+    write_json_atomic(out_dir / MANIFEST_NAME, manifest)
+
+    # Keep the previous generation for pages that loaded the old manifest a moment ago.
+    keep = _manifest_files(manifest) | _manifest_files(previous)
+    for directory in (out_dir, split_dir):
+        for path in directory.iterdir():
+            rel = path.relative_to(out_dir).as_posix()
+            if HASHED_RE.match(path.name) and rel not in keep:
+                path.unlink()
+    return manifest
+
+
+def round_trip_ok(data: dict, packed_path: Path, hashed_path: Path) -> bool:
+    with PackedData(packed_path) as packed:
+        from_bin = packed.to_data()
+    from_min = json.loads(hashed_path.read_bytes())
+    # Compare serialized forms too, so key order and int/float/bool distinctions count.
+    expected = minified_json(data)
+    return from_bin == data and from_min == data and minified_json(from_bin) == expected
+
+
+def _measure(fn, repeat: int = 20) -> Tuple[float, int]:
+    """Best wall time over `repeat` runs, and peak Python allocation of one run."""
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    tracemalloc.start()
+    result = fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return best, peak
+
+
+def _publish_and_report(data_path: Path, data: dict, out_dir: Path) -> Tuple[Path, Path]:
+    manifest = publish(data, out_dir)
+    packed_path, hashed_path = out_dir / PACKED_NAME, out_dir / manifest['data']
+    print(f"{data_path.name}: {data_path.stat().st_size:,} bytes")
+    print(f"{packed_path.name}: {packed_path.stat().st_size:,} bytes")
+    print(f"{hashed_path.name}: {hashed_path.stat().st_size:,} bytes")
+    print(f"{MANIFEST_NAME}: version {manifest['version']}, {len(manifest['specs'])} spec files in {SPLIT_DIR}/")
+    return packed_path, hashed_path
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Write data.bin, content-hashed data files and data.manifest.json")
+    ap.add_argument('--data', default=str(DATA_JSON), help="data.json to export")
+    ap.add_argument('--out-dir', help="output directory (default: next to --data)")
+    ap.add_argument('--check', action='store_true',
+                    help="export to a temporary directory, verify the round trip and compare load cost; writes nothing else")
+    args = ap.parse_args()
+
+    data_path = Path(args.data)
+    data = json.loads(data_path.read_text(encoding='utf-8'))
+    if not args.check:
+        _publish_and_report(data_path, data, Path(args.out_dir) if args.out_dir else data_path.parent)
+        return
+    with tempfile.TemporaryDirectory(prefix='data_export.') as tmp:
+        packed_path, hashed_path = _publish_and_report(data_path, data, Path(tmp))
+        ok = round_trip_ok(data, packed_path, hashed_path)
+        print(f"round trip: {'identical' if ok else 'MISMATCH'}")
+
+        def open_packed():
+            # Open, list the specs and decode the one being looked at (everything else stays mapped).
+            with PackedData(packed_path) as packed:
+                specs = packed.spec_ids
+                return specs, packed.skills(specs[0]), packed.edges(specs[0])
+
+        json_time, json_mem = _measure(lambda: json.loads(data_path.read_text(encoding='utf-8')))
+        bin_time, bin_mem = _measure(open_packed)
+    print(f"json.loads : {json_time * 1000:7.2f} ms, {json_mem / 1024:8.1f} KiB allocated")
+    print(f"PackedData : {bin_time * 1000:7.2f} ms, {bin_mem / 1024:8.1f} KiB allocated")
+    raise SystemExit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
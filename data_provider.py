@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Hot-reloadable game data for long-running processes.
+
+A DataProvider holds the current DataSnapshot: the data.json document, its
+version and whatever the process compiles from it (a BuildValidator, a
+BuildChecker, ...). A request takes current() once and uses that snapshot
+to the end, so a reload never changes data under it.
+
+A watcher thread polls data.manifest.json (or data.json when no manifest is
+published). When the published version changes it reads the new
+content-hashed data file, which data_export.publish() never rewrites in
+place, compiles it on the watcher thread and then swaps the snapshot
+reference in one assignment. If reading or compiling fails the old
+snapshot stays active and the failure is counted in metrics().
+"""
+import argparse
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Generic, NamedTuple, Optional, Tuple, TypeVar
+
+from data_export import MANIFEST_NAME, content_hash
+
+
+T = TypeVar('T')
+
+
+class DataSnapshot(NamedTuple):
+    version: str
+    data: dict
+    compiled: object
+    loaded_at: float       # time.time() when it became active
+    load_seconds: float    # read + compile time
+
+
+class DataProvider(Generic[T]):
+    """Serves the current snapshot of a data.json and reloads it when a new version is published."""
+
+    def __init__(self, data_path: Path, compile: Callable[[dict, Path], T], interval: float = 2.0):
+        self.data_path = Path(data_path)
+        self.manifest_path = self.data_path.parent / MANIFEST_NAME
+        self.compile = compile
+        self.interval = interval
+        self.reloads = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+        self._signature: Optional[tuple] = None
+        self._lock = threading.Lock()    # one reload at a time
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._snapshot: DataSnapshot = self._load(*self._published())
+
+    def current(self) -> DataSnapshot:
+        """The active snapshot; hold on to it for the whole request."""
+        return self._snapshot
+
+    def _stat(self, path: Path) -> Optional[Tuple[int, int]]:
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _published(self) -> Tuple[str, Path]:
+        """(version, file to load) of what is published right now."""
+        self._signature = (self._stat(self.manifest_path), self._stat(self.data_path))
+        if self._signature[0] is not None:
+            try:
+                manifest = json.loads(self.manifest_path.read_text(encoding='utf-8'))
+                return str(manifest['version']), self.manifest_path.parent / manifest['data']
+            except (OSError, ValueError, KeyError):
+                pass
+        return content_hash(self.data_path.read_bytes()), self.data_path
+
+    def _load(self, version: str, path: Path) -> DataSnapshot:
+        t0 = time.perf_counter()
+        data = json.loads(path.read_text(encoding='utf-8'))
+        compiled = self.compile(data, self.data_path.parent)
+        return DataSnapshot(version, data, compiled, time.time(), time.perf_counter() - t0)
+
+    def check(self) -> bool:
+        """Reloads if a new version was published since the last check. Returns True if it swapped."""
+        with self._lock:
+            if (self._stat(self.manifest_path), self._stat(self.data_path)) == self._signature:
+                return False
+            try:
+                version, path = self._published()
+                if version == self._snapshot.version:
+                    return False
+                snapshot = self._load(version, path)
+            except Exception as e:  # keep serving the old snapshot until the files change again
+                self.failures += 1
+                self.last_error = f"{type(e).__name__}: {e}"
+                return False
+            self._snapshot = snapshot
+            self.reloads += 1
+            self.last_error = None
+            return True
+
+    def reload(self) -> bool:
+        """check() even if the files look unchanged (e.g. on SIGHUP)."""
+        self._signature = None
+        return self.check()
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def start(self) -> 'DataProvider[T]':
+        """Starts the watcher thread (no-op when interval is 0 or it is already running)."""
+        if self.interval > 0 and self._thread is None:
+            self._thread = threading.Thread(target=self._watch, name='data-provider', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def metrics(self) -> dict:
+        snap = self._snapshot
+        return {
+            'data_version': snap.version,
+            'data_loaded_at': snap.loaded_at,
+            'reload_seconds': round(snap.load_seconds, 4),
+            'reloads': self.reloads,
+            'reload_failures': self.failures,
+            'last_reload_error': self.last_error,
+        }
+
+
+def main():
+    from build_validation import DATA_JSON, BuildValidator
+
+    ap = argparse.ArgumentParser(description="Watch the published data and report each reload")
+    ap.add_argument('--data', default=str(DATA_JSON))
+    ap.add_argument('--interval', type=float, default=2.0, help="seconds between checks")
+    args = ap.parse_args()
+
+    provider = DataProvider(Path(args.data), lambda data, _: BuildValidator(data), args.interval)
+    print(json.dumps(provider.metrics()))
+    failures = 0
+    try:
+        while True:
+            time.sleep(args.interval)
+            if provider.check() or provider.failures != failures:
+                failures = provider.failures
+                print(json.dumps(provider.metrics()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
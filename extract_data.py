@@ -1,11 +1,16 @@
 #!/usr/bin/env python3
 import argparse
+import copy
 import json
 import os
 import re
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 
+import instrumentation
+from atomic_io import write_bytes_atomic
+from instrumentation import count, timed
+
 
 GROUP_FROM_BG = {
     # background-image: url(/template/images/clas/<key>.png)
@@ -37,6 +42,7 @@ def _clean_skill_filename(filename: str) -> str:
     return base.strip()
 
 
+@timed
 def find_latest_calculator_index(snapshots_root: Path) -> Optional[Path]:
     candidates = list(snapshots_root.glob("requiem.isnet.ru/**/calculator.html"))
     if not candidates:
@@ -52,6 +58,7 @@ def find_latest_calculator_index(snapshots_root: Path) -> Optional[Path]:
     return candidates[0]
 
 
+@timed
 def parse_groups_and_subclasses(index_html: str) -> Tuple[Dict[str, str], Dict[str, List[Dict[str, object]]]]:
     """
     Returns tuple:
@@ -109,6 +116,7 @@ def parse_groups_and_subclasses(index_html: str) -> Tuple[Dict[str, str], Dict[s
     return groups, jobs_by_group
 
 
+@timed
 def find_latest_subclass_page(snapshots_root: Path, subclass_id: str) -> Optional[Path]:
     candidates = list(snapshots_root.glob(f"requiem.isnet.ru/**/calculator/{subclass_id}.html"))
     if not candidates:
@@ -122,6 +130,7 @@ def find_latest_subclass_page(snapshots_root: Path, subclass_id: str) -> Optiona
     return candidates[0]
 
 
+@timed
 def parse_skills_and_dna_from_subclass(html: str) -> Tuple[List[Dict[str, object]], List[Dict[str, object]]]:
     skills: List[Dict[str, object]] = []
     dna: List[Dict[str, object]] = []
@@ -147,12 +156,112 @@ def parse_skills_and_dna_from_subclass(html: str) -> Tuple[List[Dict[str, object
     return skills, dna
 
 
-def build_data(snapshots_root: Path) -> Dict[str, object]:
-    index_path = find_latest_calculator_index(snapshots_root)
+class SnapshotIndex:
+    """
+    One walk over the snapshot tree, remembering the latest calculator.html
+    and the latest calculator/<id>.html for every subclass id (same ordering
+    as find_latest_calculator_index / find_latest_subclass_page).
+    """
+
+    @timed
+    def __init__(self, snapshots_root: Path):
+        self.index_page: Optional[Path] = None
+        self.subclass_pages: Dict[str, Path] = {}
+        index_key = None
+        subclass_keys: Dict[str, Tuple[int, str]] = {}
+
+        def ts_of(dirpath: str) -> int:
+            try:
+                return int(os.path.basename(dirpath))
+            except ValueError:
+                return 0
+
+        site_root = snapshots_root / "requiem.isnet.ru"
+        for dirpath, _dirnames, filenames in os.walk(site_root):
+            in_calculator_dir = os.path.basename(dirpath) == "calculator"
+            for name in filenames:
+                if name == "calculator.html":
+                    p = Path(dirpath, name)
+                    key = (ts_of(dirpath), str(p))
+                    if index_key is None or key > index_key:
+                        index_key, self.index_page = key, p
+                elif in_calculator_dir and name.endswith(".html"):
+                    p = Path(dirpath, name)
+                    key = (ts_of(os.path.dirname(dirpath)), str(p))
+                    sid = name[:-len(".html")]
+                    if sid not in subclass_keys or key > subclass_keys[sid]:
+                        subclass_keys[sid] = key
+                        self.subclass_pages[sid] = p
+
+
+def _read_page(page: Path) -> str:
+    raw = page.read_bytes()
+    count('extract.pages_parsed')
+    count('io.bytes_read', len(raw))
+    return raw.decode('utf-8', errors='ignore')
+
+
+class ExtractCache:
+    """Per-page extraction results keyed by path, mtime and size, persisted as JSON."""
+
+    VERSION = 1
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+        try:
+            raw = json.loads(path.read_text(encoding="utf-8"))
+            self.entries = raw["pages"] if raw.get("version") == self.VERSION else {}
+        except (OSError, ValueError, KeyError):
+            self.entries = {}
+
+    def get(self, page: Path, kind: str, parse):
+        """Returns parse(html) for `page`, reading and parsing it only if it changed."""
+        st = page.stat()
+        key = f"{kind}:{page}"
+        entry = self.entries.get(key)
+        if entry and entry["mtime"] == st.st_mtime_ns and entry["size"] == st.st_size:
+            self.hits += 1
+            count('extract.cache_hits')
+            return entry["result"]
+        self.misses += 1
+        result = parse(_read_page(page))
+        self.entries[key] = {"mtime": st.st_mtime_ns, "size": st.st_size, "result": result}
+        self._dirty = True
+        return result
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        payload = {"version": self.VERSION, "pages": self.entries}
+        write_bytes_atomic(self.path, json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+        self._dirty = False
+
+
+def _parse_index(html: str):
+    groups, jobs_by_group = parse_groups_and_subclasses(html)
+    return [groups, jobs_by_group]
+
+
+def _parse_subclass(html: str):
+    skills, dna = parse_skills_and_dna_from_subclass(html)
+    return [skills, dna]
+
+
+def build_data(snapshots_root: Path, cache: Optional[ExtractCache] = None) -> Dict[str, object]:
+    snapshots = SnapshotIndex(snapshots_root)
+    index_path = snapshots.index_page
     if not index_path:
         raise SystemExit("calculator.html not found in snapshots")
-    index_html = index_path.read_text(encoding='utf-8', errors='ignore')
-    groups, jobs_by_group = parse_groups_and_subclasses(index_html)
+
+    def load(page: Path, kind: str, parse):
+        if cache is not None:
+            return copy.deepcopy(cache.get(page, kind, parse))
+        return parse(_read_page(page))
+
+    groups, jobs_by_group = load(index_path, "index", _parse_index)
 
     skills_map: Dict[str, List[Dict[str, object]]] = {}
     dna_map: Dict[str, List[Dict[str, object]]] = {}
@@ -160,14 +269,16 @@ def build_data(snapshots_root: Path) -> Dict[str, object]:
         for job in jobs:
             for spec in job.get("specs", []):
                 subclass_id = str(spec["id"])  # ensure string
-                page_path = find_latest_subclass_page(snapshots_root, subclass_id)
+                page_path = snapshots.subclass_pages.get(subclass_id)
                 if not page_path:
                     continue
-                html = page_path.read_text(encoding='utf-8', errors='ignore')
-                skills, dna = parse_skills_and_dna_from_subclass(html)
+                skills, dna = load(page_path, "subclass", _parse_subclass)
                 skills_map[subclass_id] = skills
                 dna_map[subclass_id] = dna
 
+    if cache is not None:
+        cache.save()
+
     out = {
         "groups": [{"id": gid, "name": gname} for gid, gname in groups.items()],
         "jobs": jobs_by_group,
@@ -181,15 +292,28 @@ def main():
     ap = argparse.ArgumentParser(description="Extract Requiem calculator data from snapshots into english-calculator/data.json")
     ap.add_argument("snapshots_root", help="Path to waybackup_snapshots directory")
     ap.add_argument("output_json", help="Path to write data.json")
+    ap.add_argument("--incremental", action="store_true", help="reuse cached results for snapshot pages that did not change")
+    ap.add_argument("--cache", help="extraction cache file (default: .extract_cache.json next to output_json)")
+    instrumentation.add_arguments(ap)
     args = ap.parse_args()
 
     snapshots_root = Path(args.snapshots_root).resolve()
     out_path = Path(args.output_json).resolve()
 
-    data = build_data(snapshots_root)
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    out_path.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding='utf-8')
+    cache = None
+    if args.incremental:
+        cache = ExtractCache(Path(args.cache).resolve() if args.cache else out_path.with_name(".extract_cache.json"))
+    with instrumentation.from_args(args):
+        with instrumentation.stage('extract'):
+            data = build_data(snapshots_root, cache)
+        with instrumentation.stage('write'):
+            blob = json.dumps(data, ensure_ascii=False, indent=2)
+            out_path.parent.mkdir(parents=True, exist_ok=True)
+            out_path.write_text(blob, encoding='utf-8')
+            count('io.bytes_written', len(blob))
     print(f"Wrote {out_path}")
+    if cache is not None:
+        print(f"Snapshot pages: {cache.hits} unchanged (reused), {cache.misses} parsed")
 
 
 if __name__ == "__main__":
@@ -1,47 +1,17 @@
 #!/usr/bin/env python3
+import argparse
 import json
-import re
 from pathlib import Path
-from html import unescape
+from typing import Dict, Mapping
 
-
-WIKI_DIR = Path(__file__).resolve().parent / 'wiki_cache'
-DATA_JSON = Path(__file__).resolve().parent / 'data.json'
-
-
-def normalize_name(name: str) -> str:
-    return re.sub(r"[^a-z0-9]", "", name.lower())
+from wiki_index import normalize_name, open_wiki_index
 
 
-def extract_prereq_levels(html: str):
-    # Try to capture the row titled "Prerequisite Level" and collect its numeric cells
-    m = re.search(r"<th[^>]*>\s*Prerequisite Level\s*</th>\s*<td[^>]*>(.*?)</td>(.*?)</tr>", html, re.I | re.S)
-    if not m:
-        return None
-    row = m.group(0)
-    vals = re.findall(r">\s*(\d+)\s*<", row)
-    if not vals:
-        return None
-    return [int(v) for v in vals]
-
-
-def build_wiki_index():
-    idx = {}
-    for p in WIKI_DIR.glob('site_pages_*.html.html'):
-        try:
-            html = p.read_text(encoding='utf-8', errors='ignore')
-        except Exception:
-            continue
-        # Extract the page title inside <h1 class="page-title">Name</h1>
-        t = re.search(r"<h1[^>]*class=\"page-title\"[^>]*>\s*([^<]+)\s*</h1>", html)
-        title = unescape(t.group(1).strip()) if t else p.stem
-        idx[normalize_name(title)] = (p, html, title)
-    return idx
+DATA_JSON = Path(__file__).resolve().parent / 'data.json'
 
 
-def main():
-    data = json.loads(DATA_JSON.read_text(encoding='utf-8'))
-    wiki_idx = build_wiki_index()
+def apply_prereq_levels(data: Dict[str, object], wiki_idx: Mapping[str, dict]) -> int:
+    """Sets lvlReq from the 'Prerequisite Level' rows. Returns the number of skills updated."""
     updated = 0
 
     # Work only on skills; DNA typically doesn't have level prereq arrays in 2009 pages
@@ -53,12 +23,24 @@ def main():
             page = wiki_idx.get(key)
             if not page:
                 continue
-            _, html, _ = page
-            lvl_req = extract_prereq_levels(html)
+            lvl_req = page['prereqLevels']
             if lvl_req:
                 if s.get('lvlReq') != lvl_req:
-                    s['lvlReq'] = lvl_req
+                    s['lvlReq'] = list(lvl_req)
                     updated += 1
+    return updated
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument('--jobs', type=int, default=1, help="wiki pages to parse in parallel (0 = one per CPU)")
+    ap.add_argument('--stream', type=int, default=0, metavar='N',
+                    help="parse pages on demand, keeping at most N in memory, instead of indexing everything")
+    args = ap.parse_args()
+
+    data = json.loads(DATA_JSON.read_text(encoding='utf-8'))
+    wiki_idx = open_wiki_index(jobs=args.jobs, stream_cache=args.stream)
+    updated = apply_prereq_levels(data, wiki_idx)
 
     if updated:
         DATA_JSON.write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding='utf-8')
@@ -69,5 +51,3 @@ def main():
 
 if __name__ == '__main__':
     main()
-
-
@@ -1,9 +1,11 @@
 #!/usr/bin/env python3
+import argparse
 import json
-import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from urllib.parse import urlencode
-from urllib.request import Request, urlopen
+
+from wayback_fetch import WAYBACK_ROOT, FetchError, Fetcher, Manifest
 
 
 TS_LIST = [
@@ -17,32 +19,46 @@ TS_LIST = [
 ]
 
 
-def fetch_one(sub_id: str, out_dir: Path) -> None:
-    print(f"spec {sub_id}: starting")
+def ajax_url(sub_id: str, ts: str, root: str = WAYBACK_ROOT) -> str:
+    return f"{root}/web/{ts}id_/http://requiem.isnet.ru/ajax/calculator/load?{urlencode({'c': sub_id})}"
+
+
+def fetch_one(sub_id: str, out_dir: Path, fetcher: Fetcher, manifest: Manifest,
+              root: str = WAYBACK_ROOT, parallel: int = 3) -> bool:
+    """Fetches one spec's payload, trying the TS_LIST fallbacks concurrently; newest success wins."""
     for ts in TS_LIST:
-        url = f"https://web.archive.org/web/{ts}id_/http://requiem.isnet.ru/ajax/calculator/load?{urlencode({'c': sub_id})}"
         dest = out_dir / f"load-{sub_id}-{ts}.txt"
         if dest.exists():
-            print(f"  {ts}: cached -> {dest.name}")
-            return
-        try:
-            print(f"  {ts}: GET …", end="")
-            req = Request(url, headers={"User-Agent": "Mozilla/5.0 (Wayback fetch)"})
-            with urlopen(req, timeout=20) as r, dest.open("wb") as w:
-                w.write(r.read())
-            print(" ok")
-            time.sleep(0.2)  # be nice to Wayback
-            return
-        except Exception as e:
-            print(f" fail ({e.__class__.__name__})")
-            continue
-    print(f"  all timestamps failed for spec {sub_id}")
+            print(f"spec {sub_id}: cached -> {dest.name}")
+            manifest.record(sub_id, ts, dest, ok=True)
+            return True
+    try:
+        idx, body = fetcher.fetch_first([ajax_url(sub_id, ts, root) for ts in TS_LIST], parallel=parallel)
+    except FetchError as e:
+        print(f"spec {sub_id}: all timestamps failed")
+        manifest.record(sub_id, None, None, ok=False, error=str(e))
+        return False
+    ts = TS_LIST[idx]
+    dest = out_dir / f"load-{sub_id}-{ts}.txt"
+    tmp = dest.with_suffix(".part")
+    tmp.write_bytes(body)
+    tmp.replace(dest)
+    print(f"spec {sub_id}: {ts} ok -> {dest.name}")
+    manifest.record(sub_id, ts, dest, ok=True)
+    return True
 
 
 def main():
     root = Path(__file__).resolve().parent
+    ap = argparse.ArgumentParser(description="Fetch archived calculator AJAX payloads for every spec")
+    ap.add_argument("--jobs", type=int, default=4, help="specs fetched in parallel")
+    ap.add_argument("--fallbacks", type=int, default=3, help="timestamps tried at once per spec")
+    ap.add_argument("--wayback-root", default=WAYBACK_ROOT, help="Wayback host (point at a local stand-in to test)")
+    ap.add_argument("--out", default=str(root / "ajax"))
+    args = ap.parse_args()
+
     data_path = root / "data.json"
-    out_dir = root / "ajax"
+    out_dir = Path(args.out)
     out_dir.mkdir(parents=True, exist_ok=True)
 
     data = json.loads(data_path.read_text(encoding="utf-8"))
@@ -53,13 +69,18 @@ def main():
                 sub_ids.add(str(spec["id"]))
 
     print(f"Total specs: {len(sub_ids)}")
-    for sub_id in sorted(sub_ids):
-        fetch_one(sub_id, out_dir)
+    fetcher = Fetcher(per_host=args.jobs * args.fallbacks)
+    manifest = Manifest(out_dir / "manifest.json")
+    try:
+        with ThreadPoolExecutor(max_workers=args.jobs) as pool:
+            ok = sum(pool.map(lambda s: fetch_one(s, out_dir, fetcher, manifest, args.wayback_root, args.fallbacks),
+                              sorted(sub_ids)))
+    finally:
+        manifest.save()
+        fetcher.close()
 
-    print("Done. Fetched AJAX payloads to:", out_dir)
+    print(f"Done. {ok}/{len(sub_ids)} specs fetched to: {out_dir} ({fetcher.pool.opened} connections opened)")
 
 
 if __name__ == "__main__":
     main()
-
-
@@ -1,11 +1,13 @@
 #!/usr/bin/env python3
+import argparse
 import csv
-import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from urllib.request import urlopen
 
+from wayback_fetch import WAYBACK_ROOT, FetchError, Fetcher, Manifest
 
-WAYBACK = "https://web.archive.org/web/{ts}id_/http://requiem.isnet.ru/template/js/{name}"
+
+WAYBACK = "{root}/web/{ts}id_/http://requiem.isnet.ru/template/js/{name}"
 NAMES = [
     "tooltip.js",
     "calculator.js",
@@ -26,35 +28,60 @@ def iter_timestamps(csv_path: Path):
                 yield ts
 
 
-def fetch_all(csv_path: Path, out_dir: Path, max_ts: int = 50):
+def fetch_all(csv_path: Path, out_dir: Path, max_ts: int = 50, jobs: int = 8, root: str = WAYBACK_ROOT):
     out_dir.mkdir(parents=True, exist_ok=True)
-    count = 0
+    timestamps = []
     for ts in iter_timestamps(csv_path):
+        timestamps.append(ts)
+        if len(timestamps) >= max_ts:
+            break
+
+    todo = []
+    for ts in timestamps:
         for name in NAMES:
-            url = WAYBACK.format(ts=ts, name=name)
             out = out_dir / f"{name.replace('.js','')}-{ts}.js"
-            if out.exists():
-                continue
-            try:
-                with urlopen(url, timeout=20) as r, out.open("wb") as w:
-                    w.write(r.read())
-            except Exception:
-                # ignore failures; try other timestamps
-                pass
-        count += 1
-        if count >= max_ts:
-            break
+            if not out.exists():
+                todo.append((ts, name, out))
+
+    fetcher = Fetcher(per_host=jobs)
+    manifest = Manifest(out_dir / "manifest.json")
+
+    def fetch_one(item):
+        ts, name, out = item
+        try:
+            body = fetcher.get(WAYBACK.format(root=root, ts=ts, name=name))
+        except FetchError as e:
+            # ignore failures; try other timestamps
+            manifest.record(f"{name}@{ts}", ts, None, ok=False, error=str(e))
+            return False
+        tmp = out.with_suffix(".part")
+        tmp.write_bytes(body)
+        tmp.replace(out)
+        manifest.record(f"{name}@{ts}", ts, out, ok=True)
+        return True
+
+    try:
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            ok = sum(pool.map(fetch_one, todo))
+    finally:
+        manifest.save()
+        fetcher.close()
+    return ok, len(todo)
 
 
 def main():
+    ap = argparse.ArgumentParser(description="Fetch archived calculator JS sources from the Wayback Machine")
+    ap.add_argument("--jobs", type=int, default=8, help="downloads in parallel")
+    ap.add_argument("--max-ts", type=int, default=50, help="timestamps to fetch")
+    ap.add_argument("--wayback-root", default=WAYBACK_ROOT, help="Wayback host (point at a local stand-in to test)")
+    args = ap.parse_args()
+
     root = Path(__file__).resolve().parent.parent / "waybackup_snapshots"
     csv_path = root / "waybackup_http.requiem.isnet.ru.csv"
     out_dir = Path(__file__).resolve().parent / "sources"
-    fetch_all(csv_path, out_dir)
-    print("Fetched sources into:", out_dir)
+    ok, total = fetch_all(csv_path, out_dir, args.max_ts, args.jobs, args.wayback_root)
+    print(f"Fetched {ok}/{total} sources into:", out_dir)
 
 
 if __name__ == "__main__":
     main()
-
-
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Candidate-pruning replacement for comprehensive_name_fix.find_best_match().
+
+The brute-force scan builds a SequenceMatcher for every (name, wiki title)
+pair. FuzzyMatcher returns exactly the same (match, score) but only runs
+SequenceMatcher.ratio() on titles that can still win:
+
+- titles are bucketed by length, and a whole bucket is skipped when
+  2*min(len)/(len_a+len_b) (difflib's real_quick_ratio bound) is below the
+  threshold or below the best score found so far;
+- candidates sharing the most character trigrams with the name are tried
+  first, so a high best score is found early and tightens the bound;
+- a title sharing s of the name's T trigrams scores at most
+  1 - (T - s) / (3 * (len_a + len_b)), since each inserted or deleted
+  character destroys at most three trigrams. The walk down the
+  shared-trigram list stops once that bound falls below the best score,
+  and length buckets of titles sharing no trigram are skipped the same way;
+- every remaining candidate is rejected on its length, then on its
+  character-multiset overlap (difflib's quick_ratio bound, from
+  precomputed counts), before ratio().
+"""
+import argparse
+import json
+import random
+import time
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from instrumentation import count, timed
+
+
+ROOT = Path(__file__).resolve().parent
+_EPS = 1e-9
+
+
+def _trigrams(s: str) -> set:
+    padded = f"  {s} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _ratio_bound(matches: int, total: int) -> float:
+    # Same arithmetic as difflib's _calculate_ratio so bounds and real scores compare exactly.
+    return 2.0 * matches / total if total else 1.0
+
+
+class FuzzyMatcher:
+    def __init__(self, titles: Sequence[str]):
+        self.titles = list(titles)
+        self._lower = [t.lower() for t in self.titles]
+        self._counts = [Counter(t) for t in self._lower]
+        self._by_len: Dict[int, List[int]] = defaultdict(list)
+        self._grams: Dict[str, List[int]] = defaultdict(list)
+        for i, t in enumerate(self._lower):
+            self._by_len[len(t)].append(i)
+            for g in _trigrams(t):
+                self._grams[g].append(i)
+        self._memo: Dict[Tuple[str, float], Tuple[Optional[str], float]] = {}
+        # Number of full SequenceMatcher.ratio() calls, for benchmarking.
+        self.comparisons = 0
+
+    @timed
+    def best_match(self, name: str, threshold: float = 0.7) -> Tuple[Optional[str], float]:
+        """Same result as find_best_match(name, titles, threshold), ties going to the earliest title."""
+        key = (name, threshold)
+        if key not in self._memo:
+            before = self.comparisons
+            self._memo[key] = self._search(name, threshold)
+            count('fuzzy.searches')
+            count('fuzzy.comparisons', self.comparisons - before)
+        else:
+            count('fuzzy.memo_hits')
+        return self._memo[key]
+
+    def _search(self, name: str, threshold: float) -> Tuple[Optional[str], float]:
+        a = name.lower()
+        la = len(a)
+        a_counts = Counter(a)
+
+        # Lengths whose real_quick_ratio bound can reach the threshold, best bound first.
+        lengths = []
+        for lb in self._by_len:
+            bound = _ratio_bound(min(la, lb), la + lb)
+            if bound >= threshold:
+                lengths.append((bound, lb))
+        lengths.sort(reverse=True)
+        if not lengths:
+            return None, 0
+        longest = max(lb for _, lb in lengths)
+
+        # Titles of infeasible lengths are counted too (Counter.update runs in C);
+        # consider() drops them on the length bound.
+        shared = Counter()
+        grams = _trigrams(a)
+        for g in grams:
+            shared.update(self._grams.get(g, ()))
+
+        # A title sharing s of the name's trigrams scores at most trigram_bound(s, lb):
+        # every insertion or deletion turning one into the other destroys at most
+        # three trigrams, and ratio() = 1 - (insertions + deletions) / (la + lb).
+        n_grams = len(grams)
+
+        def trigram_bound(s: int, lb: int) -> float:
+            return 1.0 - (n_grams - s) / (3.0 * (la + lb))
+
+        best_idx = None
+        best_score = 0
+        matcher = SequenceMatcher(None)
+        matcher.set_seq1(a)
+
+        def out_of_reach(bound: float) -> bool:
+            # Rounding margin: a bound within _EPS of the best may still tie it.
+            return bound + _EPS < threshold or bound + _EPS < best_score
+
+        def consider(i: int, s: int) -> None:
+            nonlocal best_idx, best_score
+            lb = len(self._lower[i])
+            bound = _ratio_bound(min(la, lb), la + lb)
+            if bound < threshold or bound < best_score or out_of_reach(trigram_bound(s, lb)):
+                return
+            b_counts = self._counts[i]
+            overlap = sum(min(n, b_counts[c]) for c, n in a_counts.items())
+            bound = _ratio_bound(overlap, la + lb)
+            if bound < threshold or bound < best_score:
+                return
+            if best_idx is not None and bound == best_score and i > best_idx:
+                return
+            matcher.set_seq2(self._lower[i])
+            self.comparisons += 1
+            score = matcher.ratio()
+            if score < threshold:
+                return
+            if score > best_score or (best_idx is not None and score == best_score and i < best_idx):
+                best_idx, best_score = i, score
+
+        # Most shared trigrams first: once even the longest feasible title with
+        # this many shared trigrams is out of reach, so is every title after it.
+        for i, n in shared.most_common():
+            if out_of_reach(trigram_bound(n, longest)):
+                break
+            consider(i, n)
+        for bound, lb in lengths:
+            if bound < best_score:
+                break
+            # Titles left in this bucket share no trigram with the name.
+            if out_of_reach(trigram_bound(0, lb)):
+                continue
+            for i in self._by_len[lb]:
+                if i not in shared:
+                    consider(i, 0)
+
+        if best_idx is None:
+            return None, 0
+        return self.titles[best_idx], best_score
+
+
+def _load_names(data_path: Path) -> List[str]:
+    data = json.loads(data_path.read_text(encoding='utf-8'))
+    names = [s['name'] for skills in data.get('skills', {}).values() for s in skills]
+    names += [d['name'] for dna in data.get('dna', {}).values() for d in dna]
+    for group in data.get('jobs', {}).values():
+        for job in group:
+            names.append(job['name'])
+            names += [spec['name'] for spec in job.get('specs', [])]
+    return names
+
+
+def _synthetic_titles(seed_names: Sequence[str], size: int, rng: random.Random) -> List[str]:
+    """Plausible wiki titles: the real names plus typo'd / re-worded variants."""
+    alphabet = 'abcdefghijklmnopqrstuvwxyz '
+    words = sorted({w for n in seed_names for w in n.split()})
+    titles = sorted(set(seed_names))
+    while len(titles) < size:
+        base = list(rng.choice(seed_names) if rng.random() < 0.5 else ' '.join(rng.sample(words, rng.randint(1, 3))))
+        for _ in range(rng.randint(0, 3)):
+            pos = rng.randrange(len(base) + 1)
+            op = rng.random()
+            if op < 0.4 and base:
+                base[min(pos, len(base) - 1)] = rng.choice(alphabet)
+            elif op < 0.7:
+                base.insert(pos, rng.choice(alphabet))
+            elif base:
+                del base[min(pos, len(base) - 1)]
+        titles.append(''.join(base).strip().title() or 'X')
+    return titles
+
+
+def main():
+    from comprehensive_name_fix import find_best_match, get_wiki_skill_names
+
+    ap = argparse.ArgumentParser(description="Benchmark FuzzyMatcher against the brute-force find_best_match scan")
+    ap.add_argument('--data', default=str(ROOT / 'data.json'), help="data.json whose names are matched")
+    ap.add_argument('--wiki-dir', default=str(ROOT / 'wiki_cache'), help="wiki cache to take titles from")
+    ap.add_argument('--titles', type=int, default=3000, help="synthetic title count when the wiki cache is absent")
+    ap.add_argument('--threshold', type=float, default=0.8)
+    ap.add_argument('--seed', type=int, default=1)
+    args = ap.parse_args()
+
+    names = _load_names(Path(args.data))
+    wiki_dir = Path(args.wiki_dir)
+    if wiki_dir.is_dir() and any(wiki_dir.iterdir()):
+        titles = get_wiki_skill_names(str(wiki_dir))
+        source = str(wiki_dir)
+    else:
+        titles = _synthetic_titles(names, args.titles, random.Random(args.seed))
+        source = 'synthetic'
+    unique = sorted(set(names))
+    print(f"{len(names)} names ({len(unique)} unique) x {len(titles)} titles ({source}), threshold {args.threshold}")
+
+    t0 = time.perf_counter()
+    expected = {n: find_best_match(n, titles, args.threshold) for n in unique}
+    brute = time.perf_counter() - t0
+
+    matcher = FuzzyMatcher(titles)
+    t0 = time.perf_counter()
+    got = {n: matcher.best_match(n, args.threshold) for n in unique}
+    fast = time.perf_counter() - t0
+
+    mismatched = [n for n in unique if got[n] != expected[n]]
+    print(f"brute force : {brute:8.3f}s  {len(unique) * len(titles):>10} ratio() calls")
+    print(f"FuzzyMatcher: {fast:8.3f}s  {matcher.comparisons:>10} ratio() calls  ({brute / fast if fast else float('inf'):.1f}x)")
+    print(f"mismatches  : {len(mismatched)}")
+    for n in mismatched[:10]:
+        print(f"  {n!r}: expected {expected[n]}, got {got[n]}")
+    raise SystemExit(1 if mismatched else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Where the data pipeline spends its time.
+
+A Trace collects, while it is active:
+
+- stages: wall and CPU time, peak RSS and the counters that moved, for each
+  `with stage(name):` block (pipeline.py wraps every stage in one);
+- functions: calls, wall and CPU time of everything decorated with @timed
+  (the parse_* helpers, build_wiki_index, find_best_match, ...);
+- counters: count(name, n) totals such as wiki.pages_parsed,
+  fuzzy.comparisons or io.bytes_written.
+
+When no trace is active, timed functions and count() only pay for one
+global lookup. Worker processes (build_wiki_index --jobs) keep their own
+timers, which are not collected; the parent still counts their pages.
+
+Scripts expose it through add_arguments() / from_args():
+
+    --trace FILE    write the trace as JSON
+    --profile FILE  also run cProfile and dump its stats (pstats format)
+    --trace-memory  tracemalloc peak per stage (slows the run down)
+
+Inspect a dump with `python -m pstats FILE`.
+"""
+import argparse
+import cProfile
+import functools
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+TRACE_VERSION = 1
+
+
+def peak_rss_kb() -> Optional[int]:
+    """Peak resident set size of this process so far, in KiB (None where unavailable)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak  # bytes on macOS, KiB elsewhere
+
+
+class Trace:
+    def __init__(self, trace_memory: bool = False):
+        self.trace_memory = trace_memory
+        self.counters: Dict[str, int] = {}
+        self.functions: Dict[str, List[float]] = {}    # name -> [calls, wall, cpu]
+        self.stages: List[dict] = []
+        self.started = time.time()
+        self._wall0 = time.perf_counter()
+        self._cpu0 = time.process_time()
+
+    def count(self, name: str, n: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def add_call(self, name: str, wall: float, cpu: float) -> None:
+        entry = self.functions.get(name)
+        if entry is None:
+            self.functions[name] = [1, wall, cpu]
+        else:
+            entry[0] += 1
+            entry[1] += wall
+            entry[2] += cpu
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[dict]:
+        """Times a block; the yielded dict is the stage's record and may be annotated."""
+        record = {'name': name}
+        before = dict(self.counters)
+        if self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        wall0, cpu0 = time.perf_counter(), time.process_time()
+        try:
+            yield record
+        finally:
+            record['wall_s'] = round(time.perf_counter() - wall0, 6)
+            record['cpu_s'] = round(time.process_time() - cpu0, 6)
+            record['peak_rss_kb'] = peak_rss_kb()
+            if self.trace_memory and tracemalloc.is_tracing():
+                record['peak_traced_kb'] = tracemalloc.get_traced_memory()[1] // 1024
+            record['counters'] = {k: v - before.get(k, 0) for k, v in self.counters.items() if v != before.get(k, 0)}
+            self.stages.append(record)
+
+    def to_dict(self) -> dict:
+        functions = {
+            name: {'calls': int(calls), 'wall_s': round(wall, 6), 'cpu_s': round(cpu, 6)}
+            for name, (calls, wall, cpu) in sorted(self.functions.items(), key=lambda kv: -kv[1][1])
+        }
+        return {
+            'version': TRACE_VERSION,
+            'argv': sys.argv,
+            'pid': os.getpid(),
+            'started': self.started,
+            'wall_s': round(time.perf_counter() - self._wall0, 6),
+            'cpu_s': round(time.process_time() - self._cpu0, 6),
+            'peak_rss_kb': peak_rss_kb(),
+            'stages': self.stages,
+            'functions': functions,
+            'counters': dict(sorted(self.counters.items())),
+        }
+
+    def write(self, path: Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), indent=2), encoding='utf-8')
+
+
+_active: Optional[Trace] = None
+
+
+def active() -> Optional[Trace]:
+    return _active
+
+
+def count(name: str, n: int = 1) -> None:
+    """Adds n to a counter of the active trace, if any."""
+    if _active is not None:
+        _active.count(name, n)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[dict]:
+    if _active is None:
+        yield {'name': name}
+    else:
+        with _active.stage(name) as record:
+            yield record
+
+
+def timed(fn: Callable = None, *, name: Optional[str] = None):
+    """Decorator recording calls, wall and CPU time of fn in the active trace."""
+    if fn is None:
+        return functools.partial(timed, name=name)
+    module = fn.__module__
+    if module == '__main__':  # a script run directly: label it by file name like its importers would
+        module = Path(getattr(sys.modules['__main__'], '__file__', module)).stem
+    label = name or f"{module}.{fn.__qualname__}"
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        trace = _active
+        if trace is None:
+            return fn(*args, **kwargs)
+        wall0, cpu0 = time.perf_counter(), time.process_time()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            trace.add_call(label, time.perf_counter() - wall0, time.process_time() - cpu0)
+    return wrapper
+
+
+@contextmanager
+def tracing(trace_path: Optional[Path] = None, profile_path: Optional[Path] = None,
+            trace_memory: bool = False) -> Iterator[Optional[Trace]]:
+    """
+    Activates a Trace for the block and writes it to trace_path afterwards,
+    with cProfile running when profile_path is given. Yields None (and costs
+    nothing) when neither path is set.
+    """
+    global _active
+    if trace_path is None and profile_path is None:
+        yield None
+        return
+    trace = Trace(trace_memory)
+    profiler = cProfile.Profile() if profile_path is not None else None
+    previous, _active = _active, trace
+    if trace_memory:
+        tracemalloc.start()
+    if profiler is not None:
+        profiler.enable()
+    try:
+        yield trace
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            profiler.dump_stats(str(profile_path))
+        if trace_memory:
+            tracemalloc.stop()
+        _active = previous
+        if trace_path is not None:
+            trace.write(trace_path)
+
+
+def add_arguments(ap: argparse.ArgumentParser) -> None:
+    ap.add_argument('--trace', metavar='FILE', help="write per-stage/per-function timings and counters as JSON")
+    ap.add_argument('--profile', metavar='FILE', help="also dump cProfile stats to FILE (read with python -m pstats)")
+    ap.add_argument('--trace-memory', action='store_true', help="with --trace: tracemalloc peak per stage (slower)")
+
+
+def from_args(args: argparse.Namespace):
+    """tracing() configured from add_arguments() options."""
+    return tracing(Path(args.trace) if args.trace else None,
+                   Path(args.profile) if args.profile else None,
+                   args.trace_memory)
+
+
+def summarize(trace: dict, top: int = 15) -> str:
+    """Human-readable summary of a trace dict (Trace.to_dict() or a loaded --trace file)."""
+    lines = [f"total: {trace['wall_s']:.3f}s wall, {trace['cpu_s']:.3f}s cpu, peak rss {trace.get('peak_rss_kb')} KiB"]
+    for s in trace['stages']:
+        lines.append(f"  stage {s['name']:<20} {s['wall_s']:>9.3f}s wall {s['cpu_s']:>9.3f}s cpu")
+    for name, f in list(trace['functions'].items())[:top]:
+        lines.append(f"  {name:<60} {f['calls']:>8} calls {f['wall_s']:>9.3f}s wall")
+    for name, n in trace['counters'].items():
+        lines.append(f"  {name:<40} {n:>12,}")
+    return '\n'.join(lines)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Summarize a --trace file")
+    ap.add_argument('trace', help="JSON written by --trace")
+    ap.add_argument('--top', type=int, default=15, help="functions to list, slowest first")
+    args = ap.parse_args()
+    print(summarize(json.loads(Path(args.trace).read_text(encoding='utf-8')), args.top))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Single name-resolution service for the naming and enrichment scripts.
+
+Wiki titles (derived from wiki_cache/ filenames) are normalized once, the
+manual correction tables are merged into one lookup, and fuzzy matches are
+persisted to a cache file so later runs skip resolution entirely for names
+already resolved against the same titles and corrections.
+"""
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from atomic_io import write_bytes_atomic
+from fuzzy_match import FuzzyMatcher
+from instrumentation import count
+from wiki_index import WIKI_DIR, normalize_name
+
+
+CACHE_NAME = 'name_cache.json'
+_WIKI_FILENAME_RE = re.compile(r"site_pages_[A-Z0-9]_(.+)\.html\.html")
+
+
+def wiki_titles_from_filenames(wiki_cache_path) -> List[str]:
+    """Titles as the naming scripts have always derived them: 'site_pages_F_Fire_Ball.html.html' -> 'Fire Ball'."""
+    wiki_skills = []
+    for filename in os.listdir(wiki_cache_path):
+        match = _WIKI_FILENAME_RE.match(filename)
+        if match:
+            wiki_skills.append(match.group(1).replace('_', ' '))
+    return wiki_skills
+
+
+def get_dna_name_mappings():
+    return {
+        "BlessofBody": "Bless of Body",
+        "DesireforLife": "Desire for Life",
+        "AttentionAccuracy": "Attention Accuracy",
+        "ShieldHitAccuracy": "Shield Hit Accuracy",
+        "ShieldIntensify": "Shield Intensify",
+        "EquilibriumTime": "Equilibrium Time",
+        "RemedyCast": "Remedy Cast",
+        "ShieldSence": "Shield Sence",
+        "SelfHeal": "Self Heal",
+        "LightningShield": "Lightning Shield",
+        "SelfLightningShockCast": "Self Lightning Shock Cast",
+        "BlessofMana": "Bless of Mana",
+        "LightHeal": "Light Heal",
+        "LightningShockCooltime": "Lightning Shock Cooltime",
+        "SelfLightningShock": "Self Lightning Shock",
+        "LightHealCast": "Light Heal Cast",
+        "LightHealMana": "Light Heal Mana",
+        "HolyReflectionAccuracy": "Holy Reflection Accuracy",
+        "HolyReflectionTime": "Holy Reflection Time",
+        "LightPartyHeal": "Light Party Heal",
+        "LastDitch": "Last Ditch",
+        "DashCooltime": "Dash Cooltime",
+        "HammerTheButcher": "Hammer The Butcher",
+        "BlessofBodyTime": "Bless of Body Time",
+        "DoubleHandMaster": "Double Hand Master",
+        "BurningHell": "Burning Hell",
+        "IronPhysics": "Iron Physics",
+        "TwoHandMaster": "Two Hand Master",
+        "Unblocking": "Unblocking",
+        "FireBall": "Fire Ball",
+        "FlameThrower": "Flame Thrower",
+        "CharmOfMana": "Charm Of Mana",
+        "FlameArrow": "Flame Arrow",
+        "FlameNova": "Flame Nova",
+        "DutchCourage": "Dutch Courage",
+        "BurningHellLonger": "Burning Hell Longer",
+        "FlameThrowerCast": "Flame Thrower Cast",
+        "FlameShield": "Flame Shield",
+        "FireTotemCast": "Fire Totem Cast",
+        "PlagueCharm": "Plague Charm",
+        "FireRain": "Fire Rain",
+        "FireRainCast": "Fire Rain Cast",
+        "SpeedWeaponTime": "Speed Weapon Time",
+        "LegStrikeTime": "Leg Strike Time",
+        "ConcentrateTime": "Concentrate Time",
+        "RangeWeaponMaster": "Range Weapon Master",
+        "ArmourCrashComboTime": "Armour Crash Combo Time",
+        "ScrewAttackTime": "Screw Attack Time",
+        "BloodBoltTime": "Blood Bolt Time",
+        "VampireTouch": "Vampire Touch",
+        "PrisonTime": "Prison Time",
+        "BloodNailTime": "Blood Nail Time",
+        "PoisonNova": "Poison Nova",
+        "BloodBusterWide": "Blood Buster Wide",
+        "TimeBomb": "Time Bomb"
+    }
+
+
+def get_manual_corrections():
+    """Manual corrections for names that can't be automatically matched"""
+    return {
+        # Frame -> Flame corrections
+        "Frame Nova": "Flame Nova",
+        "Frame Thrower": "Flame Thrower", 
+        "Frame Stone": "Flame Stone",
+        
+        # Give -> specific skill corrections  
+        "Give Cold Lightning": "Cold Lightning",
+        "Give Curse Flame": "Cursed Flame",
+        
+        # Throw -> specific corrections
+        "Throw Cold Lightning": "Cold Lightning Throw",
+        "Throw Hydrogen": "Hydrogen Throw",
+        "Throw Pollution": "Pollution Throw",
+        "Throw Wide": "Wide Throw",
+        
+        # Other obvious corrections
+        "Spining Slash": "Spinning Slash",
+        "Bears Stamina": "Bear Stamina",
+        "BloodNailTime": "Blood Nail Time",
+        
+        # DNA skill corrections that might have been missed
+        "Unimia": "Stealth", # This might be wrong, keeping as is for now
+        
+        # Job/class names
+        "Battle Magician": "Druid",  # This might need verification
+        
+        # Common typos
+        "Shield Sence": "Shield Sense",
+    }
+
+
+def get_corrections() -> Dict[str, str]:
+    """The DNA CamelCase table and the manual corrections as one lookup (manual wins)."""
+    corrections = dict(get_dna_name_mappings())
+    corrections.update(get_manual_corrections())
+    return corrections
+
+
+class NameResolver:
+    """
+    Resolves raw names to canonical wiki titles.
+
+    - exact(name): title whose normalized form equals the name's
+    - correction(name): entry of the merged correction table
+    - fuzzy(name, threshold): FuzzyMatcher result, persisted in the cache file
+    """
+
+    def __init__(self, wiki_titles: Iterable[str], cache_path: Optional[Path] = None):
+        self.titles = list(wiki_titles)
+        self.corrections = get_corrections()
+        self.by_norm: Dict[str, str] = {}
+        for title in self.titles:
+            self.by_norm[normalize_name(title)] = title
+        self.cache_path = cache_path
+        self._matcher: Optional[FuzzyMatcher] = None
+        self._fingerprint = self._compute_fingerprint()
+        self._fuzzy: Dict[str, Tuple[Optional[str], float]] = self._load_cache()
+        self._dirty = False
+        self.cache_hits = 0
+
+    @classmethod
+    def from_wiki_dir(cls, wiki_dir: Path = WIKI_DIR, persist: bool = True) -> 'NameResolver':
+        titles = wiki_titles_from_filenames(wiki_dir) if Path(wiki_dir).is_dir() else []
+        return cls(titles, Path(wiki_dir) / CACHE_NAME if persist else None)
+
+    def _compute_fingerprint(self) -> str:
+        payload = json.dumps([sorted(self.titles), self.corrections], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def _load_cache(self) -> Dict[str, Tuple[Optional[str], float]]:
+        if not self.cache_path:
+            return {}
+        try:
+            cached = json.loads(self.cache_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return {}
+        if cached.get('fingerprint') != self._fingerprint:
+            return {}
+        return {k: tuple(v) for k, v in (cached.get('fuzzy') or {}).items()}
+
+    def save(self) -> None:
+        """Persists newly resolved fuzzy matches; a no-op when nothing changed."""
+        if not self.cache_path or not self._dirty:
+            return
+        payload = {'fingerprint': self._fingerprint, 'fuzzy': self._fuzzy}
+        try:
+            write_bytes_atomic(self.cache_path, json.dumps(payload, ensure_ascii=False).encode('utf-8'))
+        except OSError:
+            return
+        self._dirty = False
+
+    def exact(self, name: str) -> Optional[str]:
+        return self.by_norm.get(normalize_name(name))
+
+    def correction(self, name: str) -> Optional[str]:
+        return self.corrections.get(name)
+
+    def fuzzy(self, name: str, threshold: float) -> Tuple[Optional[str], float]:
+        key = f"{threshold}|{name}"
+        hit = self._fuzzy.get(key)
+        if hit is not None:
+            self.cache_hits += 1
+            count('names.fuzzy_cache_hits')
+            return hit
+        if self._matcher is None:
+            self._matcher = FuzzyMatcher(self.titles)
+        result = self._matcher.best_match(name, threshold)
+        self._fuzzy[key] = result
+        self._dirty = True
+        return result
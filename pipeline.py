@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Single-pass data refresh.
+
+Runs the extraction / naming / enrichment scripts as in-memory stages on one
+loaded document instead of chaining seven scripts that each load and rewrite
+data.json. The document is serialized once at the end and written
+atomically, so a crash halfway through leaves the previous data.json intact.
+"""
+import argparse
+import json
+from pathlib import Path
+from typing import Callable, Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+import cleanup_dna
+import comprehensive_name_fix
+import convert_skill_names
+import data_export
+import enrich_with_full_requirements
+import instrumentation
+import enrich_with_skill_stats
+import extract_data
+import extract_requirements_from_wiki
+from atomic_io import write_json_atomic
+from instrumentation import count
+from name_resolution import NameResolver
+
+
+ROOT = Path(__file__).resolve().parent
+DATA_JSON = ROOT / 'data.json'
+WIKI_DIR = ROOT / 'wiki_cache'
+
+
+class Context:
+    """Shared state handed to every stage; expensive inputs are built lazily, once."""
+
+    def __init__(self, data: Optional[dict], wiki_dir: Path, snapshots_root: Optional[Path], jobs: int = 1,
+                 stream_cache: int = 0, extract_cache: Optional[Path] = None, out_dir: Optional[Path] = None):
+        self.data = data
+        self.wiki_dir = wiki_dir
+        self.jobs = jobs
+        self.stream_cache = stream_cache
+        self.extract_cache = extract_cache
+        self.snapshots_root = snapshots_root
+        # Where stages may write artifacts besides data.json; None on a dry run,
+        # which also keeps the wiki index and name caches from being saved.
+        self.out_dir = out_dir
+        # (name, fn) steps that must run after data.json is written, in order.
+        self.after_write: List[Tuple[str, Callable[[], str]]] = []
+        self._wiki_idx = None
+        self._resolver = None
+
+    @property
+    def wiki_idx(self) -> Mapping[str, dict]:
+        if self._wiki_idx is None:
+            from wiki_index import open_wiki_index
+            self._wiki_idx = open_wiki_index(self.wiki_dir, jobs=self.jobs, stream_cache=self.stream_cache,
+                                             persist=self.out_dir is not None)
+        return self._wiki_idx
+
+    @property
+    def resolver(self) -> 'NameResolver':
+        if self._resolver is None:
+            self._resolver = NameResolver.from_wiki_dir(self.wiki_dir)
+        return self._resolver
+
+
+class Stage(NamedTuple):
+    name: str
+    after: Sequence[str]
+    run: Callable[[Context], str]
+    help: str
+
+
+def _stage_extract(ctx: Context) -> str:
+    if ctx.snapshots_root is None:
+        raise SystemExit("stage 'extract' needs --snapshots")
+    cache = None
+    if ctx.extract_cache is not None:
+        cache = extract_data.ExtractCache(ctx.extract_cache)
+    ctx.data = extract_data.build_data(ctx.snapshots_root, cache)
+    return f"{len(ctx.data['skills'])} specs extracted"
+
+
+def _stage_convert_names(ctx: Context) -> str:
+    renamed = convert_skill_names.apply_wiki_names(ctx.data, ctx.resolver)
+    renamed += convert_skill_names.apply_dna_name_mappings(ctx.data)
+    return f"{renamed} names converted"
+
+
+def _stage_name_fix(ctx: Context) -> str:
+    updated, _ = comprehensive_name_fix.apply_name_fixes(ctx.data, ctx.resolver)
+    return f"{updated} names fixed"
+
+
+def _stage_cleanup_dna(ctx: Context) -> str:
+    removed, kept = cleanup_dna.cleanup_dna(ctx.data)
+    return f"{removed} DNA entries removed, {kept} kept"
+
+
+def _stage_prereq_levels(ctx: Context) -> str:
+    updated = extract_requirements_from_wiki.apply_prereq_levels(ctx.data, ctx.wiki_idx)
+    return f"lvlReq updated for {updated} skills"
+
+
+def _stage_skill_stats(ctx: Context) -> str:
+    updated = enrich_with_skill_stats.apply_skill_stats(ctx.data, ctx.wiki_idx)
+    return f"stats updated for {updated} skills"
+
+
+def _stage_full_requirements(ctx: Context) -> str:
+    updated, with_reqs = enrich_with_full_requirements.apply_full_requirements(ctx.data, ctx.wiki_idx)
+    return f"requirements updated for {updated} skills ({with_reqs} with any reqs)"
+
+
+def _stage_export(ctx: Context) -> str:
+    if ctx.out_dir is None:
+        return "skipped (dry run)"
+
+    def publish() -> str:
+        manifest = data_export.publish(ctx.data, ctx.out_dir)
+        return f"published {manifest['data']}, {len(manifest['specs'])} spec files and {data_export.MANIFEST_NAME}"
+
+    # The manifest must not point at data that data.json does not have yet, so
+    # publishing waits until data.json has been written.
+    ctx.after_write.append(('publish', publish))
+    return "deferred until data.json is written"
+
+
+# Declared in the order the scripts were historically run; `after` lists the
+# stages that must run first when both are selected.
+STAGES: Dict[str, Stage] = {s.name: s for s in [
+    Stage('extract', [], _stage_extract, 'extract_data.py'),
+    Stage('convert-names', ['extract'], _stage_convert_names, 'convert_skill_names.py'),
+    Stage('name-fix', ['convert-names'], _stage_name_fix, 'comprehensive_name_fix.py'),
+    Stage('cleanup-dna', ['name-fix'], _stage_cleanup_dna, 'cleanup_dna.py'),
+    Stage('prereq-levels', ['name-fix'], _stage_prereq_levels, 'extract_requirements_from_wiki.py'),
+    Stage('skill-stats', ['name-fix'], _stage_skill_stats, 'enrich_with_skill_stats.py'),
+    Stage('full-requirements', ['prereq-levels'], _stage_full_requirements, 'enrich_with_full_requirements.py'),
+    Stage('export', ['cleanup-dna', 'skill-stats', 'full-requirements'], _stage_export, 'data_export.py'),
+]}
+
+DEFAULT_STAGES = [name for name in STAGES if name != 'extract']
+
+
+def resolve_order(selected: Sequence[str], with_deps: bool = False) -> List[str]:
+    """Topologically orders the selected stages (pulling in their dependencies if asked)."""
+    unknown = [s for s in selected if s not in STAGES]
+    if unknown:
+        raise SystemExit(f"unknown stage(s): {', '.join(unknown)}")
+    wanted = set(selected)
+    if with_deps:
+        todo = list(selected)
+        while todo:
+            for dep in STAGES[todo.pop()].after:
+                if dep not in wanted:
+                    wanted.add(dep)
+                    todo.append(dep)
+
+    order: List[str] = []
+    visiting = set()
+
+    def visit(name: str) -> None:
+        if name in order:
+            return
+        if name in visiting:
+            raise SystemExit(f"stage dependency cycle at {name}")
+        visiting.add(name)
+        for dep in STAGES[name].after:
+            if dep in wanted:
+                visit(dep)
+        visiting.discard(name)
+        order.append(name)
+
+    for name in STAGES:
+        if name in wanted:
+            visit(name)
+    return order
+
+
+def run_pipeline(stages: Sequence[str], data_path: Path = DATA_JSON, output: Optional[Path] = None,
+                 wiki_dir: Path = WIKI_DIR, snapshots_root: Optional[Path] = None,
+                 with_deps: bool = False, dry_run: bool = False, jobs: int = 1,
+                 stream_cache: int = 0, incremental: bool = False) -> dict:
+    order = resolve_order(stages, with_deps)
+    data = None
+    if 'extract' not in order:
+        with instrumentation.stage('load'):
+            raw = data_path.read_bytes()
+            count('io.bytes_read', len(raw))
+            data = json.loads(raw)
+    # A dry run writes nothing, caches included.
+    extract_cache = data_path.with_name('.extract_cache.json') if incremental and not dry_run else None
+    out = output or data_path
+    ctx = Context(data, wiki_dir, snapshots_root, jobs, stream_cache, extract_cache,
+                  out_dir=None if dry_run else out.parent)
+
+    for name in order:
+        with instrumentation.stage(name) as record:
+            record['result'] = STAGES[name].run(ctx)
+        print(f"[{name}] {record['result']}" + (f" ({record['wall_s']:.2f}s)" if 'wall_s' in record else ''))
+    if ctx._resolver is not None and not dry_run:
+        ctx.resolver.save()
+
+    if not dry_run:
+        with instrumentation.stage('write'):
+            write_json_atomic(out, ctx.data)
+        print(f"Wrote {out}")
+        for name, step in ctx.after_write:
+            with instrumentation.stage(name) as record:
+                record['result'] = step()
+            print(f"[{name}] {record['result']}")
+    return ctx.data
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Run the data.json refresh as in-memory stages with a single write")
+    ap.add_argument('--stages', help=f"comma-separated stages to run (default: {','.join(DEFAULT_STAGES)})")
+    ap.add_argument('--skip', default='', help="comma-separated stages to leave out")
+    ap.add_argument('--with-deps', action='store_true', help="also run the stages the selected ones depend on")
+    ap.add_argument('--snapshots', help="waybackup_snapshots directory (required by the 'extract' stage)")
+    ap.add_argument('--incremental', action='store_true',
+                    help="reuse cached extraction results for snapshot pages that did not change")
+    ap.add_argument('--data', default=str(DATA_JSON), help="data.json to load")
+    ap.add_argument('--output', help="where to write the result (default: overwrite --data)")
+    ap.add_argument('--wiki-dir', default=str(WIKI_DIR), help="wiki cache directory")
+    ap.add_argument('--jobs', type=int, default=1, help="wiki pages to parse in parallel (0 = one per CPU)")
+    ap.add_argument('--stream', type=int, default=0, metavar='N',
+                    help="parse wiki pages on demand, keeping at most N in memory, instead of indexing everything")
+    ap.add_argument('--dry-run', action='store_true', help="run the stages but do not write anything")
+    ap.add_argument('--list', action='store_true', help="list the available stages and exit")
+    instrumentation.add_arguments(ap)
+    args = ap.parse_args()
+
+    if args.list:
+        for s in STAGES.values():
+            after = f" (after {', '.join(s.after)})" if s.after else ''
+            print(f"{s.name:<18} {s.help}{after}")
+        return
+
+    stages = args.stages.split(',') if args.stages else list(DEFAULT_STAGES)
+    if args.snapshots and not args.stages:
+        stages.insert(0, 'extract')
+    skip = {s for s in args.skip.split(',') if s}
+    stages = [s.strip() for s in stages if s.strip() and s.strip() not in skip]
+
+    with instrumentation.from_args(args) as trace:
+        run_pipeline(
+            stages,
+            data_path=Path(args.data).resolve(),
+            output=Path(args.output).resolve() if args.output else None,
+            wiki_dir=Path(args.wiki_dir).resolve(),
+            snapshots_root=Path(args.snapshots).resolve() if args.snapshots else None,
+            with_deps=args.with_deps,
+            dry_run=args.dry_run,
+            jobs=args.jobs,
+            stream_cache=args.stream,
+            incremental=args.incremental,
+        )
+    if trace is not None:
+        print(instrumentation.summarize(trace.to_dict()))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,15 +1,23 @@
 #!/usr/bin/env python3
-import re
+import argparse
+import json
+import threading
 import time
 from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from html.parser import HTMLParser
+from urllib.error import HTTPError
 from urllib.parse import urljoin, urlparse
 from urllib.request import Request, urlopen
 from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+from atomic_io import write_bytes_atomic
 
 
 BASE = "https://rondayan42.github.io/requiem-wiki/"
 UA = {"User-Agent": "Mozilla/5.0 (RequiemScraper)"}
+STATE_NAME = ".crawl_state.json"
 
 
 class LinkParser(HTMLParser):
@@ -23,59 +31,210 @@ class LinkParser(HTMLParser):
                 self.links.append(href)
 
 
-def fetch(url: str) -> bytes:
-    req = Request(url, headers=UA)
-    with urlopen(req, timeout=20) as r:
-        return r.read()
-
-
-def crawl(out_dir: Path, max_pages: int = 1000) -> None:
+def fetch_conditional(url: str, validators: Optional[Dict[str, str]] = None) -> Tuple[int, bytes, Dict[str, str]]:
+    """
+    GET with If-None-Match / If-Modified-Since from a previous response.
+    Returns (status, body, new validators); status 304 comes back with an empty body.
+    """
+    headers = dict(UA)
+    validators = validators or {}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+    try:
+        with urlopen(Request(url, headers=headers), timeout=20) as r:
+            body = r.read()
+            status, resp_headers = r.status, r.headers
+    except HTTPError as e:
+        if e.code != 304:
+            raise
+        return 304, b"", validators
+    fresh = {}
+    if resp_headers.get("ETag"):
+        fresh["etag"] = resp_headers["ETag"]
+    if resp_headers.get("Last-Modified"):
+        fresh["last_modified"] = resp_headers["Last-Modified"]
+    return status, body, fresh
+
+
+class HostRateLimiter:
+    """Spaces requests to the same host at least 1/rate seconds apart, across threads."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url: str) -> None:
+        if not self.interval:
+            return
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next.get(host, now))
+            self._next[host] = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class CrawlState:
+    """Frontier, seen-set and per-URL validators, persisted so a crawl can resume."""
+
+    def __init__(self, path: Path, base: str):
+        self.path = path
+        self.base = base
+        self.frontier = deque([base])
+        self.queued = {base}
+        self.seen = set()
+        self.validators: Dict[str, Dict[str, str]] = {}
+
+    @classmethod
+    def load(cls, path: Path, base: str) -> "CrawlState":
+        state = cls(path, base)
+        try:
+            raw = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return state
+        if raw.get("base") != base:
+            return state
+        state.validators = raw.get("validators") or {}
+        if raw.get("frontier"):
+            # Interrupted crawl: pick up exactly where it stopped.
+            state.frontier = deque(raw["frontier"])
+            state.queued = set(state.frontier)
+            state.seen = set(raw.get("seen") or [])
+        return state
+
+    def push(self, url: str) -> None:
+        if url not in self.seen and url not in self.queued:
+            self.queued.add(url)
+            self.frontier.append(url)
+
+    def pop(self) -> str:
+        url = self.frontier.popleft()
+        self.queued.discard(url)
+        return url
+
+    def save(self) -> None:
+        payload = {
+            "base": self.base,
+            "frontier": list(self.frontier),
+            "seen": sorted(self.seen),
+            "validators": self.validators,
+        }
+        write_bytes_atomic(self.path, json.dumps(payload).encode("utf-8"))
+
+
+def target_path(out_dir: Path, url: str, base: str = BASE) -> Path:
+    rel = url[len(base):] if url.startswith(base) else url.replace("://", "_")
+    rel = rel.strip("/") or "index"
+    return out_dir / (rel.replace("/", "_") + ".html")
+
+
+def extract_links(url: str, content: bytes, base: str = BASE) -> list:
+    domain = urlparse(base).netloc
+    links = []
+    try:
+        parser = LinkParser()
+        parser.feed(content.decode("utf-8", errors="ignore"))
+        for href in parser.links:
+            nxt = urljoin(url, href)
+            pu = urlparse(nxt)
+            if pu.netloc == domain and nxt.startswith(base):
+                if '#' in nxt:
+                    nxt = nxt.split('#',1)[0]
+                links.append(nxt)
+    except Exception:
+        pass
+    return links
+
+
+def crawl(out_dir: Path, max_pages: int = 1000, base: str = BASE, concurrency: int = 8,
+          rate: float = 20.0, resume: bool = True, save_every: int = 50) -> Dict[str, float]:
+    """
+    Crawls `base` with up to `concurrency` requests in flight and at most
+    `rate` requests/sec per host. Pages already on disk are revalidated with
+    conditional requests. The frontier and seen-set are saved to
+    out_dir/.crawl_state.json, so an interrupted crawl resumes where it
+    stopped. Returns run statistics.
+    """
     out_dir.mkdir(parents=True, exist_ok=True)
-    seen = set()
-    q = deque([BASE])
+    state_path = out_dir / STATE_NAME
+    state = CrawlState.load(state_path, base) if resume else CrawlState(state_path, base)
+    limiter = HostRateLimiter(rate)
+    stats = {"fetched": 0, "not_modified": 0, "failed": 0}
+    print(f"Crawling {base} (max {max_pages}, {concurrency} workers, {rate:g} req/s per host)")
+
+    def work(url: str):
+        target = target_path(out_dir, url, base)
+        validators = state.validators.get(url) if target.exists() else None
+        limiter.wait(url)
+        status, content, fresh = fetch_conditional(url, validators)
+        if status == 304:
+            content = target.read_bytes()
+        else:
+            target.write_bytes(content)
+        return status, content, fresh
+
+    started = time.perf_counter()
     pages = 0
-    domain = urlparse(BASE).netloc
-    print(f"Crawling {BASE} (max {max_pages})")
-
-    while q and pages < max_pages:
-        url = q.popleft()
-        if url in seen:
-            continue
-        seen.add(url)
-        try:
-            content = fetch(url)
-        except Exception:
-            continue
-
-        # save
-        rel = url[len(BASE):] if url.startswith(BASE) else url.replace("://", "_")
-        rel = rel.strip("/") or "index"
-        target = out_dir / (rel.replace("/", "_") + ".html")
-        target.write_bytes(content)
-        pages += 1
-        print(f"  saved: {target.name}")
-
-        # extract links
-        try:
-            parser = LinkParser()
-            parser.feed(content.decode("utf-8", errors="ignore"))
-            for href in parser.links:
-                nxt = urljoin(url, href)
-                pu = urlparse(nxt)
-                if pu.netloc == domain and nxt.startswith(BASE):
-                    if '#' in nxt:
-                        nxt = nxt.split('#',1)[0]
-                    if nxt not in seen:
-                        q.append(nxt)
-        except Exception:
-            pass
-        time.sleep(0.05)
-
-    print(f"Done. Cached {pages} pages in {out_dir}")
+    in_flight = {}
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            while (state.frontier or in_flight) and pages < max_pages:
+                while state.frontier and len(in_flight) < concurrency and pages + len(in_flight) < max_pages:
+                    url = state.pop()
+                    if url in state.seen:
+                        continue
+                    state.seen.add(url)
+                    in_flight[pool.submit(work, url)] = url
+                if not in_flight:
+                    continue
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    url = in_flight.pop(fut)
+                    try:
+                        status, content, fresh = fut.result()
+                    except Exception:
+                        stats["failed"] += 1
+                        continue
+                    pages += 1
+                    if status == 304:
+                        stats["not_modified"] += 1
+                    else:
+                        stats["fetched"] += 1
+                        print(f"  saved: {target_path(out_dir, url, base).name}")
+                    if fresh:
+                        state.validators[url] = fresh
+                    for nxt in extract_links(url, content, base):
+                        state.push(nxt)
+                    if pages % save_every == 0:
+                        state.save()
+    finally:
+        # Anything still in flight was never completed; put it back for the next run.
+        for url in in_flight.values():
+            state.seen.discard(url)
+            state.queued.add(url)
+            state.frontier.appendleft(url)
+        state.save()
+
+    elapsed = time.perf_counter() - started
+    stats.update(pages=pages, seconds=elapsed, pages_per_sec=pages / elapsed if elapsed else 0.0)
+    print(f"Done. {pages} pages ({stats['fetched']} fetched, {stats['not_modified']} not modified, "
+          f"{stats['failed']} failed) in {elapsed:.2f}s = {stats['pages_per_sec']:.1f} pages/sec -> {out_dir}")
+    return stats
 
 
 if __name__ == "__main__":
-    root = Path(__file__).resolve().parent / "wiki_cache"
-    crawl(root, max_pages=1200)
-
-
+    ap = argparse.ArgumentParser(description="Mirror the Requiem wiki into wiki_cache/")
+    ap.add_argument("--base", default=BASE, help="site root to crawl (e.g. a local http.server for testing)")
+    ap.add_argument("--out", default=str(Path(__file__).resolve().parent / "wiki_cache"), help="output directory")
+    ap.add_argument("--max-pages", type=int, default=1200)
+    ap.add_argument("--concurrency", type=int, default=8, help="requests in flight at once")
+    ap.add_argument("--rate", type=float, default=20.0, help="max requests/sec per host (0 = unlimited)")
+    ap.add_argument("--fresh", action="store_true", help="ignore any saved frontier/validators and start over")
+    args = ap.parse_args()
+    base = args.base if args.base.endswith("/") else args.base + "/"
+    crawl(Path(args.out), max_pages=args.max_pages, base=base, concurrency=args.concurrency,
+          rate=args.rate, resume=not args.fresh)
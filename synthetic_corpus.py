@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Synthetic wiki mirror and calculator snapshots for a data.json document.
+
+Renders, for every skill of the document, a site_pages_*.html.html page in
+the layout the wiki_index parse_* helpers read (page title, 'skill info'
+table, red Prerequisites table, progression wikitable, 'Level needed' and
+'Prerequisite Level' rows), and a Wayback-style snapshot tree with
+calculator.html and one calculator/<id>.html per spec in the markup
+extract_data.py scrapes. Pages carry seeded filler markup so parsing cost is
+closer to the real mirror than a bare table would be.
+
+scale_data() grows a document before rendering: --scale N makes N
+replicas of every job, spec, skill and DNA entry (replica 0 keeps the
+original names and ids; the others get a letters-only name tag and ids
+offset by a power of ten, so every parser regex still matches), then links
+the skills of each spec into prerequisite chains up to --chain-depth deep,
+with lvlReq arrays that rise along each chain. At 24 specs, 570 skills and
+198 DNA entries per replica, 10x/100x/1000x give 240/2,400/24,000 specs;
+the wiki mirror grows by ~300 pages (~2.4 MB at the default --filler) per
+replica, so use a smaller --filler for 1000x.
+
+Output is a pure function of the document, the scale and the seed, so
+benchmarks (benchmarks.py --scale) get the same corpus on every machine
+without network access.
+"""
+import argparse
+import copy
+import html
+import json
+import random
+import re
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional
+
+from build_validation import DATA_JSON, DEFAULT_MAX_SKILL_LEVEL, MAX_LEVEL
+
+
+SITE = 'requiem.isnet.ru'
+SNAPSHOT_TS = '20200101000000'
+_WORDS = ('skill', 'damage', 'target', 'level', 'enemy', 'party', 'buff', 'stance', 'weapon', 'range',
+          'mana', 'cooldown', 'critical', 'shield', 'aura', 'summon', 'poison', 'holy', 'dark', 'fire')
+_INFO_ROWS = (('Type', 'type'), ('Levels', 'levels'), ('Casting Time', 'cast_time'),
+              ('Skill Downtime', 'cooldown'), ('Range', 'range'), ('Target', 'target'))
+
+
+def _camel(name: str) -> str:
+    return ''.join(w[:1].upper() + w[1:] for w in re.findall(r'[A-Za-z]+', name)) or 'X'
+
+
+def _filler(rng: random.Random, paragraphs: int) -> str:
+    out = []
+    for n in range(paragraphs):
+        words = ' '.join(rng.choice(_WORDS) for _ in range(rng.randint(20, 60)))
+        out.append(f"<div class='mw-section' id='s{n}'><p>{words}</p><ul><li><a href='/wiki/{rng.choice(_WORDS)}'>"
+                   f"{rng.choice(_WORDS)}</a></li></ul></div>")
+    return '\n'.join(out)
+
+
+def _progression(skill: Mapping[str, object], rng: random.Random) -> Dict[str, List[object]]:
+    levels = int(skill.get('maxLevel') or DEFAULT_MAX_SKILL_LEVEL)
+    given = {k: v for k, v in (skill.get('progression') or {}).items() if v and not str(k).isdigit()}
+    if given:
+        return given
+    base, mp = rng.randint(20, 400), rng.randint(5, 60)
+    return {
+        'MP Consumption': [mp + 3 * lvl for lvl in range(levels)],
+        'Damage': [base + base * lvl // 4 for lvl in range(levels)],
+        'Duration': [f"{5 + lvl * 0.5:g} sec" for lvl in range(levels)],
+    }
+
+
+def _tag(replica: int) -> str:
+    """Letters-only name suffix of a replica: 1 -> 'B', 26 -> 'Ba'; '' for replica 0."""
+    out = []
+    while replica:
+        replica, d = divmod(replica, 26)
+        out.append(chr(ord('a') + d))
+    return ''.join(reversed(out)).capitalize()
+
+
+def _stride(ids) -> int:
+    return 10 ** len(str(max([int(i) for i in ids] or [0])))
+
+
+def _link_chains(skills: List[dict], rng: random.Random, depth: int) -> None:
+    """Chains runs of up to depth+1 skills: each requires the previous one and unlocks later."""
+    order = list(range(len(skills)))
+    rng.shuffle(order)
+    pos = 0
+    while pos < len(order):
+        run = order[pos:pos + rng.randint(2, depth + 1)]
+        pos += len(run)
+        if len(run) < 2 or rng.random() < 0.3:
+            continue
+        base = rng.randint(1, 10)
+        for k, i in enumerate(run):
+            s = skills[i]
+            ranks = min(5, int(s.get('maxLevel') or DEFAULT_MAX_SKILL_LEVEL))
+            if k:
+                prev = skills[run[k - 1]]
+                level = rng.randint(1, 3)
+                s.setdefault('requires', {})['required skill'] = {'name': prev['name'], 'level': level, 'id': prev['id']}
+                base = prev['lvlReq'][min(level, len(prev['lvlReq'])) - 1] + rng.randint(1, 5)
+            s['lvlReq'] = [min(MAX_LEVEL, base + 5 * r) for r in range(ranks)]
+
+
+def scale_data(data: Mapping[str, object], scale: int = 1, seed: int = 0, chain_depth: int = 6) -> dict:
+    """`scale` replicas of every job/spec/skill/DNA entry, with prerequisite chains up to chain_depth deep."""
+    rng = random.Random(seed)
+    jobs_in = data.get('jobs') or {}
+    skills_in = data.get('skills') or {}
+    dna_in = data.get('dna') or {}
+    job_stride = _stride([j['id'] for jobs in jobs_in.values() for j in jobs]
+                         + [s['id'] for jobs in jobs_in.values() for j in jobs for s in j.get('specs') or []]
+                         + list(skills_in))
+    entry_stride = _stride([e['id'] for table in (skills_in, dna_in) for entries in table.values() for e in entries])
+
+    out = {'groups': copy.deepcopy(data.get('groups') or []), 'jobs': {}, 'skills': {}, 'dna': {}}
+    for r in range(scale):
+        tag = _tag(r)
+
+        def rename(name: str) -> str:
+            return f"{name} {tag}" if tag else name
+
+        for group, jobs in jobs_in.items():
+            for job in jobs:
+                out['jobs'].setdefault(group, []).append({
+                    'id': str(int(job['id']) + r * job_stride), 'name': rename(job['name']),
+                    'specs': [{'id': str(int(s['id']) + r * job_stride), 'name': rename(s['name'])}
+                              for s in job.get('specs') or []],
+                })
+        for table, key in ((skills_in, 'skills'), (dna_in, 'dna')):
+            for spec_id, entries in table.items():
+                ids = {str(e['id']): str(int(e['id']) + r * entry_stride) for e in entries}
+                copies = []
+                for e in entries:
+                    e = copy.deepcopy(e)
+                    e['id'], e['name'] = ids[str(e['id'])], rename(e['name'])
+                    for req in (e.get('requires') or {}).values():
+                        if isinstance(req, dict) and str(req.get('id')) in ids:
+                            req['id'], req['name'] = ids[str(req['id'])], rename(req['name'])
+                    copies.append(e)
+                if key == 'skills' and chain_depth > 0:
+                    _link_chains(copies, rng, chain_depth)
+                out[key][str(int(spec_id) + r * job_stride)] = copies
+    return out
+
+
+def render_wiki_page(skill: Mapping[str, object], seed: int = 0, filler: int = 12) -> str:
+    """A wiki page for one data.json skill entry."""
+    rng = random.Random(f"{seed}:{skill.get('id')}")
+    name = html.escape(str(skill.get('name', '')))
+    parts = [f"<html><head><title>{name} - Requiem Wiki</title></head><body>",
+             "<div id='nav'>" + _filler(rng, 2) + "</div>",
+             f"<h1 class='page-title'>{name}</h1>"]
+
+    info = skill.get('info') or {'type': 'Offensive Skill', 'levels': skill.get('maxLevel') or DEFAULT_MAX_SKILL_LEVEL,
+                                 'cast_time': f"{rng.randint(0, 30) / 10:g} sec",
+                                 'cooldown': f"{rng.randint(10, 300) / 10:g} sec",
+                                 'range': f"{rng.randint(1, 30)}.0 m", 'target': 'Enemy'}
+    rows = ''.join(f"<tr><td><b>{label}:</b></td><td>{html.escape(str(info[key]))}</td></tr>"
+                   for label, key in _INFO_ROWS if info.get(key) is not None)
+    parts.append(f"<table class='skill info'>{rows}</table>")
+
+    reqs = skill.get('requires') or {}
+    if reqs:
+        rows = []
+        for key, r in reqs.items():
+            if not isinstance(r, dict):
+                continue
+            value = ', '.join(p for p in (r.get('name'), f"Level {r['level']}" if r.get('level') else None) if p)
+            rows.append(f"<tr><td>{html.escape(str(key).title())}:</td><td>{html.escape(value)}</td></tr>")
+        parts.append("<table style='border:1px solid red'><tr><th colspan='2'><b>Prerequisites</b></th></tr>"
+                     + ''.join(rows) + "</table>")
+
+    parts.append(_filler(rng, filler // 2))
+    prog = _progression(skill, rng)
+    levels = max(len(v) for v in prog.values())
+    head = '<tr><th>Level</th>' + ''.join(f"<th>{html.escape(k.title())}</th>" for k in prog) + '</tr>'
+    body = ''.join('<tr><td>' + str(lvl + 1) + '</td>'
+                   + ''.join(f"<td>{html.escape(str(v[lvl] if lvl < len(v) else ''))}</td>" for v in prog.values())
+                   + '</tr>' for lvl in range(levels))
+    parts.append(f"<table class='wikitable'>{head}{body}</table>")
+
+    lvl_req = skill.get('lvlReq')
+    if lvl_req:
+        cells = ''.join(f"<td>{v}</td>" for v in lvl_req)
+        prereq = ''.join(f"<td>{n + 1}</td>" for n in range(len(lvl_req)))
+        parts.append(f"<table class='levels'><tr><th>Level needed</th>{cells}</tr>"
+                     f"<tr><th>Prerequisite Level</th>{prereq}</tr></table>")
+
+    parts.append(_filler(rng, filler - filler // 2))
+    parts.append("</body></html>")
+    return '\n'.join(parts)
+
+
+def wiki_filename(name: str) -> str:
+    letter = (re.sub(r'[^A-Za-z0-9]', '', name)[:1] or '0').upper()
+    return f"site_pages_{letter}_{re.sub(r'[^A-Za-z0-9]+', '_', name).strip('_')}.html.html"
+
+
+def render_calculator_index(data: Mapping[str, object]) -> str:
+    """calculator.html with one calculator_select_job block per first job."""
+    blocks = []
+    for jobs in (data.get('jobs') or {}).values():
+        for job in jobs:
+            key = _camel(str(job.get('name', '')))
+            links = ''.join(f"<a href='/calculator/{spec['id']}.html'><img src='/template/images/clas/{key}_"
+                            f"{_camel(str(spec.get('name', '')))}.png' /></a>" for spec in job.get('specs') or [])
+            blocks.append(f"<div class='calculator_select_job' style='background-image: url(/template/images/clas/"
+                          f"{key}.png);' clas='{job.get('id')}'>{links}</div>")
+    return ("<html><body><div class='calculator'><div class='select'>"
+            + '\n'.join(blocks) + "</div></div></div></body></html>")
+
+
+def render_subclass_page(skills: List[Mapping[str, object]], dna: List[Mapping[str, object]], seed: int = 0) -> str:
+    """calculator/<id>.html: one <img class='skill'> per skill (type 0) and DNA entry (type 1)."""
+    rng = random.Random(seed)
+    imgs = []
+    for type_code, entries, prefix in (('0', skills, ''), ('1', dna, 'DNA_')):
+        for e in entries:
+            name = str(e.get('name', '')).replace("'", '')
+            src = f"/template/images/skills/{prefix}{_camel(name) if prefix else name}_G.png"
+            imgs.append(f"<div class='cell'><img class='skill' type='{type_code}' id='{e.get('id')}' "
+                        f"src='{src}' width='32' height='32' /></div>")
+    return "<html><body>" + _filler(rng, 4) + '\n'.join(imgs) + "</body></html>"
+
+
+def write_corpus(data: Mapping[str, object], out_dir: Path, seed: int = 0, filler: int = 12) -> Dict[str, int]:
+    """
+    Writes out_dir/data.json, out_dir/wiki_cache/ and
+    out_dir/snapshots/requiem.isnet.ru/<ts>/... Returns file counts.
+    """
+    out_dir = Path(out_dir)
+    wiki_dir = out_dir / 'wiki_cache'
+    site = out_dir / 'snapshots' / SITE / SNAPSHOT_TS
+    (site / 'calculator').mkdir(parents=True, exist_ok=True)
+    wiki_dir.mkdir(parents=True, exist_ok=True)
+    (out_dir / 'data.json').write_text(json.dumps(data, ensure_ascii=False, indent=2), encoding='utf-8')
+
+    pages = set()
+    for skills in (data.get('skills') or {}).values():
+        for s in skills:
+            fname = wiki_filename(str(s.get('name', '')))
+            if fname in pages:
+                continue
+            pages.add(fname)
+            (wiki_dir / fname).write_text(render_wiki_page(s, seed, filler), encoding='utf-8')
+
+    (site / 'calculator.html').write_text(render_calculator_index(data), encoding='utf-8')
+    dna = data.get('dna') or {}
+    for spec_id, skills in (data.get('skills') or {}).items():
+        page = render_subclass_page(skills, dna.get(spec_id) or [], seed)
+        (site / 'calculator' / f"{spec_id}.html").write_text(page, encoding='utf-8')
+    return {'wiki_pages': len(pages), 'spec_pages': len(data.get('skills') or {})}
+
+
+def load_data(path: Optional[Path] = None, scale: int = 0, seed: int = 0, chain_depth: int = 6) -> dict:
+    """A data.json document, passed through scale_data() when scale > 0."""
+    data = json.loads(Path(path or DATA_JSON).read_text(encoding='utf-8'))
+    return scale_data(data, scale, seed, chain_depth) if scale > 0 else data
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Write a synthetic wiki mirror and snapshot tree for a data.json")
+    ap.add_argument('out_dir', help="directory to write data.json, wiki_cache/ and snapshots/ into")
+    ap.add_argument('--data', default=str(DATA_JSON), help="document to render (default: the bundled data.json)")
+    ap.add_argument('--scale', type=int, default=0,
+                    help="replicas of the document, e.g. 10, 100 or 1000 (default: render it unchanged)")
+    ap.add_argument('--chain-depth', type=int, default=6, help="with --scale: longest prerequisite chain (0 = none)")
+    ap.add_argument('--seed', type=int, default=0)
+    ap.add_argument('--filler', type=int, default=12, help="filler sections per wiki page")
+    args = ap.parse_args()
+
+    data = load_data(Path(args.data), args.scale, args.seed, args.chain_depth)
+    counts = write_corpus(data, Path(args.out_dir), args.seed, args.filler)
+    skills = sum(len(v) for v in data['skills'].values())
+    dna = sum(len(v) for v in data['dna'].values())
+    print(f"Wrote {len(data['skills'])} specs, {skills} skills, {dna} DNA entries: "
+          f"{counts['wiki_pages']} wiki pages and {counts['spec_pages']} spec pages to {args.out_dir}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+import os
+import stat
+import tempfile
+import unittest
+from pathlib import Path
+
+import atomic_io
+from atomic_io import write_bytes_atomic, write_json_atomic
+
+
+def _mode(path: Path) -> int:
+    return stat.S_IMODE(os.stat(path).st_mode)
+
+
+@unittest.skipUnless(hasattr(os, 'fchmod'), "POSIX file modes")
+class AtomicWriteModeTest(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self._tmp.name)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_new_file_gets_umask_mode(self):
+        path = self.dir / 'new.json'
+        write_json_atomic(path, {'a': 1})
+        self.assertEqual(_mode(path), 0o666 & ~atomic_io._UMASK)
+        self.assertEqual(list(self.dir.iterdir()), [path])
+
+    def test_replaced_file_keeps_its_mode(self):
+        path = self.dir / 'data.bin'
+        path.write_bytes(b'old')
+        os.chmod(path, 0o640)
+        write_bytes_atomic(path, b'new')
+        self.assertEqual(path.read_bytes(), b'new')
+        self.assertEqual(_mode(path), 0o640)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+import itertools
+import unittest
+
+from build_search import SearchQuery, SpecSearch
+from build_solver import BuildSolver
+from build_validation import BuildValidator
+
+
+def _data(skills):
+    return {'groups': [], 'jobs': {}, 'skills': {'1': skills}, 'dna': {'1': []}}
+
+
+class SpecSearchTest(unittest.TestCase):
+    def test_requirement_outside_the_spec_is_never_met(self):
+        v = BuildValidator(_data([
+            {'id': 'a', 'name': 'A', 'maxLevel': 3},
+            {'id': 'b', 'name': 'B', 'maxLevel': 3, 'requires': {'skill': {'id': 'zzz', 'name': 'Z', 'level': 1}}},
+        ]))
+        search = SpecSearch(v.spec('1'), SearchQuery(10), BuildSolver(v))
+        builds = list(search.builds())
+        self.assertEqual(search.count(), len(builds))
+        self.assertTrue(builds)
+        self.assertTrue(all('b' not in b for b in builds))
+
+    def test_count_matches_brute_force(self):
+        v = BuildValidator(_data([
+            {'id': 'a', 'name': 'A', 'maxLevel': 3},
+            {'id': 'b', 'name': 'B', 'maxLevel': 3, 'requires': {'skill': {'id': 'a', 'name': 'A', 'level': 2}}},
+            {'id': 'c', 'name': 'C', 'maxLevel': 2, 'requires': {'skill': {'id': 'zzz', 'name': 'Z', 'level': 1}}},
+        ]))
+        spec = v.spec('1')
+        level = 8
+        expected = 0
+        for a, b, c in itertools.product(range(4), range(4), range(3)):
+            build = {k: lvl for k, lvl in zip('abc', (a, b, c)) if lvl}
+            expected += spec.is_valid(build, level)
+        self.assertEqual(SpecSearch(spec, SearchQuery(level), BuildSolver(v)).count(), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+import asyncio
+import json
+import random
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from build_service import BuildChecker, load_service
+from build_validation import DATA_JSON, MAX_LEVEL, BuildValidator, random_build
+
+
+def _data():
+    skills = [
+        {'id': 'a', 'name': 'A', 'maxLevel': 5, 'lvlReq': [1, 2, 4, 8, 16]},
+        {'id': 'b', 'name': 'B', 'maxLevel': 3, 'requires': {'skill': {'id': 'a', 'name': 'A', 'level': 2}}},
+        {'id': 'c', 'name': 'C', 'maxLevel': 3, 'requires': {'skill': {'id': 'zzz', 'name': 'Z', 'level': 1}}},
+        {'id': 'd', 'name': 'D', 'maxLevel': 2, 'requires': {'second job': {'name': 'Job', 'level': 30}}},
+    ]
+    dna = [{'id': 'x', 'name': 'X', 'maxLevel': 3}]
+    return {'groups': [], 'jobs': {}, 'skills': {'1': skills, '2': skills[:2]}, 'dna': {'1': dna}}
+
+
+def _random_items(validator, count, seed):
+    rng = random.Random(seed)
+    specs = list(validator.specs.values())
+    items = []
+    for n in range(count):
+        spec = rng.choice(specs)
+        level = rng.randint(1, MAX_LEVEL)
+        skills = random_build(spec, level, rng)
+        if n % 2:
+            sid = rng.choice(spec.ids)
+            skills[sid] = skills.get(sid, 0) + rng.randint(-1, 4)
+        if n % 7 == 0:
+            skills['nope'] = 1
+        dna = {did: rng.randint(0, 4) for did in spec.dna_ids}
+        body = {'spec': spec.spec_id, 'level': level, 'skills': skills, 'dna': dna}
+        kind = 'validate' if n % 5 else rng.choice(['remaining', 'unmet'])
+        if kind == 'unmet':
+            body['skill'] = rng.choice(spec.ids)
+        items.append((kind, body))
+    items.append(('validate', {'spec': 'missing', 'skills': {}}))
+    items.append(('validate', {'spec': '1', 'skills': {'a': 'x'}}))
+    return items
+
+
+class CheckBatchTest(unittest.TestCase):
+    def _assert_batch_matches(self, validator):
+        checker = BuildChecker(validator)
+        items = _random_items(validator, 600, 3)
+        self.assertEqual(checker.check_batch(items), [checker.check(kind, body) for kind, body in items])
+
+    def test_batch_matches_single_checks(self):
+        self._assert_batch_matches(BuildValidator(_data()))
+
+    @unittest.skipUnless(DATA_JSON.exists(), "no data.json in the checkout")
+    def test_batch_matches_single_checks_on_repository_data(self):
+        self._assert_batch_matches(BuildValidator.from_file(DATA_JSON))
+
+
+class ContentLengthTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        (self.tmp / 'data.json').write_text(json.dumps(_data()), encoding='utf-8')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def _exchange(self, head: bytes) -> bytes:
+        async def run():
+            service = load_service(self.tmp / 'data.json', watch_interval=0)
+            ready = asyncio.Event()
+            server = asyncio.ensure_future(service.serve('127.0.0.1', 0, ready))
+            await ready.wait()
+            try:
+                reader, writer = await asyncio.open_connection('127.0.0.1', service.port)
+                writer.write(head)
+                await writer.drain()
+                reply = await asyncio.wait_for(reader.read(), 5)
+                writer.close()
+                return reply
+            finally:
+                server.cancel()
+        return asyncio.run(run())
+
+    def test_malformed_length_is_a_bad_request(self):
+        for value in (b'abc', b'-5', b'1.5', b'\xc2\xb2'):
+            reply = self._exchange(b'POST /validate HTTP/1.1\r\nContent-Length: ' + value + b'\r\n\r\n{}')
+            self.assertTrue(reply.startswith(b'HTTP/1.1 400 '), (value, reply))
+            self.assertIn(b'Content-Length', reply.split(b'\r\n\r\n', 1)[1])
+
+    def test_oversized_length_is_rejected(self):
+        reply = self._exchange(b'POST /validate HTTP/1.1\r\nContent-Length: 99999999999\r\n\r\n')
+        self.assertTrue(reply.startswith(b'HTTP/1.1 413 '), reply)
+
+    def test_valid_request_still_served(self):
+        body = json.dumps({'spec': '1', 'level': 10, 'skills': {'a': 2, 'b': 1}}).encode()
+        reply = self._exchange(b'POST /validate HTTP/1.1\r\nConnection: close\r\nContent-Length: '
+                               + str(len(body)).encode() + b'\r\n\r\n' + body)
+        self.assertTrue(reply.startswith(b'HTTP/1.1 200 '), reply)
+        self.assertTrue(json.loads(reply.split(b'\r\n\r\n', 1)[1])['ok'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,22 @@
+import unittest
+
+from build_stats import SpecStats
+
+
+class MixedUnitsTest(unittest.TestCase):
+    def test_cells_in_another_unit_get_their_own_column(self):
+        spec = SpecStats('1', [
+            {'id': 'a', 'maxLevel': 2, 'progression': {'damage': ['+10%', '+20%'], 'duration': ['3 sec', '1 min']}},
+            {'id': 'b', 'maxLevel': 2, 'progression': {'damage': ['15%', 40], 'duration': ['2.5s', '4s']}},
+        ])
+        self.assertEqual(dict(zip(spec.columns, spec.units)),
+                         {'damage': '%', 'duration': 's', 'damage (no unit)': ''})
+        totals = dict(zip(spec.columns, spec.aggregate(spec.level_matrix([{'a': 2, 'b': 2}]))[0]))
+        self.assertEqual(totals, {'damage': 20.0, 'duration': 64.0, 'damage (no unit)': 40.0})
+        # Only the majority-unit column counts towards the damage summary.
+        summary = spec.summarize(spec.aggregate(spec.level_matrix([{'a': 2, 'b': 2}])))
+        self.assertEqual(float(summary['damage'][0]), 20.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
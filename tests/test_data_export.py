@@ -0,0 +1,72 @@
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import data_export
+from build_codes import LAYOUT_NAME
+from data_export import MANIFEST_NAME, PackedData, minified_json, publish
+
+
+def _document():
+    # Exercises every column plus the values that have to fall back to JSON.
+    return {
+        'groups': [{'id': 'g', 'name': 'Group', 'specs': ['1', '2']}],
+        'jobs': {'1': {'name': 'Knight'}},
+        'skills': {
+            '1': [
+                {'id': '100', 'name': 'Slash', 'maxLevel': 10, 'lvlReq': [1, 3, None, 7]},
+                {'id': '200', 'name': 'Beam Slash', 'maxLevel': 5,
+                 'requires': {'skill': {'id': '100', 'name': 'Slash', 'level': 3},
+                              'first job': {'name': 'Skill Mastery 8', 'level': 18},
+                              'skill downtime': {'name': '8.6 sec'}},
+                 'info': {'type': 'Offensive Skill', 'levels': 5, 'weapons': ['Sword', 'Axe'], 'range': 20.5},
+                 'progression': {'1': ['10%', 3], 'damage': []},
+                 'note': {'nested': True}},
+                {'id': '300', 'name': 'Huge', 'maxLevel': 2 ** 40, 'lvlReq': [1.5]},
+            ],
+            '2': [],
+        },
+        'dna': {
+            '1': [{'id': '900', 'name': 'Bless of Body', 'maxLevel': 10}, {'id': '901', 'name': 'Odd', 'maxLevel': None}],
+            '3': [{'id': '902', 'name': 'Only DNA', 'maxLevel': 1, 'flag': False}],
+        },
+    }
+
+
+class PublishRoundTripTest(unittest.TestCase):
+    def _check(self, data):
+        with tempfile.TemporaryDirectory() as tmp:
+            out_dir = Path(tmp)
+            manifest = publish(data, out_dir)
+            with PackedData(out_dir / data_export.PACKED_NAME) as packed:
+                from_bin = packed.to_data()
+            from_hashed = json.loads((out_dir / manifest['data']).read_bytes())
+            index = json.loads((out_dir / manifest['index']).read_bytes())
+            shards = {spec_id: json.loads((out_dir / path).read_bytes()) for spec_id, path in manifest['specs'].items()}
+            on_disk = json.loads((out_dir / MANIFEST_NAME).read_bytes())
+            layout = (out_dir / manifest['layout']).read_bytes()
+            full_layout = json.loads((out_dir / LAYOUT_NAME).read_bytes())
+
+        self.assertEqual(from_bin, data)
+        self.assertEqual(minified_json(from_bin), minified_json(data))
+        self.assertEqual(from_hashed, data)
+        self.assertEqual(minified_json(from_hashed), minified_json(data))
+        self.assertEqual(index, {k: v for k, v in data.items() if k not in ('skills', 'dna')})
+        for spec_id in set(data['skills']) | set(data['dna']):
+            self.assertEqual(shards[spec_id], {'skills': data['skills'].get(spec_id, []),
+                                               'dna': data['dna'].get(spec_id, [])})
+        self.assertEqual(on_disk, manifest)
+        self.assertEqual(layout, minified_json(full_layout))
+        self.assertRegex(manifest['layout'], r'^data/data\.layout\.[0-9a-f]{10}\.json$')
+
+    def test_synthetic_document(self):
+        self._check(_document())
+
+    @unittest.skipUnless(data_export.DATA_JSON.exists(), "no data.json in the checkout")
+    def test_repository_data(self):
+        self._check(json.loads(data_export.DATA_JSON.read_text(encoding='utf-8')))
+
+
+if __name__ == '__main__':
+    unittest.main()
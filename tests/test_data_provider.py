@@ -0,0 +1,109 @@
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from data_export import MANIFEST_NAME, publish
+from data_provider import DataProvider
+
+
+def _document(name):
+    return {'groups': [{'id': 'g', 'name': name}], 'jobs': {},
+            'skills': {'1': [{'id': '100', 'name': 'Slash', 'maxLevel': 10}]}, 'dna': {}}
+
+
+class DataProviderTest(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.out = Path(tmp.name)
+        self.compiled = []
+        self.ticks = 0
+        self.first = self._publish(_document('First'))
+        self.provider = DataProvider(self.out / 'data.json', self._compile, interval=0)
+
+    def _compile(self, data, data_dir):
+        if data['groups'][0]['name'] == 'Uncompilable':
+            raise ValueError('bad data')
+        self.compiled.append(data['groups'][0]['name'])
+        return {'name': data['groups'][0]['name'], 'dir': data_dir}
+
+    def _publish(self, data):
+        manifest = publish(data, self.out)
+        self._bump_manifest()
+        return manifest
+
+    def _bump_manifest(self):
+        # Manifests of the same shape have the same size; make sure the mtime moves
+        # even on file systems with coarse timestamps.
+        self.ticks += 1
+        path = self.out / MANIFEST_NAME
+        os.utime(path, (1_000_000_000 + self.ticks,) * 2)
+
+    def test_serves_the_published_version(self):
+        snap = self.provider.current()
+        self.assertEqual(snap.version, self.first['version'])
+        self.assertEqual(snap.compiled, {'name': 'First', 'dir': self.out})
+        self.assertFalse(self.provider.check())
+        self.assertEqual(self.compiled, ['First'])
+
+    def test_publish_twice(self):
+        second = self._publish(_document('Second'))
+        self.assertTrue(self.provider.check())
+        self.assertEqual(self.provider.current().version, second['version'])
+        self.assertEqual(self.provider.current().data['groups'][0]['name'], 'Second')
+
+        third = self._publish(_document('Third'))
+        self.assertTrue(self.provider.check())
+        self.assertFalse(self.provider.check())
+        metrics = self.provider.metrics()
+        self.assertEqual(metrics['data_version'], third['version'])
+        self.assertEqual((metrics['reloads'], metrics['reload_failures'], metrics['last_reload_error']), (2, 0, None))
+        self.assertEqual(self.compiled, ['First', 'Second', 'Third'])
+
+    def test_unchanged_version_is_not_recompiled(self):
+        self._publish(_document('First'))
+        self.assertFalse(self.provider.reload())
+        self.assertEqual(self.compiled, ['First'])
+
+    def test_broken_publish_keeps_the_old_snapshot(self):
+        (self.out / 'data.0123456789.json').write_text('{"groups": [', encoding='utf-8')
+        manifest = dict(self.first, version='0123456789', data='data.0123456789.json')
+        (self.out / MANIFEST_NAME).write_text(json.dumps(manifest), encoding='utf-8')
+        self._bump_manifest()
+
+        self.assertFalse(self.provider.check())
+        metrics = self.provider.metrics()
+        self.assertEqual(metrics['data_version'], self.first['version'])
+        self.assertEqual((metrics['reloads'], metrics['reload_failures']), (0, 1))
+        self.assertTrue(metrics['last_reload_error'].startswith('JSONDecodeError'))
+        self.assertEqual(self.provider.current().compiled['name'], 'First')
+
+        # Not retried until the files change again.
+        self.assertFalse(self.provider.check())
+        self.assertEqual(self.provider.metrics()['reload_failures'], 1)
+
+        self._publish(_document('Uncompilable'))
+        self.assertFalse(self.provider.check())
+        self.assertEqual(self.provider.metrics()['reload_failures'], 2)
+        self.assertEqual(self.provider.current().version, self.first['version'])
+
+        fixed = self._publish(_document('Fixed'))
+        self.assertTrue(self.provider.check())
+        metrics = self.provider.metrics()
+        self.assertEqual((metrics['data_version'], metrics['reloads'], metrics['last_reload_error']),
+                         (fixed['version'], 1, None))
+
+    def test_in_flight_request_keeps_its_snapshot(self):
+        in_flight = self.provider.current()
+        self._publish(_document('Second'))
+        self.assertTrue(self.provider.check())
+        self.assertEqual(self.provider.current().compiled['name'], 'Second')
+        self.assertEqual(in_flight.version, self.first['version'])
+        self.assertEqual(in_flight.data['groups'][0]['name'], 'First')
+        self.assertEqual(in_flight.compiled['name'], 'First')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,32 @@
+import random
+import unittest
+
+from comprehensive_name_fix import find_best_match
+from fuzzy_match import FuzzyMatcher, _synthetic_titles
+
+NAMES = ['Knight Slash', 'Beam Slash', 'Return', 'Bless of Body', 'Skill Mastery 8', 'Fire Arrow',
+         'Ice Spear', 'Holy Light', 'Shield Bash', 'Double Shot', 'A', 'Ab', 'Frozen Lance Mastery']
+
+
+class FuzzyMatcherTest(unittest.TestCase):
+    def test_same_result_as_brute_force(self):
+        rng = random.Random(5)
+        titles = _synthetic_titles(NAMES, 600, rng)
+        queries = NAMES + [t.lower()[::-1] for t in rng.sample(titles, 20)]
+        queries += [t[:-1] + 'q' for t in rng.sample(titles, 40)] + ['', 'zzzz', 'Slash Knight']
+        matcher = FuzzyMatcher(titles)
+        for threshold in (0.5, 0.7, 0.9):
+            for q in queries:
+                self.assertEqual(matcher.best_match(q, threshold), find_best_match(q, titles, threshold), (q, threshold))
+        self.assertLess(matcher.comparisons, len(queries) * len(titles) // 10)
+
+    def test_ties_go_to_the_earliest_title(self):
+        titles = ['Fire Arrox', 'Fire Arrow', 'Fire Arroy', 'Fire Arrow']
+        matcher = FuzzyMatcher(titles)
+        self.assertEqual(matcher.best_match('Fire Arrox', 0.7), ('Fire Arrox', 1.0))
+        self.assertEqual(matcher.best_match('Fire Arrow', 0.7), ('Fire Arrow', 1.0))
+        self.assertEqual(matcher.best_match('Fire Arroz', 0.7), find_best_match('Fire Arroz', titles, 0.7))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+import contextlib
+import io
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from scrape_wiki import STATE_NAME, crawl
+
+SITE = {
+    'index.html': '<a href="a.html">A</a> <a href="b.html">B</a> <a href="https://elsewhere.example/x">out</a>',
+    'a.html': '<a href="c.html">C</a> <a href="./">home</a>',
+    'b.html': '<a href="a.html#top">A again</a> <a href="../outside.html">not in the wiki</a>',
+    'c.html': 'leaf',
+}
+
+
+class _Handler(SimpleHTTPRequestHandler):
+    def do_GET(self):
+        self.server.requests.append((self.path, self.headers.get('If-Modified-Since') is not None))
+        super().do_GET()
+
+    def log_message(self, *args):
+        pass
+
+
+class CrawlTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        site = self.tmp / 'site' / 'wiki'
+        site.mkdir(parents=True)
+        old = time.time() - 3600
+        for name, html in SITE.items():
+            (site / name).write_text(f'<html><body>{html}</body></html>', encoding='utf-8')
+            os.utime(site / name, (old, old))
+        (self.tmp / 'site' / 'outside.html').write_text('outside', encoding='utf-8')
+        self.site = site
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), partial(_Handler, directory=str(self.tmp / 'site')))
+        self.server.daemon_threads = True
+        self.server.requests = []
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}/wiki/"
+        self.out = self.tmp / 'out'
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.tmp)
+
+    def _crawl(self, **kwargs):
+        kwargs.setdefault('rate', 0)
+        with contextlib.redirect_stdout(io.StringIO()):
+            return crawl(self.out, base=self.base, **kwargs)
+
+    def test_full_crawl_then_conditional_revalidation(self):
+        stats = self._crawl()
+        self.assertEqual((stats['fetched'], stats['not_modified'], stats['failed']), (4, 0, 0))
+        self.assertEqual(sorted(p.name for p in self.out.glob('*.html')),
+                         ['a.html.html', 'b.html.html', 'c.html.html', 'index.html'])
+        self.assertIn('leaf', (self.out / 'c.html.html').read_text(encoding='utf-8'))
+
+        self.server.requests.clear()
+        stats = self._crawl()
+        self.assertEqual((stats['fetched'], stats['not_modified']), (0, 4))
+        self.assertEqual(len(self.server.requests), 4)
+        self.assertTrue(all(conditional for _, conditional in self.server.requests))
+
+        new = time.time() + 5
+        (self.site / 'c.html').write_text('<html><body>changed</body></html>', encoding='utf-8')
+        os.utime(self.site / 'c.html', (new, new))
+        stats = self._crawl()
+        self.assertEqual((stats['fetched'], stats['not_modified']), (1, 3))
+        self.assertIn('changed', (self.out / 'c.html.html').read_text(encoding='utf-8'))
+
+    def test_interrupted_crawl_resumes_from_saved_state(self):
+        stats = self._crawl(max_pages=2, concurrency=1)
+        self.assertEqual(stats['pages'], 2)
+        state = json.loads((self.out / STATE_NAME).read_text(encoding='utf-8'))
+        self.assertEqual(len(state['seen']), 2)
+        self.assertTrue(state['frontier'])
+
+        first = [path for path, _ in self.server.requests]
+        self.server.requests.clear()
+        stats = self._crawl(concurrency=1)
+        self.assertEqual((stats['fetched'], stats['not_modified']), (2, 0))
+        second = [path for path, _ in self.server.requests]
+        self.assertFalse(set(first) & set(second))
+        self.assertEqual(len(list(self.out.glob('*.html'))), 4)
+        self.assertEqual(json.loads((self.out / STATE_NAME).read_text(encoding='utf-8'))['frontier'], [])
+
+    def test_fresh_start_ignores_saved_frontier(self):
+        self._crawl(max_pages=2, concurrency=1)
+        stats = self._crawl(resume=False)
+        self.assertEqual(stats['pages'], 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
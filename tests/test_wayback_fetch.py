@@ -0,0 +1,121 @@
+import threading
+import time
+import unittest
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from wayback_fetch import FetchError, Fetcher
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive
+    timeout = 0.3                  # idle keep-alive connections are dropped after this
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.hits[self.path] += 1
+            hits = server.hits[self.path]
+        name, _, arg = self.path.strip('/').partition('/')
+        if name == 'flaky' and hits <= int(arg):
+            return self._reply(503, b'busy')
+        if name == 'down':
+            return self._reply(503, b'down')
+        if name == 'missing':
+            return self._reply(404, b'no')
+        if name == 'slow':
+            time.sleep(float(arg))
+        self._reply(200, self.path.encode())
+
+    def _reply(self, status, body):
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class FetcherTest(unittest.TestCase):
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        self.server.daemon_threads = True
+        self.server.hits = Counter()
+        self.server.lock = threading.Lock()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.root = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_retries_until_success(self):
+        fetcher = Fetcher(retries=3, backoff=0.01, retry_budget=10)
+        self.addCleanup(fetcher.close)
+        self.assertEqual(fetcher.get(self.root + '/flaky/2'), b'/flaky/2')
+        self.assertEqual(self.server.hits['/flaky/2'], 3)
+        self.assertEqual(fetcher.budget.remaining, 8)
+
+    def test_client_errors_are_not_retried(self):
+        fetcher = Fetcher(retries=3, backoff=0.01, retry_budget=10)
+        self.addCleanup(fetcher.close)
+        with self.assertRaises(FetchError):
+            fetcher.get(self.root + '/missing/')
+        self.assertEqual(self.server.hits['/missing/'], 1)
+        self.assertEqual(fetcher.budget.remaining, 10)
+
+    def test_shared_budget_runs_out(self):
+        fetcher = Fetcher(retries=5, backoff=0.01, retry_budget=3)
+        self.addCleanup(fetcher.close)
+        with self.assertRaises(FetchError):
+            fetcher.get(self.root + '/down/a')
+        with self.assertRaises(FetchError):
+            fetcher.get(self.root + '/down/b')
+        self.assertEqual(fetcher.budget.remaining, 0)
+        # Three retries in total, then each URL fails on its next error.
+        self.assertEqual(self.server.hits['/down/a'] + self.server.hits['/down/b'], 2 + 3)
+
+    def test_stale_keep_alive_connection_is_replaced_at_once(self):
+        fetcher = Fetcher(retries=3, backoff=5, retry_budget=10)
+        self.addCleanup(fetcher.close)
+        fetcher.get(self.root + '/one')
+        time.sleep(_Handler.timeout * 2)  # the server closes the pooled connection
+        t0 = time.perf_counter()
+        self.assertEqual(fetcher.get(self.root + '/two'), b'/two')
+        self.assertLess(time.perf_counter() - t0, 1)  # no backoff
+        self.assertEqual(fetcher.stale, 1)
+        self.assertEqual(fetcher.budget.remaining, 10)
+        self.assertEqual(fetcher.pool.opened, 2)
+
+    def test_fetch_first_does_not_wait_for_less_preferred(self):
+        fetcher = Fetcher(retries=0, backoff=0.01)
+        self.addCleanup(fetcher.close)
+        t0 = time.perf_counter()
+        urls = [self.root + '/missing/', self.root + '/fast', self.root + '/slow/2']
+        self.assertEqual(fetcher.fetch_first(urls, parallel=3), (1, b'/fast'))
+        self.assertLess(time.perf_counter() - t0, 1.5)
+
+    def test_fetch_first_prefers_earlier_url(self):
+        fetcher = Fetcher(retries=0, backoff=0.01)
+        self.addCleanup(fetcher.close)
+        urls = [self.root + '/slow/0.3', self.root + '/fast']
+        self.assertEqual(fetcher.fetch_first(urls, parallel=2), (0, b'/slow/0.3'))
+
+    def test_fetch_first_all_fail(self):
+        fetcher = Fetcher(retries=0, backoff=0.01)
+        self.addCleanup(fetcher.close)
+        with self.assertRaises(FetchError):
+            fetcher.fetch_first([self.root + '/missing/1', self.root + '/down/1'], parallel=2)
+
+    def test_losing_attempt_does_not_leak_into_closed_pool(self):
+        fetcher = Fetcher(retries=0, backoff=0.01)
+        self.assertEqual(fetcher.fetch_first([self.root + '/fast', self.root + '/slow/0.5'], parallel=2)[0], 0)
+        fetcher.close()
+        time.sleep(1)  # the losing request has been answered and its connection released
+        self.assertEqual(self.server.hits['/slow/0.5'], 1)
+        self.assertTrue(all(q.empty() for q in fetcher.pool._idle.values()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Shared fetch layer for the Wayback Machine scripts.
+
+- keep-alive connections, pooled per host and reused across threads; a
+  pooled connection the server has meanwhile closed is replaced at once
+- exponential backoff with jitter, bounded per request and by a shared
+  retry budget for the whole run
+- fetch_first(): tries a list of fallback URLs concurrently and returns the
+  most preferred one that succeeds, cancelling the less preferred rest
+- Manifest: records which (key, timestamp) pairs succeeded
+"""
+import http.client
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from queue import Empty, Full, LifoQueue
+from typing import Dict, Optional, Sequence, Tuple
+from urllib.parse import urljoin, urlsplit
+
+from atomic_io import write_bytes_atomic
+
+
+WAYBACK_ROOT = "https://web.archive.org"
+UA = {"User-Agent": "Mozilla/5.0 (Wayback fetch)"}
+
+
+class FetchError(Exception):
+    pass
+
+
+class Cancelled(FetchError):
+    pass
+
+
+class HTTPStatusError(FetchError):
+    def __init__(self, status: int, url: str):
+        super().__init__(f"HTTP {status} for {url}")
+        self.status = status
+
+    @property
+    def retryable(self) -> bool:
+        return self.status == 429 or self.status >= 500
+
+
+class RetryBudget:
+    """Total number of retries the whole run may spend, shared by all threads."""
+
+    def __init__(self, retries: int):
+        self.remaining = retries
+        self._lock = threading.Lock()
+
+    def take(self) -> bool:
+        with self._lock:
+            if self.remaining <= 0:
+                return False
+            self.remaining -= 1
+            return True
+
+
+class ConnectionPool:
+    """
+    Idle keep-alive connections per (scheme, host, port), at most `per_host`
+    kept. After close(), released connections are closed instead of kept.
+    """
+
+    def __init__(self, per_host: int = 8, timeout: float = 20):
+        self.per_host = per_host
+        self.timeout = timeout
+        self._idle: Dict[Tuple[str, str], LifoQueue] = {}
+        self._lock = threading.Lock()
+        self.closed = False
+        self.opened = 0
+
+    def idle(self, scheme: str, netloc: str) -> Optional[http.client.HTTPConnection]:
+        """A pooled connection to reuse, or None."""
+        with self._lock:
+            q = self._idle.get((scheme, netloc))
+        try:
+            return q.get_nowait() if q is not None else None
+        except Empty:
+            return None
+
+    def connect(self, scheme: str, netloc: str) -> http.client.HTTPConnection:
+        cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        with self._lock:
+            self.opened += 1
+        return cls(netloc, timeout=self.timeout)
+
+    def release(self, scheme: str, netloc: str, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            if not self.closed:
+                q = self._idle.setdefault((scheme, netloc), LifoQueue(maxsize=self.per_host))
+                try:
+                    q.put_nowait(conn)
+                    return
+                except Full:
+                    pass
+        conn.close()
+
+    def close(self) -> None:
+        with self._lock:
+            self.closed = True
+            queues = list(self._idle.values())
+        for q in queues:
+            while True:
+                try:
+                    q.get_nowait().close()
+                except Empty:
+                    break
+
+
+class Fetcher:
+    def __init__(self, per_host: int = 8, timeout: float = 20, retries: int = 3,
+                 backoff: float = 0.5, retry_budget: int = 200, max_redirects: int = 5):
+        self.pool = ConnectionPool(per_host, timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.budget = RetryBudget(retry_budget)
+        self.max_redirects = max_redirects
+        self.stale = 0  # pooled connections found closed by the server
+
+    def close(self) -> None:
+        self.pool.close()
+
+    def _request(self, url: str) -> Tuple[int, Dict[str, str], bytes]:
+        parts = urlsplit(url)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+        conn = self.pool.idle(parts.scheme, parts.netloc)
+        if conn is not None:
+            try:
+                return self._exchange(parts.scheme, parts.netloc, path, conn)
+            except ConnectionError:
+                # The server dropped the idle keep-alive connection, which says
+                # nothing about the URL: try again at once on a new connection,
+                # without backoff or spending the retry budget.
+                self.stale += 1
+        return self._exchange(parts.scheme, parts.netloc, path, self.pool.connect(parts.scheme, parts.netloc))
+
+    def _exchange(self, scheme: str, netloc: str, path: str,
+                  conn: http.client.HTTPConnection) -> Tuple[int, Dict[str, str], bytes]:
+        try:
+            conn.request("GET", path, headers=UA)
+            resp = conn.getresponse()
+            body = resp.read()
+        except Exception:
+            conn.close()
+            raise
+        if resp.will_close:
+            conn.close()
+        else:
+            self.pool.release(scheme, netloc, conn)
+        return resp.status, {k.lower(): v for k, v in resp.getheaders()}, body
+
+    def _get_once(self, url: str) -> bytes:
+        for _ in range(self.max_redirects + 1):
+            status, headers, body = self._request(url)
+            if status in (301, 302, 303, 307, 308) and headers.get("location"):
+                url = urljoin(url, headers["location"])
+                continue
+            if status == 200:
+                return body
+            raise HTTPStatusError(status, url)
+        raise FetchError(f"too many redirects for {url}")
+
+    def get(self, url: str, cancel: Optional[threading.Event] = None) -> bytes:
+        """GET with keep-alive and exponential backoff; 4xx other than 429 is not retried."""
+        attempt = 0
+        while True:
+            if cancel is not None and cancel.is_set():
+                raise Cancelled(url)
+            try:
+                return self._get_once(url)
+            except Cancelled:
+                raise
+            except Exception as e:
+                retryable = e.retryable if isinstance(e, HTTPStatusError) else True
+                if not retryable or attempt >= self.retries or not self.budget.take():
+                    raise FetchError(f"{url}: {e.__class__.__name__}: {e}") from e
+            delay = self.backoff * (2 ** attempt) * (0.5 + random.random() / 2)
+            attempt += 1
+            if cancel is not None:
+                if cancel.wait(delay):
+                    raise Cancelled(url)
+            else:
+                time.sleep(delay)
+
+    def fetch_first(self, urls: Sequence[str], parallel: int = 3) -> Tuple[int, bytes]:
+        """
+        Tries `urls` (most preferred first) with up to `parallel` in flight.
+        Returns (index, body) of the most preferred URL that succeeds: as soon
+        as URL i succeeds, URLs after i are cancelled, and the answer is final
+        once every URL before i has failed. Raises FetchError if all fail.
+        """
+        if not urls:
+            raise FetchError("no urls")
+        cancels = [threading.Event() for _ in urls]
+        outcome: Dict[int, Tuple[bool, object]] = {}
+        done = threading.Condition()
+
+        def attempt(i: int) -> None:
+            try:
+                body = self.get(urls[i], cancels[i])
+            except Exception as e:
+                result = (False, e)
+            else:
+                result = (True, body)
+                for ev in cancels[i + 1:]:
+                    ev.set()
+            with done:
+                outcome[i] = result
+                done.notify_all()
+
+        def decided() -> Optional[int]:
+            # Index of the answer once it can no longer change, else None.
+            for i in range(len(urls)):
+                if i not in outcome:
+                    return None
+                if outcome[i][0]:
+                    return i
+            return -1
+
+        ex = ThreadPoolExecutor(max_workers=max(1, min(parallel, len(urls))))
+        try:
+            for i in range(len(urls)):
+                ex.submit(attempt, i)
+            with done:
+                done.wait_for(lambda: decided() is not None)
+                winner = decided()
+        finally:
+            for ev in cancels:
+                ev.set()
+            # Drop queued attempts and don't wait for losing requests still on the
+            # wire; their connections go back to the pool, or are closed if the
+            # fetcher has been closed by then.
+            ex.shutdown(wait=False, cancel_futures=True)
+
+        if winner >= 0:
+            return winner, outcome[winner][1]
+        raise FetchError("; ".join(str(outcome[i][1]) for i in sorted(outcome)))
+
+
+class Manifest:
+    """JSON record of which (key, timestamp) pairs were fetched, and where to."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            self.entries: Dict[str, dict] = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def record(self, key: str, ts: Optional[str], dest: Optional[Path], ok: bool, error: str = "") -> None:
+        with self._lock:
+            self.entries[key] = {
+                "ok": ok,
+                "timestamp": ts,
+                "file": dest.name if dest else None,
+                "error": error,
+                "at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            }
+
+    def save(self) -> None:
+        with self._lock:
+            text = json.dumps(self.entries, indent=2, sort_keys=True)
+        write_bytes_atomic(self.path, text.encode("utf-8"))
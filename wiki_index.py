@@ -0,0 +1,489 @@
+#!/usr/bin/env python3
+"""Shared, persistent index of the parsed wiki mirror in wiki_cache/.
+
+Every enrichment script used to BeautifulSoup-parse the whole corpus on each
+run. This module parses each page once, keeps only the extracted records
+(title, prerequisites, info, progression, level rows) and persists them to
+an on-disk index keyed by file path, mtime and content hash, so later runs
+only re-parse pages that changed.
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+from collections import OrderedDict
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from html import unescape
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from bs4 import BeautifulSoup
+
+import instrumentation
+from atomic_io import write_bytes_atomic
+from instrumentation import count, timed
+
+try:
+    import lxml  # noqa: F401  (only needed as a BeautifulSoup tree builder)
+    FAST_PARSER = 'lxml'
+except ImportError:
+    FAST_PARSER = 'html.parser'
+
+
+WIKI_DIR = Path(__file__).resolve().parent / 'wiki_cache'
+INDEX_PATH = WIKI_DIR / 'wiki_index.json'
+PAGE_GLOB = 'site_pages_*.html.html'
+
+# Bump whenever the shape of an extracted record changes.
+INDEX_VERSION = 1
+
+# The parse_* helpers only look at the page title, tables (info, wikitable,
+# Prerequisites, Level needed) and <b> headers. The fast backend slices those
+# regions out of the raw HTML with one regex pass and builds a tree for them
+# alone. Stray top-level <b> tags are kept so a 'Prerequisites' header outside
+# any table still shadows a later one exactly as it does in the full tree.
+_REGION_TAG_RE = re.compile(r'<(/?)(table|h1|b)\b[^>]*>', re.I)
+BACKENDS = ('fast', 'full')
+
+
+@lru_cache(maxsize=None)
+def normalize_name(name: str) -> str:
+    return re.sub(r"[^a-z0-9]", "", name.lower())
+
+
+@timed
+def parse_title(soup: BeautifulSoup, fallback: str) -> str:
+    title_tag = soup.find('h1', class_='page-title')
+    return unescape(title_tag.get_text(strip=True)) if title_tag else fallback
+
+
+@timed
+def parse_prereqs_table(soup: BeautifulSoup):
+    """Extracts data from the main red 'Prerequisites' table."""
+    reqs = {}
+    prereqs_header = soup.find(lambda tag: tag.name == 'b' and 'Prerequisites' in tag.get_text(strip=True))
+    if not prereqs_header:
+        return None
+
+    table = prereqs_header.find_parent('table')
+    if not table:
+        return None
+
+    rows = table.find_all('tr')
+    for row in rows:
+        cells = row.find_all('td')
+        if len(cells) < 2:
+            continue
+
+        key = cells[0].get_text(strip=True).replace(':', '').lower()
+        value_text = cells[1].get_text(strip=True)
+
+        if 'job' in key or 'skill' in key:
+            # e.g., "Warrior, Level 32, Skill Mastery 22"
+            # e.g., "Holy Bolt, Level 5"
+            parts = [p.strip() for p in value_text.split(',')]
+            job_req = {}
+            for part in parts:
+                if 'level' in part.lower():
+                    lvl_match = re.search(r'(\d+)', part)
+                    if lvl_match:
+                        job_req['level'] = int(lvl_match.group(1))
+                else: # Assumed to be a name (job or skill)
+                    job_req['name'] = part
+            if job_req:
+                reqs[key] = job_req
+
+    return reqs if reqs else None
+
+
+@timed
+def parse_level_needed_row(soup: BeautifulSoup):
+    """Extracts the 'Level needed' array from the main skill progression table."""
+    level_needed_header = soup.find(lambda tag: tag.name in ('th', 'td') and 'Level needed' in tag.get_text(strip=True))
+    if not level_needed_header:
+        return None
+
+    row = level_needed_header.find_parent('tr')
+    if not row:
+        return None
+
+    cells = row.find_all('td')
+    if not cells: # Header might be the first cell
+        # This is a bit brittle, assumes header is first `th`
+        cells = row.find_all('th')[1:] if len(row.find_all('th')) > 1 else []
+
+
+    levels = []
+    # Fill in sparse "Level needed" rows (like Reckless Attack)
+    last_level = None
+    for cell in cells:
+        val = cell.get_text(strip=True)
+        if val.isdigit():
+            last_level = int(val)
+            levels.append(last_level)
+        else:
+            levels.append(last_level) # repeat last known level for empty cells
+
+    # Heuristic to fill out to 5 levels if sparse
+    if levels and len(levels) < 5:
+        last_val = levels[-1]
+        while len(levels) < 5:
+            levels.append(last_val)
+
+    return levels if levels else None
+
+
+@timed
+def parse_skill_info_table(soup: BeautifulSoup):
+    """Extracts basic info from the top skill info table."""
+    info = {}
+    info_table = soup.find('table', class_='skill info')
+    if not info_table:
+        return None
+
+    rows = info_table.find_all('tr')
+    for row in rows:
+        cells = row.find_all('td')
+        if len(cells) < 2:
+            continue
+
+        key = cells[0].get_text(strip=True).replace(':', '').replace('<b>', '').replace('</b>', '').strip().lower()
+        value = cells[1].get_text(strip=True).strip()
+
+        if key == 'type':
+            info['type'] = value
+        elif key == 'levels':
+            info['levels'] = int(value) if value.isdigit() else None
+        elif key == 'casting time':
+            info['cast_time'] = value
+        elif key == 'skill downtime':
+            info['cooldown'] = value
+        elif key == 'compatible weapon':
+            info['weapons'] = [w.strip() for w in value.split(',')]
+        elif key == 'range':
+            info['range'] = value
+        elif key == 'target':
+            info['target'] = value
+        # Skip prerequisites as we have a separate parser
+
+    return info if info else None
+
+
+@timed
+def parse_progression_table(soup: BeautifulSoup):
+    """Extracts per-level stats from the main progression table."""
+    prog_table = soup.find('table', class_='wikitable')
+    if not prog_table:
+        return None
+
+    headers = [th.get_text(strip=True).lower() for th in prog_table.find_all('th')]
+    rows = prog_table.find_all('tr')[1:]  # Skip header
+
+    # Assume first column is "Level", then stats
+    if not headers or headers[0] != 'level':
+        return None
+
+    stats = {h: [] for h in headers[1:]}
+    for row in rows:
+        cells = row.find_all('td')
+        if len(cells) != len(headers):
+            continue
+        for i, h in enumerate(headers[1:], 1):
+            val = cells[i].get_text(strip=True).strip()
+            if val.replace('+', '').isdigit():
+                stats[h].append(int(val.replace('+', '')))
+            else:
+                stats[h].append(val)
+
+    return stats
+
+
+@timed
+def extract_prereq_levels(html: str):
+    # Try to capture the row titled "Prerequisite Level" and collect its numeric cells
+    m = re.search(r"<th[^>]*>\s*Prerequisite Level\s*</th>\s*<td[^>]*>(.*?)</td>(.*?)</tr>", html, re.I | re.S)
+    if not m:
+        return None
+    row = m.group(0)
+    vals = re.findall(r">\s*(\d+)\s*<", row)
+    if not vals:
+        return None
+    return [int(v) for v in vals]
+
+
+def extract_regions(html: str) -> str:
+    """Returns the <h1>, top-level <table> and stray <b> elements of a page, in document order."""
+    parts = []
+    start = None
+    open_tag = None
+    depth = 0
+    for m in _REGION_TAG_RE.finditer(html):
+        closing, tag = m.group(1), m.group(2).lower()
+        if open_tag is None:
+            if not closing:
+                open_tag, start, depth = tag, m.start(), 1
+            continue
+        if tag != open_tag:
+            continue
+        depth += -1 if closing else 1
+        if depth == 0:
+            parts.append(html[start:m.end()])
+            open_tag = None
+    if open_tag is not None:
+        parts.append(html[start:])
+    return '\n'.join(parts)
+
+
+@timed
+def parse_page(html: str, backend: str = 'fast') -> BeautifulSoup:
+    """
+    'full' builds the complete html.parser tree; 'fast' builds a tree of the
+    extracted regions only, with lxml when installed and html.parser otherwise.
+    """
+    if backend == 'full':
+        return BeautifulSoup(html, 'html.parser')
+    if backend == 'fast':
+        return BeautifulSoup(extract_regions(html), FAST_PARSER)
+    raise ValueError(f"unknown backend {backend!r}; expected one of {BACKENDS}")
+
+
+def extract_record(html: str, fallback_title: str, backend: str = 'fast') -> Dict[str, object]:
+    """Parses one page and returns only the compact fields the scripts use."""
+    soup = parse_page(html, backend)
+    return {
+        'title': parse_title(soup, fallback_title),
+        'prereqs': parse_prereqs_table(soup),
+        'lvlReq': parse_level_needed_row(soup),
+        'prereqLevels': extract_prereq_levels(html),
+        'info': parse_skill_info_table(soup),
+        'progression': parse_progression_table(soup),
+    }
+
+
+def _content_hash(raw: bytes) -> str:
+    return hashlib.sha1(raw).hexdigest()
+
+
+def load_index_file(index_path: Path = INDEX_PATH) -> Dict[str, dict]:
+    try:
+        cached = json.loads(index_path.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+    if cached.get('version') != INDEX_VERSION:
+        return {}
+    return cached.get('pages') or {}
+
+
+def save_index_file(pages: Dict[str, dict], index_path: Path = INDEX_PATH) -> None:
+    payload = {'version': INDEX_VERSION, 'pages': pages}
+    write_bytes_atomic(index_path, json.dumps(payload, ensure_ascii=False).encode('utf-8'))
+
+
+def _load_page(path: str, known_hash: Optional[str], backend: str = 'fast') -> Tuple[Optional[str], Optional[dict]]:
+    """
+    Worker for one page: returns (content hash, record).
+
+    The record is None when the content hash matches `known_hash` (nothing to
+    re-parse); both are None when the page can't be read or parsed. Only the
+    compact record crosses the process boundary, never the parse tree.
+    """
+    p = Path(path)
+    try:
+        raw = p.read_bytes()
+    except OSError:
+        return None, None
+    digest = _content_hash(raw)
+    if digest == known_hash:
+        return digest, None
+    try:
+        return digest, extract_record(raw.decode('utf-8', errors='ignore'), p.stem, backend)
+    except Exception:
+        return None, None
+
+
+def _load_page_args(args: Tuple[str, Optional[str], str]) -> Tuple[Optional[str], Optional[dict]]:
+    return _load_page(*args)
+
+
+@timed
+def build_wiki_index(wiki_dir: Path = WIKI_DIR, index_path: Optional[Path] = None, jobs: int = 1,
+                     backend: str = 'fast', persist: bool = True) -> Dict[str, dict]:
+    """
+    Returns normalized page title -> extracted record (plus its 'path').
+
+    Pages whose mtime and size match the persisted index are reused as is;
+    pages whose mtime changed but whose content hash did not are reused too.
+    Only genuinely new or edited pages are parsed, across `jobs` worker
+    processes when jobs > 1 (0 means one per CPU). The result is identical
+    to a serial run. `backend` selects the parser (see parse_page). With
+    persist=False the index file is read but never rewritten.
+    """
+    if index_path is None:
+        index_path = wiki_dir / INDEX_PATH.name
+    cached = load_index_file(index_path)
+    pages: Dict[str, dict] = {}
+    pending: List[Tuple[str, os.stat_result, Optional[dict]]] = []
+
+    for p in sorted(wiki_dir.glob(PAGE_GLOB)):
+        key = str(p.relative_to(wiki_dir))
+        try:
+            st = p.stat()
+        except OSError:
+            continue
+        entry = cached.get(key)
+        if entry and entry['mtime'] == st.st_mtime_ns and entry['size'] == st.st_size:
+            pages[key] = entry
+            continue
+        pages[key] = None
+        pending.append((key, st, entry))
+
+    work = [(str(wiki_dir / key), entry['hash'] if entry else None, backend) for key, _, entry in pending]
+    count('wiki.pages', len(pages))
+    count('io.bytes_read', sum(st.st_size for _, st, _ in pending))
+    if jobs == 0:
+        jobs = os.cpu_count() or 1
+    if jobs > 1 and len(work) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(work))) as pool:
+            chunksize = max(1, len(work) // (jobs * 4))
+            results = list(pool.map(_load_page_args, work, chunksize=chunksize))
+    else:
+        results = [_load_page(*w) for w in work]
+
+    parsed = 0
+    count('wiki.pages_reused', len(pages) - len(pending))
+    for (key, st, entry), (digest, record) in zip(pending, results):
+        if digest is None:
+            del pages[key]
+        elif record is None:
+            entry.update(mtime=st.st_mtime_ns, size=st.st_size)
+            pages[key] = entry
+        else:
+            parsed += 1
+            pages[key] = {'mtime': st.st_mtime_ns, 'size': st.st_size, 'hash': digest, 'record': record}
+    count('wiki.pages_parsed', parsed)
+
+    if persist and (pending or pages.keys() != cached.keys()):
+        try:
+            save_index_file(pages, index_path)
+        except OSError:
+            pass
+
+    idx: Dict[str, dict] = {}
+    for key, entry in pages.items():
+        record = dict(entry['record'], path=str(wiki_dir / key))
+        idx[normalize_name(record['title'])] = record
+    return idx
+
+
+_TITLE_RE = re.compile(r'<h1\b[^>]*\bclass=["\'][^"\']*\bpage-title\b[^>]*>.*?</h1>', re.I | re.S)
+
+
+def read_title(html: str, fallback: str) -> str:
+    """Title of a page without parsing anything but its <h1 class="page-title">."""
+    m = _TITLE_RE.search(html)
+    if not m:
+        return fallback
+    return parse_title(BeautifulSoup(m.group(0), 'html.parser'), fallback)
+
+
+class StreamingWikiIndex(Mapping):
+    """
+    Drop-in replacement for the dict returned by build_wiki_index() whose
+    memory does not grow with the corpus.
+
+    Only a normalized title -> path map is kept for every page. Records are
+    extracted when a skill actually looks a page up and held in a bounded LRU
+    of `cache_size` entries, so peak memory is set by the cache size rather
+    than by the size of wiki_cache/.
+    """
+
+    def __init__(self, wiki_dir: Path = WIKI_DIR, cache_size: int = 128, backend: str = 'fast'):
+        self.wiki_dir = wiki_dir
+        self.cache_size = max(1, cache_size)
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self._cache: 'OrderedDict[str, dict]' = OrderedDict()
+        self._paths: Dict[str, Path] = {}
+        for p in sorted(wiki_dir.glob(PAGE_GLOB)):
+            try:
+                html = p.read_text(encoding='utf-8', errors='ignore')
+            except OSError:
+                continue
+            self._paths[normalize_name(read_title(html, p.stem))] = p
+
+    def __getitem__(self, key: str) -> dict:
+        record = self._cache.get(key)
+        if record is not None:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            count('wiki.cache_hits')
+            return record
+        p = self._paths[key]
+        self.misses += 1
+        raw = p.read_bytes()
+        html = raw.decode('utf-8', errors='ignore')
+        count('wiki.cache_misses')
+        count('wiki.pages_parsed')
+        count('io.bytes_read', len(raw))
+        record = dict(extract_record(html, p.stem, self.backend), path=str(p))
+        self._cache[key] = record
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return record
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._paths
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._paths)
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+
+def open_wiki_index(wiki_dir: Path = WIKI_DIR, jobs: int = 1, stream_cache: int = 0,
+                    backend: str = 'fast', persist: bool = True) -> Mapping:
+    """build_wiki_index(), or a StreamingWikiIndex when stream_cache > 0."""
+    if stream_cache > 0:
+        return StreamingWikiIndex(wiki_dir, stream_cache, backend)
+    return build_wiki_index(wiki_dir, jobs=jobs, backend=backend, persist=persist)
+
+
+def verify_backends(wiki_dir: Path = WIKI_DIR) -> List[str]:
+    """Returns the pages whose 'fast' extraction differs from the full html.parser tree."""
+    mismatched = []
+    for p in sorted(wiki_dir.glob(PAGE_GLOB)):
+        html = p.read_text(encoding='utf-8', errors='ignore')
+        if extract_record(html, p.stem, 'fast') != extract_record(html, p.stem, 'full'):
+            mismatched.append(p.name)
+    return mismatched
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Build or check the cached wiki index")
+    ap.add_argument('--wiki-dir', default=str(WIKI_DIR), help="wiki cache directory")
+    ap.add_argument('--jobs', type=int, default=1, help="pages to parse in parallel (0 = one per CPU)")
+    ap.add_argument('--backend', choices=BACKENDS, default='fast', help="parser used for changed pages")
+    ap.add_argument('--verify', action='store_true', help="compare the fast and full backends page by page")
+    instrumentation.add_arguments(ap)
+    args = ap.parse_args()
+    wiki_dir = Path(args.wiki_dir).resolve()
+
+    if args.verify:
+        mismatched = verify_backends(wiki_dir)
+        for name in mismatched:
+            print(f"  mismatch: {name}")
+        print(f"Fast backend ({FAST_PARSER}): {len(mismatched)} mismatching pages")
+        raise SystemExit(1 if mismatched else 0)
+
+    with instrumentation.from_args(args), instrumentation.stage('index'):
+        idx = build_wiki_index(wiki_dir, jobs=args.jobs, backend=args.backend)
+    print(f"Indexed {len(idx)} wiki pages from {wiki_dir}")
+
+
+if __name__ == '__main__':
+    main()